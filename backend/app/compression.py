@@ -0,0 +1,37 @@
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None
+
+
+class CompressionMiddleware:
+    """Compress responses above minimum_size with brotli or gzip, as the client accepts
+
+    Brotli is used when the optional brotli-asgi package is installed (falling
+    back to gzip for clients without br support). Server-sent event streams
+    are passed through untouched, since buffering compressors would hold back
+    their chunks.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1000):
+        self.app = app
+        if BrotliMiddleware is not None:
+            self.compressed_app = BrotliMiddleware(app, minimum_size=minimum_size, gzip_fallback=True)
+        else:
+            self.compressed_app = GZipMiddleware(app, minimum_size=minimum_size)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http" and not _wants_event_stream(scope):
+            await self.compressed_app(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+
+def _wants_event_stream(scope: Scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == b"accept" and b"text/event-stream" in value:
+            return True
+    return False
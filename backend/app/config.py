@@ -1,10 +1,90 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 
 class Settings(BaseSettings):
     firebase_credentials_path: str = "./firebase/serviceAccountKey.json"
+    # "firestore", or "memory" for the in-process stand-in used by benchmarks
+    data_backend: str = "firestore"
+    memory_backend_latency_ms: float = 0.0
     gemini_api_key: str
     frontend_url: str = "http://localhost:3000"
+
+    # Gemini REST client
+    gemini_base_url: str = "https://generativelanguage.googleapis.com/v1beta"
+    gemini_model: str = "gemini-2.5-flash"
+    gemini_timeout_seconds: float = 30.0
+    gemini_max_connections: int = 20
+    gemini_max_keepalive_connections: int = 10
+    gemini_keepalive_expiry_seconds: float = 60.0
+    gemini_max_concurrent: int = 16
+    gemini_embedding_model: str = "text-embedding-004"
+    
+    # AI tutor answer cache
+    ai_cache_enabled: bool = True
+    ai_cache_max_entries: int = 2048
+    ai_cache_ttl_seconds: float = 86400.0
+    ai_semantic_cache_enabled: bool = False
+    ai_semantic_cache_threshold: float = 0.92
+    ai_semantic_cache_max_entries_per_scope: int = 256
+    
+    # Cached class attendance analytics
+    analytics_cache_ttl_seconds: float = 300.0
+    analytics_cache_max_entries: int = 1000
+    
+    # Recent chat messages kept in memory per class (window must exceed the max page size)
+    message_cache_enabled: bool = True
+    message_cache_window: int = 120
+    message_cache_max_classes: int = 500
+    message_cache_max_messages: int = 30000
+    # Reload windows older than this, so chat written on other workers shows up.
+    # Unset: 0 (never) with one worker, 10 s when WEB_CONCURRENCY > 1
+    message_cache_max_age_seconds: Optional[float] = None
+    # Worker processes serving the app (uvicorn --workers / gunicorn -w read the same variable)
+    web_concurrency: int = 1
+    
+    # ID token verification and profile lookups
+    auth_token_cache_max_entries: int = 10000
+    auth_cert_refresh_enabled: bool = True
+    auth_profile_cache_ttl_seconds: float = 60.0
+    auth_profile_cache_max_entries: int = 10000
+    
+    # Class rosters (changes made on other workers show up after this)
+    roster_cache_ttl_seconds: float = 300.0
+    
+    # Responses smaller than this are sent uncompressed
+    compression_minimum_size: int = 1000
+    
+    # After startup, create the Firebase clients and open Firestore / Gemini
+    # connections in the background instead of on the first request
+    startup_warm_up: bool = True
+    
+    # Per-request Firestore reads/writes/time as Server-Timing headers and /metrics
+    request_metrics_enabled: bool = True
+    # Log Firestore calls at least this slow; 0 turns the slow-call log off
+    firestore_slow_call_ms: float = 0.0
+    
+    # Profiling endpoints under /debug and the event-loop lag monitor are only
+    # enabled when a token is set; callers send it as X-Debug-Token
+    debug_token: str = ""
+    debug_profile_max_seconds: float = 60.0
+    loop_monitor_interval_ms: float = 50.0
+    loop_slow_callback_ms: float = 100.0
+    
+    # In-process background jobs (queued registrations, bulk student enrolment).
+    # Job status lives on the worker that accepted the job and is lost on restart
+    job_workers: int = 4
+    job_max_queued: int = 1000
+    job_max_attempts: int = 3
+    job_retry_base_seconds: float = 0.5
+    job_batch_concurrency: int = 8
+    job_batch_max_items: int = 500
+    job_retention_seconds: float = 3600.0
+    job_shutdown_grace_seconds: float = 10.0
+    
+    # Thread pool used for blocking Firebase Admin / Firestore calls
+    firebase_max_workers: int = 32
+    firebase_max_pending: int = 256
     
     class Config:
         env_file = ".env"
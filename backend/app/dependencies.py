@@ -0,0 +1,45 @@
+from typing import Optional
+from fastapi import Header, HTTPException, Request
+from app.responses import FastJSONResponse
+from app.services.firebase_service import async_firebase
+from app.services.job_queue import Job
+from app.services.token_verifier import token_verifier
+
+
+async def get_current_user(request: Request, authorization: Optional[str] = Header(None)) -> Optional[dict]:
+    """Profile of the caller named by the bearer token, loaded once per request
+
+    Returns None when no token is sent, so routes keep working for clients
+    that only pass IDs in the path. A token that fails verification is a 401.
+    """
+    if hasattr(request.state, "user"):
+        return request.state.user
+
+    user = None
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            claims = await token_verifier.verify(token)
+        except Exception:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        user = await async_firebase.get_user_profile(claims["uid"])
+
+    request.state.user = user
+    return user
+
+
+def profile_for(user: Optional[dict], uid: str) -> Optional[dict]:
+    """The caller's profile if it is the one a route is asking about, else None"""
+    if user is not None and user.get("uid") == uid:
+        return user
+    return None
+
+
+def job_accepted(job: Job, message: str) -> FastJSONResponse:
+    """202 Accepted pointing the client at the queued job's status"""
+    status_url = f"/jobs/{job.id}"
+    return FastJSONResponse(
+        status_code=202,
+        content={"message": message, "job_id": job.id, "status_url": status_url},
+        headers={"Location": status_url}
+    )
@@ -0,0 +1,68 @@
+import hashlib
+from typing import Callable, Optional
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header names this ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag.removeprefix("W/") in tags
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    """Empty 304 carrying the validators the client already has"""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+
+# Unless an endpoint says otherwise, clients may keep GET responses but must revalidate them
+DEFAULT_CACHE_CONTROL = "private, no-cache"
+
+
+def content_etag(body: bytes) -> str:
+    """Weak ETag from a response body's hash (weak because compression may re-encode it)"""
+    return f'W/"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+
+def cache_control(value: str):
+    """Per-endpoint Cache-Control for routes served by ConditionalRoute"""
+    def decorate(endpoint):
+        endpoint.cache_control = value
+        return endpoint
+    return decorate
+
+
+class ConditionalRoute(APIRoute):
+    """Adds an ETag and Cache-Control to successful GET responses and answers
+    matching If-None-Match requests with 304
+
+    Endpoints that already have a validator (e.g. the roster cache) can set
+    their own ETag header; it is used instead of hashing the body.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        policy = getattr(self.endpoint, "cache_control", DEFAULT_CACHE_CONTROL)
+
+        async def conditional_handler(request: Request) -> Response:
+            response = await handler(request)
+            if request.method != "GET" or response.status_code != 200 or not hasattr(response, "body"):
+                return response
+
+            if policy == "no-store":
+                response.headers.setdefault("Cache-Control", policy)
+                return response
+
+            etag = response.headers.get("etag") or content_etag(response.body)
+            response.headers["ETag"] = etag
+            if "cache-control" not in response.headers:
+                response.headers["Cache-Control"] = policy
+            if etag_matches(request.headers.get("if-none-match"), etag):
+                return not_modified(etag, response.headers["cache-control"])
+            return response
+
+        return conditional_handler
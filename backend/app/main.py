@@ -1,14 +1,60 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import get_settings
-from app.routes import auth, student, teacher, parent, ai, messages
+from app.compression import CompressionMiddleware
+from app.metrics import RequestMetricsMiddleware, render_metrics
+from app.responses import FastJSONResponse
+from app.profiling import loop_monitor
+from app.routes import auth, student, teacher, parent, ai, messages, jobs, debug
+from app.services.firebase_service import async_firebase, firebase_executor, warm_up_data_backend
+from app.services.gemini_service import GeminiService
+from app.services.job_queue import job_queue
+from app.services.token_verifier import token_verifier
 settings = get_settings()
 
+async def warm_up():
+    """Create the Firebase clients and open upstream connections off the request path
+
+    Runs after the server starts accepting requests; anything that needs
+    Firestore before it finishes just waits for the clients on first use.
+    Failures are left for that first use to report.
+    """
+    await asyncio.gather(
+        async_firebase.run(warm_up_data_backend),
+        GeminiService.warm_up(),
+        return_exceptions=True
+    )
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.auth_cert_refresh_enabled and settings.data_backend != "memory":
+        token_verifier.start()
+    warm_up_task = asyncio.create_task(warm_up()) if settings.startup_warm_up else None
+    if settings.debug_token:
+        loop_monitor.start()
+    yield
+    if settings.debug_token:
+        await loop_monitor.stop()
+    if warm_up_task is not None:
+        warm_up_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await warm_up_task
+    # Let queued registrations finish before the executor they use goes away
+    await job_queue.stop(settings.job_shutdown_grace_seconds)
+    await token_verifier.stop()
+    await GeminiService.close()
+    firebase_executor.shutdown()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="LearnAge API",
     description="Education platform with role-based dashboards",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # CORS middleware
@@ -20,6 +66,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON responses (brotli when brotli-asgi is installed, otherwise gzip)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_minimum_size)
+
+# Firestore reads/writes/time per request (Server-Timing header, /metrics)
+if settings.request_metrics_enabled:
+    app.add_middleware(RequestMetricsMiddleware)
+
 # Include routers
 # Include routers
 app.include_router(auth.router)
@@ -28,6 +81,11 @@ app.include_router(teacher.router)
 app.include_router(parent.router)
 app.include_router(ai.router)
 app.include_router(messages.router)  
+app.include_router(jobs.router)
+
+# Profiling endpoints exist only on workers started with a debug token
+if settings.debug_token:
+    app.include_router(debug.router)
 
 @app.get("/")
 async def root():
@@ -39,7 +97,17 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "firebase_executor": firebase_executor.stats(),
+        "jobs": job_queue.stats()
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus scrape endpoint: per-route requests, latency and Firestore usage"""
+    return PlainTextResponse(render_metrics(firebase_executor.stats()),
+                             media_type="text/plain; version=0.0.4")
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,162 @@
+import bisect
+import time
+from typing import Dict, List, Tuple
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.services import firestore_metrics
+
+# Upper bounds (seconds) of the request duration histogram
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RouteTotals:
+    def __init__(self):
+        self.requests = 0
+        self.statuses: Dict[int, int] = {}
+        self.duration_buckets = [0] * (len(DURATION_BUCKETS) + 1)
+        self.duration_seconds = 0.0
+        self.reads = 0
+        self.writes = 0
+        self.queries = 0
+        self.firestore_seconds = 0.0
+
+
+class RequestMetrics:
+    """Per-route request counts, latency and Firestore usage
+
+    Routes are labelled by their path template, so IDs in the path don't
+    create a series per student. Only touched from the event loop.
+    """
+
+    def __init__(self):
+        self.routes: Dict[Tuple[str, str], RouteTotals] = {}
+
+    def observe(self, method: str, route: str, status: int, seconds: float,
+                cost: firestore_metrics.RequestCost):
+        totals = self.routes.get((method, route))
+        if totals is None:
+            totals = self.routes[(method, route)] = RouteTotals()
+        totals.requests += 1
+        totals.statuses[status] = totals.statuses.get(status, 0) + 1
+        totals.duration_buckets[bisect.bisect_left(DURATION_BUCKETS, seconds)] += 1
+        totals.duration_seconds += seconds
+        totals.reads += cost.reads
+        totals.writes += cost.writes
+        totals.queries += cost.queries
+        totals.firestore_seconds += cost.seconds
+
+
+request_metrics = RequestMetrics()
+
+
+def server_timing(cost: firestore_metrics.RequestCost, seconds: float) -> str:
+    """Server-Timing value: Firestore time and document counts, plus the whole request"""
+    return (
+        f'firestore;dur={cost.seconds * 1000:.1f};desc="{cost.queries} queries, '
+        f'{cost.reads} reads, {cost.writes} writes", app;dur={seconds * 1000:.1f}'
+    )
+
+
+class RequestMetricsMiddleware:
+    """Accounts Firestore reads, writes, queries and time to each HTTP request
+
+    The totals go out in a Server-Timing header and are added to the
+    per-route figures served by /metrics.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        cost, token = firestore_metrics.begin_request(scope["path"])
+        status = 500
+
+        async def send_with_timing(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                timing = server_timing(cost, time.perf_counter() - started)
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            firestore_metrics.end_request(token)
+            route = scope.get("route")
+            request_metrics.observe(scope["method"], getattr(route, "path", "unmatched"), status,
+                                    time.perf_counter() - started, cost)
+
+
+# ==================== PROMETHEUS TEXT FORMAT ====================
+
+def _label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{name}="{_label_value(value)}"' for name, value in labels.items()) + "}"
+
+
+def _metric(lines: List[str], name: str, kind: str, help_text: str, samples: List[Tuple[str, float]]):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+    lines.extend(f"{name}{labels} {value}" for labels, value in samples)
+
+
+def render_metrics(executor_stats: dict) -> str:
+    """Everything above in the Prometheus text exposition format"""
+    lines: List[str] = []
+    routes = sorted(request_metrics.routes.items())
+
+    _metric(lines, "learnage_http_requests_total", "counter", "HTTP requests by route and status", [
+        (_labels(method=method, route=route, status=status), count)
+        for (method, route), totals in routes
+        for status, count in sorted(totals.statuses.items())
+    ])
+
+    histogram = []
+    for (method, route), totals in routes:
+        cumulative = 0
+        for bound, count in zip(DURATION_BUCKETS + ("+Inf",), totals.duration_buckets):
+            cumulative += count
+            histogram.append((_labels(method=method, route=route, le=bound), cumulative))
+    lines.append("# HELP learnage_http_request_duration_seconds Request latency by route")
+    lines.append("# TYPE learnage_http_request_duration_seconds histogram")
+    lines.extend(f"learnage_http_request_duration_seconds_bucket{labels} {value}" for labels, value in histogram)
+    for (method, route), totals in routes:
+        labels = _labels(method=method, route=route)
+        lines.append(f"learnage_http_request_duration_seconds_sum{labels} {totals.duration_seconds}")
+        lines.append(f"learnage_http_request_duration_seconds_count{labels} {totals.requests}")
+
+    for name, attribute, help_text in (
+        ("learnage_firestore_document_reads_total", "reads", "Firestore documents read, by route"),
+        ("learnage_firestore_document_writes_total", "writes", "Firestore documents written, by route"),
+        ("learnage_firestore_queries_total", "queries", "Firestore queries run, by route"),
+        ("learnage_firestore_seconds_total", "firestore_seconds", "Time spent in Firestore calls, by route"),
+    ):
+        _metric(lines, name, "counter", help_text, [
+            (_labels(method=method, route=route), getattr(totals, attribute))
+            for (method, route), totals in routes
+        ])
+
+    operations = sorted(firestore_metrics.operation_totals.snapshot().items())
+    _metric(lines, "learnage_firestore_calls_total", "counter", "Firestore RPCs by operation",
+            [(_labels(operation=operation), calls) for operation, (calls, _) in operations])
+    _metric(lines, "learnage_firestore_call_seconds_total", "counter", "Firestore RPC time by operation",
+            [(_labels(operation=operation), seconds) for operation, (_, seconds) in operations])
+    _metric(lines, "learnage_firestore_slow_calls_total", "counter", "Firestore RPCs over the slow-call threshold",
+            [("", firestore_metrics.operation_totals.slow_calls)])
+
+    _metric(lines, "learnage_firebase_executor_in_flight", "gauge", "Blocking Firebase calls running or queued",
+            [("", executor_stats["in_flight"])])
+    _metric(lines, "learnage_firebase_executor_calls_total", "counter", "Blocking Firebase calls started",
+            [("", executor_stats["calls"])])
+    _metric(lines, "learnage_firebase_executor_errors_total", "counter", "Blocking Firebase calls that raised",
+            [("", executor_stats["errors"])])
+
+    return "\n".join(lines) + "\n"
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, Dict, List
 from datetime import date
 
@@ -15,6 +15,9 @@ class UserLogin(BaseModel):
     email: EmailStr
     password: str
 
+class ProfileUpdate(BaseModel):
+    name: str = Field(..., min_length=1, max_length=100)
+
 class UserResponse(BaseModel):
     uid: str
     email: str
@@ -0,0 +1,270 @@
+import asyncio
+import bisect
+import functools
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Deque, Dict, List, Optional, Tuple
+from app.config import get_settings
+
+settings = get_settings()
+
+# A stack is a tuple of (function, file, line of definition) frames, root first
+Frame = Tuple[str, str, int]
+Stack = Tuple[Frame, ...]
+
+# Leaf frames of threads that are parked rather than working
+IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),
+}
+
+
+def _frame(frame) -> Frame:
+    code = frame.f_code
+    return code.co_name, code.co_filename, code.co_firstlineno
+
+
+def _stack(frame, limit: int = 128) -> Stack:
+    frames = []
+    while frame is not None and len(frames) < limit:
+        frames.append(_frame(frame))
+        frame = frame.f_back
+    return tuple(reversed(frames))
+
+
+def _is_idle(stack: Stack) -> bool:
+    if not stack:
+        return True
+    name, filename, _ = stack[-1]
+    return (os.path.basename(filename), name) in IDLE_LEAVES
+
+
+def _label(frame: Frame) -> str:
+    name, filename, line = frame
+    return f"{name} ({_short_path(filename)}:{line})"
+
+
+@functools.lru_cache(maxsize=4096)
+def _short_path(filename: str) -> str:
+    """Path relative to its import root (app/..., fastapi/..., asyncio/...)"""
+    roots = [entry or os.getcwd() for entry in sys.path] + [os.getcwd()]
+    root = max((r for r in roots if filename.startswith(r.rstrip(os.sep) + os.sep)), key=len, default="")
+    return filename[len(root.rstrip(os.sep)) + 1:] if root else filename
+
+
+class StackSampler:
+    """Samples every thread's Python stack at a fixed interval
+
+    Pure Python (sys._current_frames), so it needs nothing installed and can be
+    pointed at a live worker. Each sample costs a walk of every thread's stack
+    under the GIL; at the default 10 ms that is a small share of one core.
+    """
+
+    def __init__(self, interval_seconds: float = 0.01, include_idle: bool = False):
+        self.interval_seconds = interval_seconds
+        self.include_idle = include_idle
+        # (thread name, stack) -> samples
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self.elapsed_seconds = 0.0
+
+    def run(self, seconds: float):
+        """Sample for `seconds` on the calling thread (blocking)"""
+        own_id = threading.get_ident()
+        started = time.perf_counter()
+        deadline = started + seconds
+        next_sample = started
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            if now < next_sample:
+                time.sleep(next_sample - now)
+            next_sample += self.interval_seconds
+
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = _stack(frame)
+                if self.include_idle or not _is_idle(stack):
+                    self.samples[(names.get(thread_id, str(thread_id)), stack)] += 1
+            self.sample_count += 1
+        self.elapsed_seconds = time.perf_counter() - started
+
+    def collapsed(self) -> str:
+        """Folded stacks ("thread;root;...;leaf count"), as read by flamegraph.pl and speedscope"""
+        lines = []
+        for (thread, stack), count in self.samples.most_common():
+            lines.append(";".join([thread] + [_label(frame) for frame in stack]) + f" {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name: str) -> dict:
+        """Speedscope file format: one sampled profile per thread over shared frames"""
+        frame_index: Dict[Frame, int] = {}
+        frames: List[dict] = []
+        by_thread: Dict[str, List[Tuple[Stack, int]]] = {}
+        for (thread, stack), count in self.samples.items():
+            by_thread.setdefault(thread, []).append((stack, count))
+            for frame in stack:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    frames.append({"name": frame[0], "file": _short_path(frame[1]), "line": frame[2]})
+
+        interval_ms = self.interval_seconds * 1000
+        profiles = []
+        for thread, stacks in sorted(by_thread.items()):
+            samples = [[frame_index[frame] for frame in stack] for stack, _ in stacks]
+            weights = [count * interval_ms for _, count in stacks]
+            profiles.append({
+                "type": "sampled",
+                "name": thread,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights
+            })
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "learnage-profiler",
+            "shared": {"frames": frames},
+            "profiles": profiles
+        }
+
+
+# ==================== EVENT LOOP MONITOR ====================
+
+# Upper bounds (seconds) of the event-loop lag histogram
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def _request_in_stack(frame) -> Optional[dict]:
+    """The HTTP/WebSocket scope of the request whose code is running, if any
+
+    The running task's coroutine frames are on the loop thread's stack, so
+    the innermost ASGI `scope` local belongs to the request that is blocking.
+    """
+    while frame is not None:
+        scope = frame.f_locals.get("scope")
+        if isinstance(scope, dict) and scope.get("type") in ("http", "websocket"):
+            route = scope.get("route")
+            return {
+                "method": scope.get("method", "WS"),
+                "route": getattr(route, "path", None),
+                "path": scope.get("path")
+            }
+        frame = frame.f_back
+    return None
+
+
+class LoopMonitor:
+    """Measures how late the event loop runs a timer, and catches what blocks it
+
+    A task sleeps for interval_seconds in a loop; how much later than asked it
+    wakes up is the loop's lag, kept as a histogram. A watchdog thread notices
+    when the loop has been stuck for longer than slow_seconds and captures the
+    loop thread's stack and the request it is serving; the stall is recorded
+    as a slow callback once the loop recovers.
+    """
+
+    def __init__(self, interval_seconds: float = 0.05, slow_seconds: float = 0.1, max_slow: int = 50):
+        self.interval_seconds = interval_seconds
+        self.slow_seconds = slow_seconds
+        self.buckets = [0] * (len(LAG_BUCKETS) + 1)
+        self.ticks = 0
+        self.total_lag_seconds = 0.0
+        self.max_lag_seconds = 0.0
+        self.slow_callbacks: Deque[dict] = deque(maxlen=max_slow)
+        self.slow_callback_count = 0
+        self._beat = time.perf_counter()
+        self._capture: Optional[dict] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        self._loop_thread_id = threading.get_ident()
+        self._stopped.clear()
+        self._beat = time.perf_counter()
+        self._task = asyncio.get_running_loop().create_task(self._tick())
+        threading.Thread(target=self._watch, name="loop-watchdog", daemon=True).start()
+
+    async def stop(self):
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _tick(self):
+        while True:
+            asked = time.perf_counter()
+            await asyncio.sleep(self.interval_seconds)
+            woke = time.perf_counter()
+            lag = max(0.0, woke - asked - self.interval_seconds)
+            self._beat = woke
+            self._observe(lag)
+
+    def _observe(self, lag: float):
+        self.ticks += 1
+        self.total_lag_seconds += lag
+        self.max_lag_seconds = max(self.max_lag_seconds, lag)
+        self.buckets[bisect.bisect_left(LAG_BUCKETS, lag)] += 1
+
+        capture, self._capture = self._capture, None
+        if lag >= self.slow_seconds:
+            self.slow_callback_count += 1
+            entry = capture or {"request": None, "stack": []}
+            self.slow_callbacks.append({
+                "at": time.time(),
+                "duration_ms": round(lag * 1000, 1),
+                **entry
+            })
+
+    def _watch(self):
+        """Watchdog thread: grab the loop thread's stack while it is stuck"""
+        captured_beat = None
+        while not self._stopped.wait(self.interval_seconds / 2):
+            beat = self._beat
+            stalled = time.perf_counter() - beat - self.interval_seconds
+            if stalled < self.slow_seconds / 2 or beat == captured_beat:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            captured_beat = beat
+            self._capture = {
+                "request": _request_in_stack(frame),
+                "stack": [_label(f) for f in _stack(frame)][-25:]
+            }
+
+    def stats(self) -> dict:
+        return {
+            "interval_ms": self.interval_seconds * 1000,
+            "slow_callback_ms": self.slow_seconds * 1000,
+            "ticks": self.ticks,
+            "avg_lag_ms": round(self.total_lag_seconds / self.ticks * 1000, 3) if self.ticks else 0.0,
+            "max_lag_ms": round(self.max_lag_seconds * 1000, 3),
+            "lag_histogram_ms": {
+                **{f"le_{bound * 1000:g}": count for bound, count in zip(LAG_BUCKETS, self.buckets)},
+                "gt_" + f"{LAG_BUCKETS[-1] * 1000:g}": self.buckets[-1]
+            },
+            "slow_callbacks": self.slow_callback_count
+        }
+
+
+loop_monitor = LoopMonitor(
+    interval_seconds=settings.loop_monitor_interval_ms / 1000,
+    slow_seconds=settings.loop_slow_callback_ms / 1000
+)
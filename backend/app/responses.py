@@ -0,0 +1,34 @@
+from datetime import date, datetime
+from typing import Any
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+def _default(obj: Any):
+    """Types orjson doesn't handle natively (it rejects datetime subclasses such as
+    Firestore's DatetimeWithNanoseconds)"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    return jsonable_encoder(obj)
+
+
+class FastJSONResponse(ORJSONResponse):
+    """Default response class: orjson with a fallback for Firestore and pydantic types
+
+    Routes that return one directly also skip FastAPI's jsonable_encoder pass
+    and response-model validation, which is worth it for large payloads built
+    from trusted data (chat pages, homework lists, dashboard bundles).
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
@@ -21,8 +21,12 @@
 #     except Exception as e:
 #         raise HTTPException(status_code=500, detail=str(e))
 
-from fastapi import APIRouter, HTTPException
+import json
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from typing import Optional
+from app.dependencies import get_current_user
 from app.services.gemini_service import GeminiService
 
 router = APIRouter(prefix="/ai", tags=["AI"])
@@ -31,14 +35,50 @@ class ChatRequest(BaseModel):
     question: str
     context: str = None
 
+def cache_scope(user: Optional[dict]) -> Optional[str]:
+    """Answers are cached per class; the class comes from the caller's profile, never the request"""
+    return user.get("class_id") if user else None
+
 @router.post("/chat")
-async def chat_with_ai(request: ChatRequest):
+async def chat_with_ai(request: ChatRequest, user: Optional[dict] = Depends(get_current_user)):
     """Chat with AI tutor"""
     try:
-        response = GeminiService.get_ai_response(
+        response = await GeminiService.get_ai_response(
             question=request.question,
-            context=request.context
+            context=request.context,
+            class_id=cache_scope(user)
         )
         return {"answer": response}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/chat/stream")
+async def chat_with_ai_stream(request: ChatRequest, user: Optional[dict] = Depends(get_current_user)):
+    """Chat with AI tutor, relaying the answer as server-sent events"""
+    async def events():
+        try:
+            async for text in GeminiService.stream_ai_response(
+                question=request.question,
+                context=request.context,
+                class_id=cache_scope(user)
+            ):
+                yield f"data: {json.dumps({'text': text})}\n\n"
+            yield "event: done\ndata: {}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """Hit/miss counters for the AI tutor answer cache"""
+    return GeminiService.cache_stats()
+
+@router.get("/coalescing/stats")
+async def get_coalescing_stats():
+    """How many concurrent identical questions shared one upstream call"""
+    return GeminiService.coalescing_stats()
\ No newline at end of file
@@ -72,39 +72,51 @@
 #     return profile
 
 
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from firebase_admin import auth
-from app.models.schemas import UserRegister, UserLogin, UserResponse
-from app.services.firebase_service import FirebaseService
+from google.api_core import exceptions as google_exceptions
+from app.dependencies import get_current_user, job_accepted
+from app.models.schemas import ProfileUpdate, UserRegister, UserLogin, UserResponse
+from app.services.firebase_service import async_firebase, new_uid, profile_cache
+from app.services.job_queue import QueueFull, job_queue
+from app.services.token_verifier import token_verifier
+from app.responses import FastJSONResponse
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 @router.post("/register", response_model=dict)
-async def register_user(user_data: UserRegister):
-    """Register a new user with Firebase Auth and create profile"""
+async def register_user(user_data: UserRegister, background: bool = Query(False)):
+    """Register a new user with Firebase Auth and create profile
+    
+    With background=true the account is created by a queued job and the
+    response is a 202 carrying the job's ID; poll /jobs/{job_id} for the uid.
+    """
+    account = dict(
+        email=user_data.email,
+        password=user_data.password,
+        name=user_data.name,
+        role=user_data.role,
+        class_id=user_data.class_id,
+        parent_id=user_data.parent_id,
+        uid=new_uid()
+    )
     try:
-        # Create Firebase Auth user
-        user = auth.create_user(
-            email=user_data.email,
-            password=user_data.password
-        )
+        if background:
+            job = job_queue.submit("register", lambda: async_firebase.create_account(**account))
+            return job_accepted(job, "Registration queued")
         
-        # Create user profile in Firestore
-        profile = FirebaseService.create_user_profile(
-            uid=user.uid,
-            email=user_data.email,
-            name=user_data.name,
-            role=user_data.role,
-            class_id=user_data.class_id,
-            parent_id=user_data.parent_id
-        )
+        # Create the Firebase Auth user and its Firestore profile
+        user = await async_firebase.create_account(**account)
         
         return {
             "message": "User registered successfully",
-            "uid": user.uid,
-            "email": user.email
+            "uid": user["uid"],
+            "email": user["email"]
         }
         
+    except QueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
     except auth.EmailAlreadyExistsError:
         raise HTTPException(status_code=400, detail="Email already exists")
     except Exception as e:
@@ -115,11 +127,11 @@ async def verify_token(token: str):
     """Verify Firebase ID token and return user info"""
     try:
         # Verify the token
-        decoded_token = auth.verify_id_token(token)
+        decoded_token = await token_verifier.verify(token)
         uid = decoded_token['uid']
         
         # Get user profile
-        profile = FirebaseService.get_user_profile(uid)
+        profile = await async_firebase.get_user_profile(uid)
         
         if not profile:
             raise HTTPException(status_code=404, detail="User profile not found")
@@ -132,15 +144,47 @@ async def verify_token(token: str):
             "class_id": profile.get("class_id")
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+@router.get("/stats")
+async def get_auth_stats():
+    """Token verification and profile cache counters"""
+    return {
+        **token_verifier.stats(),
+        "profiles": profile_cache.stats()
+    }
+
 @router.get("/user/{uid}", response_model=UserResponse)
 async def get_user(uid: str):
     """Get user profile by UID"""
-    profile = FirebaseService.get_user_profile(uid)
+    profile = await async_firebase.get_user_profile(uid)
     
     if not profile:
         raise HTTPException(status_code=404, detail="User not found")
     
-    return profile
\ No newline at end of file
+    # Profiles are written by this service, so pick the documented fields
+    # instead of re-validating them against UserResponse
+    return FastJSONResponse({field: profile.get(field) for field in UserResponse.model_fields})
+
+@router.put("/profile")
+async def update_profile(update: ProfileUpdate, user: Optional[dict] = Depends(get_current_user)):
+    """Update the caller's own profile; cached copies of it are dropped so the change shows at once"""
+    if user is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    name = update.name.strip()
+    if not name:
+        raise HTTPException(status_code=400, detail="Name cannot be empty")
+    try:
+        profile = await async_firebase.update_user_profile(user["uid"], name)
+        return {
+            "message": "Profile updated successfully",
+            "uid": profile["uid"],
+            "name": profile["name"]
+        }
+    except google_exceptions.NotFound:
+        raise HTTPException(status_code=404, detail="User profile not found")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,75 @@
+import asyncio
+import hmac
+import os
+import time
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from app.config import get_settings
+from app.profiling import StackSampler, loop_monitor
+from app.responses import FastJSONResponse
+from app.services.firebase_service import message_cache
+
+settings = get_settings()
+
+# One profile at a time per worker; overlapping samplers would double the overhead
+_profile_lock = asyncio.Lock()
+
+
+def require_debug_token(x_debug_token: Optional[str] = Header(None)):
+    """Every /debug route needs the configured token"""
+    if not x_debug_token or not hmac.compare_digest(x_debug_token, settings.debug_token):
+        raise HTTPException(status_code=403, detail="Invalid debug token")
+
+
+router = APIRouter(prefix="/debug", tags=["Debug"], dependencies=[Depends(require_debug_token)])
+
+@router.get("/profile")
+async def profile_worker(
+    seconds: float = Query(10.0, gt=0),
+    interval_ms: float = Query(10.0, ge=1, le=1000),
+    format: str = Query("collapsed", pattern="^(collapsed|speedscope)$"),
+    include_idle: bool = False
+):
+    """Sample every thread of this worker for `seconds` and return the stacks
+
+    `collapsed` is folded-stack text for flamegraph.pl or speedscope;
+    `speedscope` is a JSON file to open at https://www.speedscope.app.
+    Parked threads (idle pool workers, the loop waiting in select) are left
+    out unless include_idle is set.
+    """
+    if seconds > settings.debug_profile_max_seconds:
+        raise HTTPException(status_code=400, detail=f"seconds must be at most {settings.debug_profile_max_seconds:g}")
+    if _profile_lock.locked():
+        raise HTTPException(status_code=409, detail="A profile is already running on this worker")
+
+    async with _profile_lock:
+        sampler = StackSampler(interval_seconds=interval_ms / 1000, include_idle=include_idle)
+        await asyncio.to_thread(sampler.run, seconds)
+
+    headers = {
+        "X-Profile-Samples": str(sampler.sample_count),
+        "X-Profile-Seconds": f"{sampler.elapsed_seconds:.3f}",
+        "Cache-Control": "no-store"
+    }
+    name = f"worker-{os.getpid()}-{int(time.time())}"
+    if format == "speedscope":
+        headers["Content-Disposition"] = f'attachment; filename="{name}.speedscope.json"'
+        return FastJSONResponse(sampler.speedscope(name), headers=headers)
+    return PlainTextResponse(sampler.collapsed(), headers=headers)
+
+@router.get("/loop")
+async def event_loop_stats(slow_limit: int = Query(20, ge=0, le=50)):
+    """Event-loop lag histogram and the most recent slow callbacks with their requests"""
+    return FastJSONResponse({
+        "pid": os.getpid(),
+        **loop_monitor.stats(),
+        "recent_slow_callbacks": list(loop_monitor.slow_callbacks)[-slow_limit:][::-1] if slow_limit else []
+    }, headers={"Cache-Control": "no-store"})
+
+@router.post("/message-cache/{class_id}/refresh")
+async def refresh_class_messages(class_id: str):
+    """Drop this worker's cached message window for a class; other workers keep theirs"""
+    if message_cache is not None:
+        message_cache.invalidate(class_id)
+    return {"pid": os.getpid(), "message": "Message cache refreshed on this worker"}
@@ -0,0 +1,14 @@
+from fastapi import APIRouter, HTTPException
+from app.services.job_queue import job_queue
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+@router.get("/{job_id}")
+async def get_job(job_id: str):
+    """Status, progress and result of a background job"""
+    job = job_queue.get(job_id)
+    if job is None:
+        # Finished jobs are forgotten after JOB_RETENTION_SECONDS, and each
+        # worker process only knows the jobs it accepted
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
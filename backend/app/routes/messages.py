@@ -110,13 +110,16 @@
 
 
 
-from fastapi import APIRouter, HTTPException, Query
+import asyncio
+from fastapi import APIRouter, HTTPException, Query, WebSocket
 from pydantic import BaseModel
 from typing import Optional
-from datetime import datetime
-from app.services.firebase_service import db
+from app.http_caching import ConditionalRoute, cache_control
+from app.responses import FastJSONResponse
+from app.services.firebase_service import async_firebase, message_cache
+from app.services.chat_hub import chat_hub
 
-router = APIRouter(prefix="/messages", tags=["Messages"])
+router = APIRouter(prefix="/messages", tags=["Messages"], route_class=ConditionalRoute)
 
 class MessageData(BaseModel):
     class_id: str
@@ -125,27 +128,35 @@ class MessageData(BaseModel):
     sender_role: str
     message: str
 
+def _message_event(message: dict) -> dict:
+    """Chat event payload in the same shape as GET /messages/class/{class_id} entries"""
+    timestamp = message.get("timestamp")
+    return {
+        "type": "message.created",
+        "message": {
+            "id": message["id"],
+            "sender_id": message.get("sender_id"),
+            "sender_name": message.get("sender_name"),
+            "sender_role": message.get("sender_role"),
+            "message": message.get("message"),
+            "timestamp": timestamp.isoformat() if timestamp else None
+        }
+    }
+
 @router.get("/class/{class_id}")
-async def get_class_messages(class_id: str, limit: int = Query(50, ge=1, le=100)):
-    """Get messages for a class"""
+async def get_class_messages(
+    class_id: str,
+    limit: int = Query(50, ge=1, le=100),
+    since: Optional[str] = None,
+    before: Optional[str] = None
+):
+    """Get messages for a class; `since` fetches only newer ones, `before` pages back"""
+    if since and before:
+        raise HTTPException(status_code=400, detail="Use either since or before, not both")
     try:
-        messages_ref = db.collection("messages")\
-            .where("class_id", "==", class_id)\
-            .order_by("timestamp", direction="DESCENDING")\
-            .limit(limit)
-        
-        messages = []
-        for doc in messages_ref.stream():
-            data = doc.to_dict()
-            messages.append({
-                "id": doc.id,
-                "sender_name": data.get("sender_name"),
-                "sender_role": data.get("sender_role"),
-                "message": data.get("message"),
-                "timestamp": data.get("timestamp")
-            })
-        
-        return {"messages": list(reversed(messages))}
+        return FastJSONResponse(await async_firebase.get_class_messages(class_id, limit, since, before))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -153,19 +164,18 @@ async def get_class_messages(class_id: str, limit: int = Query(50, ge=1, le=100)
 async def send_message(message_data: MessageData):
     """Send a message to class"""
     try:
-        message_ref = db.collection("messages").document()
-        message_ref.set({
-            "class_id": message_data.class_id,
-            "sender_id": message_data.sender_id,
-            "sender_name": message_data.sender_name,
-            "sender_role": message_data.sender_role,
-            "message": message_data.message,
-            "timestamp": datetime.now()
-        })
+        message = await async_firebase.send_message(
+            class_id=message_data.class_id,
+            sender_id=message_data.sender_id,
+            sender_name=message_data.sender_name,
+            sender_role=message_data.sender_role,
+            message=message_data.message
+        )
+        chat_hub.publish(message_data.class_id, _message_event(message))
         
         return {
             "message": "Message sent successfully",
-            "message_id": message_ref.id
+            "message_id": message["id"]
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -174,19 +184,56 @@ async def send_message(message_data: MessageData):
 async def delete_message(message_id: str, user_id: str = Query(...)):
     """Delete a message"""
     try:
-        message_ref = db.collection("messages").document(message_id)
-        message = message_ref.get()
+        message_data = await async_firebase.get_message(message_id)
         
-        if not message.exists:
+        if not message_data:
             raise HTTPException(status_code=404, detail="Message not found")
         
-        message_data = message.to_dict()
         if message_data.get("sender_id") != user_id:
             raise HTTPException(status_code=403, detail="Not authorized to delete this message")
         
-        message_ref.delete()
+        await async_firebase.delete_message(message_id, message_data.get("class_id"))
+        chat_hub.publish(message_data.get("class_id"), {
+            "type": "message.deleted",
+            "message_id": message_id
+        })
         return {"message": "Message deleted successfully"}
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.websocket("/ws/{class_id}")
+async def class_chat_socket(websocket: WebSocket, class_id: str):
+    """Push new and deleted class messages to the client as they happen"""
+    await websocket.accept()
+    queue = chat_hub.subscribe(class_id)
+    
+    async def push_events():
+        while True:
+            await websocket.send_text(await queue.get())
+    
+    async def wait_for_disconnect():
+        # Clients don't send anything meaningful; reading detects the close
+        while True:
+            await websocket.receive_text()
+    
+    tasks = [asyncio.create_task(push_events()), asyncio.create_task(wait_for_disconnect())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        chat_hub.unsubscribe(class_id, queue)
+        for task in tasks:
+            task.cancel()
+            if task.done() and not task.cancelled():
+                # A disconnect surfaces here as WebSocketDisconnect; that's the normal exit
+                task.exception()
+
+@router.get("/stats")
+@cache_control("no-store")
+async def get_chat_stats():
+    """Live chat connection, fan-out and message cache counters"""
+    return {
+        **chat_hub.stats(),
+        "cache": message_cache.stats() if message_cache is not None else None
+    }
\ No newline at end of file
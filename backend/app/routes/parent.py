@@ -38,36 +38,79 @@
 #         raise HTTPException(status_code=500, detail=str(e))
 
 
-from fastapi import APIRouter, HTTPException
-from app.services.firebase_service import FirebaseService
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+from app.dependencies import get_current_user, profile_for
+from app.http_caching import ConditionalRoute, cache_control
+from app.responses import FastJSONResponse
+from app.services.firebase_service import async_firebase
+from app.services.dashboard_bundle import get_parent_bundle
 
-router = APIRouter(prefix="/parent", tags=["Parent"])
+router = APIRouter(prefix="/parent", tags=["Parent"], route_class=ConditionalRoute)
 
 @router.get("/dashboard/{parent_id}")
-async def get_parent_dashboard(parent_id: str):
-    """Get parent dashboard with child info"""
+async def get_parent_dashboard(parent_id: str, user: Optional[dict] = Depends(get_current_user)):
+    """Get parent dashboard with info on every linked child"""
     try:
-        dashboard_data = FirebaseService.get_parent_dashboard(parent_id)
+        dashboard_data = await async_firebase.get_parent_dashboard(parent_id, profile_for(user, parent_id))
         if not dashboard_data:
             raise HTTPException(status_code=404, detail="No child found for this parent")
         return dashboard_data
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/bundle/{parent_id}")
+async def get_parent_dashboard_bundle(
+    parent_id: str,
+    homework_limit: int = Query(20, ge=1, le=200),
+    messages_limit: int = Query(20, ge=1, le=100),
+    user: Optional[dict] = Depends(get_current_user)
+):
+    """Attendance, homework and recent class messages for every child in one round trip"""
+    try:
+        bundle = await get_parent_bundle(
+            parent_id, profile_for(user, parent_id), homework_limit, messages_limit
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if not bundle:
+        raise HTTPException(status_code=404, detail="No child found for this parent")
+    return FastJSONResponse(bundle)
+
 @router.get("/attendance/{child_id}")
+@cache_control("private, max-age=60")
 async def get_child_attendance(child_id: str):
     """Get child's attendance history"""
     try:
-        attendance = FirebaseService.get_child_attendance(child_id)
+        attendance = await async_firebase.get_child_attendance(child_id)
         return {"attendance": attendance}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/attendance/{child_id}/summary")
+@cache_control("private, max-age=60")
+async def get_child_attendance_summary(
+    child_id: str,
+    start: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$"),
+    end: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$")
+):
+    """Get child's attendance percentage and streaks for a range of months"""
+    try:
+        return await async_firebase.get_child_attendance_summary(child_id, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/homework/{child_id}")
-async def get_child_homework(child_id: str):
+async def get_child_homework(
+    child_id: str,
+    limit: int = Query(100, ge=1, le=200),
+    cursor: Optional[str] = None
+):
     """Get child's homework status"""
     try:
-        homework = FirebaseService.get_child_homework(child_id)
-        return {"homework": homework}
+        homework, next_cursor = await async_firebase.get_child_homework(child_id, limit, cursor)
+        return FastJSONResponse({"homework": homework, "next_cursor": next_cursor})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -48,37 +48,83 @@
 #         raise HTTPException(status_code=500, detail=str(e))
 
 
-from fastapi import APIRouter, HTTPException, Query
-from app.services.firebase_service import FirebaseService
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+from app.dependencies import get_current_user, profile_for
+from app.http_caching import ConditionalRoute, cache_control
+from app.responses import FastJSONResponse
+from app.services.firebase_service import async_firebase
+from app.services.dashboard_bundle import get_student_bundle
 
-router = APIRouter(prefix="/student", tags=["Student"])
+router = APIRouter(prefix="/student", tags=["Student"], route_class=ConditionalRoute)
 
 @router.get("/dashboard/{student_id}")
-async def get_student_dashboard(student_id: str):
+async def get_student_dashboard(student_id: str, user: Optional[dict] = Depends(get_current_user)):
     """Get student dashboard data"""
     try:
-        dashboard_data = FirebaseService.get_student_dashboard(student_id)
+        dashboard_data = await async_firebase.get_student_dashboard(student_id, profile_for(user, student_id))
         if not dashboard_data:
             raise HTTPException(status_code=404, detail="Student not found")
         return dashboard_data
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/bundle/{student_id}")
+async def get_student_dashboard_bundle(
+    student_id: str,
+    homework_limit: int = Query(20, ge=1, le=200),
+    messages_limit: int = Query(20, ge=1, le=100),
+    user: Optional[dict] = Depends(get_current_user)
+):
+    """Dashboard, attendance, homework and recent class messages in one round trip"""
+    try:
+        bundle = await get_student_bundle(
+            student_id, profile_for(user, student_id), homework_limit, messages_limit
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if not bundle:
+        raise HTTPException(status_code=404, detail="Student not found")
+    return FastJSONResponse(bundle)
+
 @router.get("/attendance/{student_id}")
+@cache_control("private, max-age=60")
 async def get_student_attendance(student_id: str):
     """Get student attendance history"""
     try:
-        attendance = FirebaseService.get_student_attendance(student_id)
+        attendance = await async_firebase.get_student_attendance(student_id)
         return {"attendance": attendance}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/attendance/{student_id}/summary")
+@cache_control("private, max-age=60")
+async def get_student_attendance_summary(
+    student_id: str,
+    start: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$"),
+    end: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$")
+):
+    """Get attendance percentage and streaks for a range of months"""
+    try:
+        return await async_firebase.get_attendance_summary(student_id, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/homework/{student_id}")
-async def get_student_homework(student_id: str):
+async def get_student_homework(
+    student_id: str,
+    limit: int = Query(100, ge=1, le=200),
+    cursor: Optional[str] = None,
+    user: Optional[dict] = Depends(get_current_user)
+):
     """Get homework for student"""
     try:
-        homework = FirebaseService.get_student_homework(student_id)
-        return {"homework": homework}
+        homework, next_cursor = await async_firebase.get_student_homework(
+            student_id, limit, cursor, profile_for(user, student_id)
+        )
+        return FastJSONResponse({"homework": homework, "next_cursor": next_cursor})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -86,7 +132,7 @@ async def get_student_homework(student_id: str):
 async def submit_homework(homework_id: str, student_id: str = Query(...)):
     """Mark homework as submitted"""
     try:
-        success = FirebaseService.mark_homework_submitted(homework_id, student_id)
+        success = await async_firebase.mark_homework_submitted(homework_id, student_id)
         if success:
             return {"message": "Homework submitted successfully"}
         raise HTTPException(status_code=400, detail="Failed to submit homework")
@@ -99,12 +99,21 @@
 #         raise HTTPException(status_code=500, detail=str(e))
 
 
-from fastapi import APIRouter, HTTPException, Query
-from typing import List
-from pydantic import BaseModel
-from app.services.firebase_service import FirebaseService
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
+from datetime import datetime, timedelta
+from pydantic import BaseModel, Field
+from app.config import get_settings
+from app.dependencies import get_current_user, job_accepted, profile_for
+from app.http_caching import ConditionalRoute, cache_control
+from app.responses import FastJSONResponse
+from app.services.firebase_service import async_firebase, new_uid, roster_cache
+from app.services.job_queue import QueueFull, job_queue
+from app.services.attendance_analytics import AttendanceAnalytics
 
-router = APIRouter(prefix="/teacher", tags=["Teacher"])
+settings = get_settings()
+
+router = APIRouter(prefix="/teacher", tags=["Teacher"], route_class=ConditionalRoute)
 
 class AttendanceRecord(BaseModel):
     student_id: str
@@ -128,11 +137,14 @@ class StudentData(BaseModel):
     name: str
     class_id: str
 
+class BulkStudentData(BaseModel):
+    students: List[StudentData] = Field(..., min_length=1, max_length=settings.job_batch_max_items)
+
 @router.get("/dashboard/{teacher_id}")
-async def get_teacher_dashboard(teacher_id: str):
+async def get_teacher_dashboard(teacher_id: str, user: Optional[dict] = Depends(get_current_user)):
     """Get teacher dashboard data"""
     try:
-        dashboard_data = FirebaseService.get_teacher_dashboard(teacher_id)
+        dashboard_data = await async_firebase.get_teacher_dashboard(teacher_id, profile_for(user, teacher_id))
         if not dashboard_data:
             raise HTTPException(status_code=404, detail="Teacher not found")
         return dashboard_data
@@ -141,10 +153,10 @@ async def get_teacher_dashboard(teacher_id: str):
 
 @router.get("/students/{class_id}")
 async def get_class_students(class_id: str):
-    """Get all students in a class"""
+    """Get all students in a class; the roster's ETag lets clients revalidate it"""
     try:
-        students = FirebaseService.get_students_by_class(class_id)
-        return {"students": students}
+        students, etag = roster_cache.lookup(class_id) or await async_firebase.get_class_roster(class_id)
+        return FastJSONResponse({"students": students}, headers={"ETag": etag})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -155,18 +167,40 @@ async def mark_attendance(
 ):
     """Mark attendance for students"""
     try:
-        success = FirebaseService.mark_attendance(
+        result = await async_firebase.mark_attendance(
             class_id=attendance_data.class_id,
             date=attendance_data.date,
             attendance_records=[record.dict() for record in attendance_data.attendance],
             teacher_id=teacher_id
         )
-        if success:
-            return {"message": "Attendance marked successfully"}
+        AttendanceAnalytics.invalidate_class(attendance_data.class_id)
+        if result.ok:
+            return {"message": "Attendance marked successfully", "marked": len(result.succeeded)}
+        if result.succeeded:
+            return {
+                "message": "Attendance partially marked",
+                "marked": len(result.succeeded),
+                "failed": result.failed
+            }
         raise HTTPException(status_code=400, detail="Failed to mark attendance")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/analytics/attendance/{class_id}")
+@cache_control("private, max-age=300")
+async def get_attendance_analytics(
+    class_id: str,
+    start: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    end: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}-\d{2}$")
+):
+    """Class attendance rates, daily absentees and chronic-absence flags (defaults to the last 90 days)"""
+    try:
+        end = end or datetime.now().strftime("%Y-%m-%d")
+        start = start or (datetime.strptime(end, "%Y-%m-%d") - timedelta(days=90)).strftime("%Y-%m-%d")
+        return await async_firebase.run(AttendanceAnalytics.get_class_report, class_id, start, end)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/homework")
 async def assign_homework(
     homework_data: HomeworkData,
@@ -174,7 +208,7 @@ async def assign_homework(
 ):
     """Assign homework to a class"""
     try:
-        homework_id = FirebaseService.assign_homework(
+        homework_id = await async_firebase.assign_homework(
             class_id=homework_data.class_id,
             subject=homework_data.subject,
             due_date=homework_data.due_date,
@@ -188,35 +222,77 @@ async def assign_homework(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/homework/{homework_id}/submissions")
+async def get_homework_submissions(homework_id: str):
+    """Get submission status for a homework, keyed by student ID"""
+    try:
+        submissions = await async_firebase.get_homework_submissions(homework_id)
+        return {"submissions": submissions}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _student_account(student_data: StudentData) -> dict:
+    """create_account arguments for a student; the uid is fixed so retries are safe"""
+    return dict(
+        email=student_data.email,
+        password=student_data.password,
+        name=student_data.name,
+        role="student",
+        class_id=student_data.class_id,
+        uid=new_uid()
+    )
+
 @router.post("/add-student")
 async def add_student(
     student_data: StudentData,
-    teacher_id: str = Query(...)
+    teacher_id: str = Query(...),
+    background: bool = Query(False)
 ):
-    """Add a new student to the class"""
+    """Add a new student to the class
+    
+    With background=true the student is created by a queued job and the
+    response is a 202 carrying the job's ID; poll /jobs/{job_id} for the result.
+    """
+    from firebase_admin import auth
+    account = _student_account(student_data)
     try:
-        from firebase_admin import auth
-        
-        # Create Firebase Auth user
-        user = auth.create_user(
-            email=student_data.email,
-            password=student_data.password
-        )
+        if background:
+            job = job_queue.submit("add-student", lambda: async_firebase.create_account(**account))
+            return job_accepted(job, "Student queued")
         
-        # Create user profile
-        profile = FirebaseService.create_user_profile(
-            uid=user.uid,
-            email=student_data.email,
-            name=student_data.name,
-            role="student",
-            class_id=student_data.class_id
-        )
+        # Create the Firebase Auth user and its profile
+        user = await async_firebase.create_account(**account)
         
         return {
             "message": "Student added successfully",
-            "student_id": user.uid
+            "student_id": user["uid"]
         }
+    except QueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
     except auth.EmailAlreadyExistsError:
         raise HTTPException(status_code=400, detail="Email already exists")
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/add-students")
+async def add_students(
+    bulk_data: BulkStudentData,
+    teacher_id: str = Query(...)
+):
+    """Add many students at once (e.g. a whole class at the start of term)
+    
+    Always runs as a background job and returns a 202 carrying its ID.
+    /jobs/{job_id} reports progress, then the uid created for each email and
+    the students that could not be added.
+    """
+    accounts = [_student_account(student) for student in bulk_data.students]
+    try:
+        job = job_queue.submit_batch(
+            "add-students",
+            accounts,
+            lambda account: async_firebase.create_account(**account),
+            key=lambda account: account["email"]
+        )
+    except QueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    return job_accepted(job, f"{len(accounts)} students queued")
\ No newline at end of file
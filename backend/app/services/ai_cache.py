@@ -0,0 +1,118 @@
+import re
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+_WHITESPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = " \t\n?!.,;:"
+
+
+def normalize_question(question: str) -> str:
+    """Canonical form of a question used as a cache / coalescing key"""
+    return _WHITESPACE.sub(" ", question.lower()).strip(_EDGE_PUNCTUATION)
+
+
+class ExactAnswerCache:
+    """LRU of answers keyed by (scope, normalized question) with a TTL"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, scope: str, key: str) -> Optional[str]:
+        entry = self._entries.get((scope, key))
+        if entry is None or entry[1] < time.monotonic():
+            if entry is not None:
+                del self._entries[(scope, key)]
+            self.misses += 1
+            return None
+        self._entries.move_to_end((scope, key))
+        self.hits += 1
+        return entry[0]
+
+    def put(self, scope: str, key: str, answer: str):
+        self._entries[(scope, key)] = (answer, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end((scope, key))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+
+class SemanticAnswerCache:
+    """Per-scope store of (embedding, answer) pairs matched by cosine similarity"""
+
+    def __init__(self, max_entries_per_scope: int, ttl_seconds: float, threshold: float):
+        self.max_entries_per_scope = max_entries_per_scope
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        # scope -> OrderedDict of normalized question -> (unit vector, answer, expires_at)
+        self._scopes: Dict[str, "OrderedDict[str, Tuple[np.ndarray, str, float]]"] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _unit(embedding: List[float]) -> "np.ndarray":
+        import numpy as np
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get(self, scope: str, embedding: List[float]) -> Optional[str]:
+        entries = self._scopes.get(scope)
+        if entries:
+            now = time.monotonic()
+            for key in [k for k, (_, _, expires) in entries.items() if expires < now]:
+                del entries[key]
+            if not entries:
+                del self._scopes[scope]
+
+        if not entries:
+            self.misses += 1
+            return None
+
+        import numpy as np
+        keys = list(entries.keys())
+        matrix = np.stack([entries[k][0] for k in keys])
+        scores = matrix @ self._unit(embedding)
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            self.misses += 1
+            return None
+
+        entries.move_to_end(keys[best])
+        self.hits += 1
+        return entries[keys[best]][1]
+
+    def put(self, scope: str, key: str, embedding: List[float], answer: str):
+        entries = self._scopes.setdefault(scope, OrderedDict())
+        entries[key] = (self._unit(embedding), answer, time.monotonic() + self.ttl_seconds)
+        entries.move_to_end(key)
+        while len(entries) > self.max_entries_per_scope:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        return {
+            "scopes": len(self._scopes),
+            "entries": sum(len(entries) for entries in self._scopes.values()),
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
@@ -0,0 +1,129 @@
+from typing import Dict, List, Optional
+from app.config import get_settings
+from app.services.firebase_service import db
+from app.services.ttl_cache import TTLCache
+
+settings = get_settings()
+
+# Student-by-day matrix cell values
+PRESENT, ABSENT, UNMARKED = 1, 0, -1
+
+# (class_id, start_date, end_date) -> report; bounded, since the dates come from callers
+_report_cache = TTLCache(
+    max_entries=settings.analytics_cache_max_entries,
+    ttl_seconds=settings.analytics_cache_ttl_seconds
+)
+
+
+class AttendanceAnalytics:
+    
+    @staticmethod
+    def load_class_attendance(class_id: str, start_date: str, end_date: str) -> List[Dict]:
+        """Load a class's attendance for a date range with a single query"""
+        docs = db.collection("attendance")\
+            .where("class_id", "==", class_id)\
+            .where("date", ">=", start_date)\
+            .where("date", "<=", end_date)\
+            .select(["student_id", "student_name", "date", "status"])\
+            .stream()
+        
+        return [doc.to_dict() for doc in docs]
+    
+    @staticmethod
+    def aggregate(records: List[Dict], chronic_threshold: float = 0.9,
+                  min_marked_days: int = 5) -> Dict:
+        """Build the student-by-day matrix and derive class, daily and per-student figures"""
+        # numpy is imported here rather than at module level to keep startup fast
+        import numpy as np
+        student_ids = sorted({r["student_id"] for r in records})
+        dates = sorted({r["date"] for r in records})
+        student_index = {sid: i for i, sid in enumerate(student_ids)}
+        date_index = {d: i for i, d in enumerate(dates)}
+        names = {r["student_id"]: r.get("student_name") for r in records}
+        
+        matrix = np.full((len(student_ids), len(dates)), UNMARKED, dtype=np.int8)
+        if records:
+            rows = np.fromiter((student_index[r["student_id"]] for r in records), dtype=np.intp, count=len(records))
+            cols = np.fromiter((date_index[r["date"]] for r in records), dtype=np.intp, count=len(records))
+            values = np.fromiter(
+                (PRESENT if r.get("status") == "present" else ABSENT for r in records),
+                dtype=np.int8, count=len(records)
+            )
+            matrix[rows, cols] = values
+        
+        present = matrix == PRESENT
+        absent = matrix == ABSENT
+        
+        daily_present = present.sum(axis=0)
+        daily_absent = absent.sum(axis=0)
+        daily_marked = daily_present + daily_absent
+        daily_rate = np.divide(daily_present, daily_marked, out=np.zeros(len(dates)), where=daily_marked > 0)
+        
+        student_present = present.sum(axis=1)
+        student_absent = absent.sum(axis=1)
+        student_marked = student_present + student_absent
+        student_rate = np.divide(student_present, student_marked, out=np.zeros(len(student_ids)),
+                                 where=student_marked > 0)
+        chronic = (student_marked >= min_marked_days) & (student_rate < chronic_threshold)
+        
+        total_marked = int(student_marked.sum())
+        
+        daily = []
+        for j, date in enumerate(dates):
+            absentee_rows = np.flatnonzero(absent[:, j])
+            daily.append({
+                "date": date,
+                "present": int(daily_present[j]),
+                "absent": int(daily_absent[j]),
+                "rate": round(float(daily_rate[j]) * 100, 1),
+                "absentees": [
+                    {"student_id": student_ids[i], "name": names[student_ids[i]]}
+                    for i in absentee_rows
+                ]
+            })
+        
+        students = [
+            {
+                "student_id": sid,
+                "name": names[sid],
+                "present": int(student_present[i]),
+                "absent": int(student_absent[i]),
+                "rate": round(float(student_rate[i]) * 100, 1),
+                "chronic_absence": bool(chronic[i])
+            }
+            for i, sid in enumerate(student_ids)
+        ]
+        
+        return {
+            "class_rate": round(int(student_present.sum()) / total_marked * 100, 1) if total_marked else None,
+            "school_days": len(dates),
+            "students": students,
+            "daily": daily,
+            "chronic_absentees": [s["student_id"] for s in students if s["chronic_absence"]]
+        }
+    
+    @staticmethod
+    def get_class_report(class_id: str, start_date: str, end_date: str) -> Dict:
+        """Class attendance analytics for a date range, cached for a few minutes"""
+        key = (class_id, start_date, end_date)
+        cached = _report_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        records = AttendanceAnalytics.load_class_attendance(class_id, start_date, end_date)
+        report = {
+            "class_id": class_id,
+            "start_date": start_date,
+            "end_date": end_date,
+            **AttendanceAnalytics.aggregate(records)
+        }
+        _report_cache.set(key, report)
+        return report
+    
+    @staticmethod
+    def invalidate_class(class_id: Optional[str] = None):
+        """Drop cached reports for a class (or all classes) after attendance changes"""
+        if class_id is None:
+            _report_cache.clear()
+        else:
+            _report_cache.pop_where(lambda key: key[0] == class_id)
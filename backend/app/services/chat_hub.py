@@ -0,0 +1,63 @@
+import asyncio
+from typing import Dict, Set
+import orjson
+
+_RESYNC = orjson.dumps({"type": "resync"}).decode()
+
+
+class ChatHub:
+    """In-process fan-out of class chat events to connected WebSocket clients
+    
+    Events are encoded to JSON once per publish, not once per subscriber, and
+    queued as text. Each subscriber gets a bounded queue. A subscriber that falls too far behind
+    has its backlog replaced by a single "resync" event, telling the client to
+    re-fetch instead of letting one slow socket hold memory for the whole class.
+    """
+    
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self.published = 0
+        self.delivered = 0
+        self.resyncs = 0
+    
+    def subscribe(self, class_id: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(class_id, set()).add(queue)
+        return queue
+    
+    def unsubscribe(self, class_id: str, queue: asyncio.Queue):
+        subscribers = self._subscribers.get(class_id)
+        if subscribers is not None:
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[class_id]
+    
+    def publish(self, class_id: str, event: dict):
+        """Queue an event for every subscriber of a class; never blocks"""
+        self.published += 1
+        subscribers = self._subscribers.get(class_id)
+        if not subscribers:
+            return
+        text = orjson.dumps(event).decode()
+        for queue in subscribers:
+            try:
+                queue.put_nowait(text)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(_RESYNC)
+                self.resyncs += 1
+    
+    def stats(self) -> dict:
+        return {
+            "classes": len(self._subscribers),
+            "connections": sum(len(s) for s in self._subscribers.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "resyncs": self.resyncs
+        }
+
+
+chat_hub = ChatHub()
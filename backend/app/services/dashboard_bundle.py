@@ -0,0 +1,83 @@
+import asyncio
+from typing import Awaitable, Dict, Optional
+from app.services.firebase_service import async_firebase
+
+# Children of one parent whose reads run at the same time
+MAX_CHILDREN_IN_FLIGHT = 4
+
+
+async def gather_sections(sections: Dict[str, Awaitable]) -> Dict:
+    """Await every section concurrently
+
+    A failed section comes back as None with its error under "errors", so one
+    slow or broken read doesn't take the whole page down.
+    """
+    results = await asyncio.gather(*sections.values(), return_exceptions=True)
+    bundle, errors = {}, {}
+    for name, result in zip(sections, results):
+        if isinstance(result, Exception):
+            bundle[name] = None
+            errors[name] = str(result)
+        else:
+            bundle[name] = result
+    bundle["errors"] = errors
+    return bundle
+
+
+async def _homework_page(student_id: str, limit: int, user: Optional[Dict] = None):
+    homework, next_cursor = await async_firebase.get_student_homework(student_id, limit, None, user)
+    return {"items": homework, "next_cursor": next_cursor}
+
+
+async def _class_messages(class_id: Optional[str], limit: int):
+    if not class_id:
+        return None
+    return await async_firebase.get_class_messages(class_id, limit)
+
+
+async def get_student_bundle(student_id: str, user: Optional[Dict] = None,
+                             homework_limit: int = 20, messages_limit: int = 20):
+    """Everything the student dashboard shows, read concurrently; None if no such student"""
+    user = user or await async_firebase.get_user_profile(student_id)
+    if not user:
+        return None
+
+    return await gather_sections({
+        "dashboard": async_firebase.get_student_dashboard(student_id, user),
+        "attendance": async_firebase.get_student_attendance(student_id),
+        "attendance_summary": async_firebase.get_attendance_summary(student_id),
+        "homework": _homework_page(student_id, homework_limit, user),
+        "messages": _class_messages(user.get("class_id"), messages_limit)
+    })
+
+
+async def get_parent_bundle(parent_id: str, user: Optional[Dict] = None,
+                            homework_limit: int = 20, messages_limit: int = 20):
+    """Dashboard plus attendance, homework and class messages for every child; None if none are linked
+
+    Children are loaded concurrently, at most MAX_CHILDREN_IN_FLIGHT at a
+    time, and children sharing a class share one messages read.
+    """
+    dashboard = await async_firebase.get_parent_dashboard(parent_id, user)
+    if not dashboard:
+        return None
+
+    class_messages = {
+        class_id: asyncio.ensure_future(_class_messages(class_id, messages_limit))
+        for class_id in {child.get("class_id") for child in dashboard["children"]}
+    }
+    slots = asyncio.Semaphore(MAX_CHILDREN_IN_FLIGHT)
+
+    async def child_bundle(child: Dict):
+        child_id = child["child_id"]
+        async with slots:
+            sections = await gather_sections({
+                "attendance": async_firebase.get_child_attendance(child_id),
+                "attendance_summary": async_firebase.get_child_attendance_summary(child_id),
+                "homework": _homework_page(child_id, homework_limit),
+                "messages": class_messages[child.get("class_id")]
+            })
+        return {**child, **sections}
+
+    children = await asyncio.gather(*(child_bundle(child) for child in dashboard["children"]))
+    return {"dashboard": dashboard, "children": children}
@@ -0,0 +1,72 @@
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+
+class BoundedExecutor:
+    """Thread pool for blocking SDK calls with a cap on queued work and basic stats"""
+
+    def __init__(self, max_workers: int, max_pending: int, name: str = "blocking"):
+        self.max_workers = max_workers
+        self.max_pending = max(max_pending, max_workers)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._slots = asyncio.Semaphore(self.max_pending)
+
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """Run a blocking callable on the pool and await its result"""
+        async with self._slots:
+            submitted = time.perf_counter()
+            timing = {}
+
+            def call():
+                timing["started"] = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    timing["finished"] = time.perf_counter()
+
+            self.calls += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            try:
+                # Run in a copy of the caller's context so per-request state
+                # (e.g. Firestore accounting) follows the call into the pool
+                context = contextvars.copy_context()
+                return await asyncio.get_running_loop().run_in_executor(self._pool, context.run, call)
+            except Exception:
+                self.errors += 1
+                raise
+            finally:
+                self.in_flight -= 1
+                if "started" in timing:
+                    wait = timing["started"] - submitted
+                    self.total_wait_seconds += wait
+                    self.max_wait_seconds = max(self.max_wait_seconds, wait)
+                    self.total_run_seconds += timing.get("finished", time.perf_counter()) - timing["started"]
+
+    def stats(self) -> dict:
+        """Snapshot of pool usage"""
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "calls": self.calls,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "avg_wait_ms": round(self.total_wait_seconds / self.calls * 1000, 3) if self.calls else 0.0,
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            "avg_run_ms": round(self.total_run_seconds / self.calls * 1000, 3) if self.calls else 0.0,
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
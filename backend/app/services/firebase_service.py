@@ -1,29 +1,353 @@
 import firebase_admin
-from firebase_admin import credentials, firestore, auth
+from firebase_admin import credentials, auth, exceptions as firebase_exceptions
 from app.config import get_settings
-from datetime import datetime
-from typing import List, Dict, Optional
+from app.services import firestore_metrics
+from app.services.executor import BoundedExecutor
+from app.services.message_cache import RecentMessageCache
+from app.services.roster_cache import RosterCache
+from app.services.ttl_cache import TTLCache
+from google.api_core import exceptions as google_exceptions
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import calendar
+import contextvars
+from typing import List, Dict, Optional, Tuple
 import os
 import json
+import base64
+import random
+import secrets
+import string
+import threading
+import time
 
 settings = get_settings()
 
-# Initialize Firebase Admin FIRST
-if not firebase_admin._apps:
-    # Try to load from environment variable first (for production)
-    firebase_creds = os.getenv('FIREBASE_CREDENTIALS')
-    if firebase_creds:
-        # Production: use environment variable
-        cred_dict = json.loads(firebase_creds)
-        cred = credentials.Certificate(cred_dict)
-    else:
-        # Local development: use file
-        cred = credentials.Certificate(settings.firebase_credentials_path)
+# Firestore and Auth clients are created on first use (or by the app's startup
+# warm-up), not at import, so importing this module needs no credentials or network
+_clients: Optional[Tuple] = None
+_clients_lock = threading.Lock()
+
+
+def _create_clients() -> Tuple:
+    if settings.data_backend == "memory":
+        # In-process stand-in: no credentials or network needed
+        from app.services.memory_backend import MemoryAuth, MemoryFirestore
+        latency_seconds = settings.memory_backend_latency_ms / 1000
+        return MemoryFirestore(latency_seconds=latency_seconds), MemoryAuth(latency_seconds=latency_seconds)
+    
+    # Initialize Firebase Admin FIRST
+    if not firebase_admin._apps:
+        # Try to load from environment variable first (for production)
+        firebase_creds = os.getenv('FIREBASE_CREDENTIALS')
+        if firebase_creds:
+            # Production: use environment variable
+            cred_dict = json.loads(firebase_creds)
+            cred = credentials.Certificate(cred_dict)
+        else:
+            # Local development: use file
+            cred = credentials.Certificate(settings.firebase_credentials_path)
             
-    firebase_admin.initialize_app(cred)
+        firebase_admin.initialize_app(cred)
+    
+    # NOW get Firestore client (after initialization)
+    from firebase_admin import firestore
+    client = firestore.client()
+    if settings.request_metrics_enabled:
+        firestore_metrics.instrument_client(client)
+    return client, auth
+
+
+def init_data_backend() -> Tuple:
+    """Create the Firestore and Auth clients once; returns (db, auth_client)"""
+    global _clients
+    if _clients is None:
+        with _clients_lock:
+            if _clients is None:
+                _clients = _create_clients()
+    return _clients
+
+
+class _LazyClient:
+    """Module-level handle that forwards to a client created on first use"""
+    
+    def __init__(self, index: int):
+        self._index = index
+    
+    def __getattr__(self, name):
+        return getattr(init_data_backend()[self._index], name)
+
+
+db = _LazyClient(0)
+auth_client = _LazyClient(1)
+
+
+def warm_up_data_backend():
+    """Create the clients and make one small read, so the first request doesn't
+    pay for credentials, channel setup and the access-token fetch"""
+    client, _ = init_data_backend()
+    list(client.collection("users").limit(1).stream())
+
+
+# Blocking Firebase calls run here so they never stall the event loop
+firebase_executor = BoundedExecutor(
+    max_workers=settings.firebase_max_workers,
+    max_pending=settings.firebase_max_pending,
+    name="firebase"
+)
+
+# Hot windows of recent chat messages, written through by send/delete
+# With several workers, each one's window misses the others' writes until it
+# is reloaded; 10 s matches the chat's old polling interval
+MULTI_WORKER_MESSAGE_MAX_AGE_SECONDS = 10.0
+
+message_cache = RecentMessageCache(
+    window=settings.message_cache_window,
+    max_classes=settings.message_cache_max_classes,
+    max_messages=settings.message_cache_max_messages,
+    max_age_seconds=settings.message_cache_max_age_seconds
+    if settings.message_cache_max_age_seconds is not None
+    else (MULTI_WORKER_MESSAGE_MAX_AGE_SECONDS if settings.web_concurrency > 1 else 0.0)
+) if settings.message_cache_enabled else None
+
+# User profiles by uid; create_user_profile refreshes the entry
+profile_cache = TTLCache(
+    max_entries=settings.auth_profile_cache_max_entries,
+    ttl_seconds=settings.auth_profile_cache_ttl_seconds
+)
+
+# Class rosters; create_user_profile invalidates the student's class
+roster_cache = RosterCache(ttl_seconds=settings.roster_cache_ttl_seconds)
+
+# Firestore rejects batches larger than 500 writes
+MAX_BATCH_WRITES = 500
+
+
+# Errors worth retrying: the batch may succeed if committed again
+TRANSIENT_ERRORS = (
+    google_exceptions.Aborted,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.TooManyRequests,
+    google_exceptions.ResourceExhausted,
+)
+
+# The same conditions as reported by Firebase Auth calls (e.g. create_user)
+AUTH_TRANSIENT_ERRORS = (
+    firebase_exceptions.DeadlineExceededError,
+    firebase_exceptions.InternalError,
+    firebase_exceptions.ResourceExhaustedError,
+    firebase_exceptions.UnavailableError,
+)
+
+
+class BulkWriteResult:
+    """Per-record outcome of a BulkWriter commit"""
+    
+    def __init__(self):
+        self.succeeded: List[str] = []
+        self.failed: Dict[str, str] = {}
+        self.batches = 0
+        self.retries = 0
+    
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+    
+    def to_dict(self) -> Dict:
+        return {
+            "succeeded": len(self.succeeded),
+            "failed": self.failed,
+            "batches": self.batches,
+            "retries": self.retries
+        }
+
+
+class BulkWriter:
+    """Queues writes, splits them into size-limited batches and commits them in parallel
+    
+    Writes are grouped by record key; a record's writes always land in the same
+    batch, so each record is applied atomically and reported as one outcome.
+    """
+    
+    def __init__(self, client=None, batch_size: int = MAX_BATCH_WRITES, max_parallel: int = 4,
+                 max_retries: int = 5, base_delay: float = 0.2):
+        self.client = client or db
+        self.batch_size = batch_size
+        self.max_parallel = max_parallel
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self._records: Dict[str, List[Tuple]] = {}
+    
+    def set(self, ref, data: Dict, merge: bool = False, key: Optional[str] = None):
+        self._records.setdefault(key or ref.path, []).append(("set", ref, data, merge))
+    
+    def update(self, ref, data: Dict, key: Optional[str] = None):
+        self._records.setdefault(key or ref.path, []).append(("update", ref, data, None))
+    
+    def delete(self, ref, key: Optional[str] = None):
+        self._records.setdefault(key or ref.path, []).append(("delete", ref, None, None))
+    
+    def __len__(self):
+        return sum(len(ops) for ops in self._records.values())
+    
+    def commit(self) -> BulkWriteResult:
+        """Commit every queued write and return per-record outcomes
+        
+        A record with more writes than fit in one batch can't be applied
+        atomically, so it is reported as failed without being written.
+        """
+        result = BulkWriteResult()
+        for key, ops in list(self._records.items()):
+            if len(ops) > self.batch_size:
+                result.failed[key] = f"{len(ops)} writes in one record; a batch holds at most {self.batch_size}"
+                del self._records[key]
+        chunks = self._chunks()
+        self._records = {}
+        result.batches = len(chunks)
+        
+        if len(chunks) <= 1 or self.max_parallel <= 1:
+            outcomes = [self._commit_chunk(chunk) for chunk in chunks]
+        else:
+            # Each chunk runs in a copy of this thread's context so its writes
+            # are still accounted to the request that made them
+            contexts = [contextvars.copy_context() for _ in chunks]
+            with ThreadPoolExecutor(max_workers=min(self.max_parallel, len(chunks))) as pool:
+                outcomes = list(pool.map(lambda context, chunk: context.run(self._commit_chunk, chunk),
+                                         contexts, chunks))
+        
+        for chunk, (error, retries) in zip(chunks, outcomes):
+            result.retries += retries
+            for key, _ in chunk:
+                if error is None:
+                    result.succeeded.append(key)
+                else:
+                    result.failed[key] = error
+        return result
+    
+    def _chunks(self) -> List[List[Tuple[str, List[Tuple]]]]:
+        chunks, current, size = [], [], 0
+        for key, ops in self._records.items():
+            if current and size + len(ops) > self.batch_size:
+                chunks.append(current)
+                current, size = [], 0
+            current.append((key, ops))
+            size += len(ops)
+        if current:
+            chunks.append(current)
+        return chunks
+    
+    def _commit_chunk(self, chunk) -> Tuple[Optional[str], int]:
+        """Commit one batch, retrying transient errors; returns (error or None, retries)"""
+        attempt = 0
+        while True:
+            batch = self.client.batch()
+            for _, ops in chunk:
+                for kind, ref, data, merge in ops:
+                    if kind == "set":
+                        batch.set(ref, data, merge=merge)
+                    elif kind == "update":
+                        batch.update(ref, data)
+                    else:
+                        batch.delete(ref)
+            try:
+                batch.commit()
+                return None, attempt
+            except TRANSIENT_ERRORS as e:
+                if attempt >= self.max_retries:
+                    return str(e), attempt
+                time.sleep(self.base_delay * (2 ** attempt) * (0.5 + random.random()))
+                attempt += 1
+            except Exception as e:
+                return str(e), attempt
+
+
+def new_uid() -> str:
+    """Random 28-character uid in the same alphabet Firebase Auth uses"""
+    alphabet = string.ascii_letters + string.digits
+    return "".join(secrets.choice(alphabet) for _ in range(28))
+
+
+def attendance_doc_id(class_id: str, date: str, student_id: str) -> str:
+    """Deterministic attendance document ID: one document per student per class day"""
+    return f"{class_id}_{date}_{student_id}"
+
+
+def encode_message_cursor(timestamp: datetime, message_id: str) -> str:
+    """Opaque chat cursor: a message's (timestamp, document ID) position"""
+    raw = json.dumps({"t": timestamp.isoformat(), "id": message_id})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_message_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Inverse of encode_message_cursor; raises ValueError on a malformed cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        return datetime.fromisoformat(data["t"]), data["id"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+# Monthly rollups: one char per day of the month, "P" present, "A" absent, "-" not marked
+ROLLUP_STATUS_CODES = {"present": "P", "absent": "A"}
+
+
+# Longest range of months an attendance summary covers
+MAX_SUMMARY_MONTHS = 24
+
+
+def _parse_month(value: str) -> Tuple[int, int]:
+    """(year, month) from YYYY-MM; raises ValueError for anything else"""
+    try:
+        year, month = (int(part) for part in value.split("-"))
+    except ValueError:
+        raise ValueError(f"Invalid month: {value}")
+    if not 1 <= month <= 12:
+        raise ValueError(f"Invalid month: {value}")
+    return year, month
+
+
+def attendance_rollup_id(student_id: str, month: str) -> str:
+    """Rollup document ID for a student and a YYYY-MM month"""
+    return f"{student_id}_{month}"
+
+
+def apply_rollup_day(days: Optional[str], date: str, status: str) -> str:
+    """Return the month's day string with one day set to status"""
+    year, month, day = (int(part) for part in date.split("-"))
+    length = calendar.monthrange(year, month)[1]
+    days = (days or "").ljust(length, "-")[:length]
+    code = ROLLUP_STATUS_CODES.get(status.lower(), "-")
+    return days[:day - 1] + code + days[day:]
+
+
+def rollup_doc(student_id: str, class_id: str, month: str, days: str) -> Dict:
+    """Full rollup document; counts are derived from the day string so rewrites stay consistent"""
+    return {
+        "student_id": student_id,
+        "class_id": class_id,
+        "month": month,
+        "days": days,
+        "present": days.count("P"),
+        "absent": days.count("A"),
+        "updated_at": datetime.now()
+    }
+
+
+def _homework_index_item(homework_id: str, data: Dict, submitted: bool) -> Dict:
+    """Per-student homework index entry; sort_key orders by due date with a stable tiebreak"""
+    return {
+        "homework_id": homework_id,
+        "class_id": data.get("class_id"),
+        "subject": data.get("subject"),
+        "due_date": data.get("due_date"),
+        "description": data.get("description", ""),
+        "submitted": submitted,
+        "sort_key": f"{data.get('due_date')}|{homework_id}"
+    }
 
-# NOW get Firestore client (after initialization)
-db = firestore.client()
 
 class FirebaseService:
     
@@ -48,48 +372,141 @@ class FirebaseService:
             user_data["parent_id"] = parent_id
             
         db.collection("users").document(uid).set(user_data)
+        profile_cache.pop(uid)
+        if role == "student" and class_id:
+            roster_cache.invalidate(class_id)
+            FirebaseService.build_student_homework_index(uid, class_id)
+        if role == "student" and parent_id:
+            FirebaseService.link_child_to_parent(parent_id, uid)
+        if role == "parent":
+            FirebaseService.link_existing_children(uid)
         return user_data
     
+    @staticmethod
+    def create_account(email: str, password: str, name: str, role: str,
+                       class_id: Optional[str] = None,
+                       parent_id: Optional[str] = None,
+                       uid: Optional[str] = None):
+        """Create the Firebase Auth user and its profile
+        
+        The uid is chosen here rather than by Firebase, so calling again with
+        the same uid after a failed profile write picks up the existing
+        account instead of failing with EmailAlreadyExistsError.
+        """
+        uid = uid or new_uid()
+        try:
+            user = auth_client.create_user(uid=uid, email=email, password=password)
+        except auth.EmailAlreadyExistsError:
+            user = auth_client.get_user_by_email(email)
+            if user.uid != uid:
+                raise
+        FirebaseService.create_user_profile(
+            uid=uid,
+            email=email,
+            name=name,
+            role=role,
+            class_id=class_id,
+            parent_id=parent_id
+        )
+        return {"uid": uid, "email": user.email}
+    
+    @staticmethod
+    def link_existing_children(parent_id: str):
+        """Backfill child_ids for children registered before the parent's profile existed
+        
+        link_child_to_parent skips those (there was no profile to update), and
+        once a later child sets child_ids the dashboard stops querying by
+        parent_id. Runs after the profile is written, so a child registering
+        concurrently is either found here or links itself.
+        """
+        from firebase_admin import firestore
+        child_ids = [doc.id for doc in db.collection("users")\
+            .where("parent_id", "==", parent_id)\
+            .where("role", "==", "student")\
+            .select(["uid"])\
+            .stream()]
+        if child_ids:
+            db.collection("users").document(parent_id).update({
+                "child_ids": firestore.ArrayUnion(child_ids)
+            })
+            profile_cache.pop(parent_id)
+    
+    @staticmethod
+    def link_child_to_parent(parent_id: str, child_id: str):
+        """Record the child on the parent's profile so the dashboard can batch-load children"""
+        from firebase_admin import firestore
+        try:
+            db.collection("users").document(parent_id).update({
+                "child_ids": firestore.ArrayUnion([child_id])
+            })
+        except google_exceptions.NotFound:
+            # Parent has no profile yet; the dashboard falls back to querying by parent_id
+            return
+        profile_cache.pop(parent_id)
+    
     @staticmethod
     def get_user_profile(uid: str):
-        """Get user profile from Firestore"""
+        """Get user profile, from the short-lived profile cache when possible"""
+        profile = profile_cache.get(uid)
+        if profile is not None:
+            return profile
+        
         doc = db.collection("users").document(uid).get()
         if doc.exists:
-            return doc.to_dict()
+            profile = doc.to_dict()
+            profile_cache.set(uid, profile)
+            return profile
         return None
     
+    @staticmethod
+    def update_user_profile(uid: str, name: str):
+        """Change the editable fields of a profile and drop every cached copy of it"""
+        db.collection("users").document(uid).update({
+            "name": name,
+            "updated_at": datetime.now()
+        })
+        FirebaseService.invalidate_user_profile(uid)
+        profile = FirebaseService.get_user_profile(uid)
+        # Rosters carry student names
+        if profile and profile.get("role") == "student" and profile.get("class_id"):
+            roster_cache.invalidate(profile["class_id"])
+        return profile
+    
+    @staticmethod
+    def invalidate_user_profile(uid: Optional[str] = None):
+        """Forget a cached profile (or all of them) after it changes outside this service"""
+        if uid is None:
+            profile_cache.clear()
+        else:
+            profile_cache.pop(uid)
+    
     # ==================== STUDENT OPERATIONS ====================
     
     @staticmethod
-    def get_student_dashboard(student_id: str):
-        """Get student dashboard data"""
-        user = FirebaseService.get_user_profile(student_id)
+    def get_student_dashboard(student_id: str, user: Optional[Dict] = None):
+        """Get student dashboard data; pass the student's profile if already loaded"""
+        user = user or FirebaseService.get_user_profile(student_id)
         if not user:
             return None
         
         # Get today's attendance
         today = datetime.now().strftime("%Y-%m-%d")
-        attendance_query = db.collection("attendance")\
-            .where("student_id", "==", student_id)\
-            .where("date", "==", today)\
-            .limit(1)\
-            .stream()
+        attendance_doc = db.collection("attendance")\
+            .document(attendance_doc_id(user.get("class_id"), today, student_id))\
+            .get()
         
         today_attendance = "Not Marked"
-        for doc in attendance_query:
-            today_attendance = doc.to_dict().get("status", "Not Marked").capitalize()
-        
-        # Get pending homework count
-        homework_query = db.collection("homework")\
-            .where("class_id", "==", user.get("class_id"))\
-            .stream()
+        if attendance_doc.exists:
+            today_attendance = attendance_doc.to_dict().get("status", "Not Marked").capitalize()
         
-        pending_count = 0
-        for hw in homework_query:
-            hw_data = hw.to_dict()
-            submissions = hw_data.get("submissions", {})
-            if student_id not in submissions or not submissions[student_id].get("submitted"):
-                pending_count += 1
+        # Get pending homework count from the student's homework index
+        index_doc = db.collection("student_homework").document(student_id).get()
+        if index_doc.exists:
+            pending_count = index_doc.to_dict().get("pending_count", 0)
+        else:
+            pending_count = FirebaseService.build_student_homework_index(
+                student_id, user.get("class_id")
+            )
         
         return {
             "name": user.get("name"),
@@ -101,6 +518,7 @@ class FirebaseService:
     @staticmethod
     def get_student_attendance(student_id: str):
         """Get student attendance history"""
+        from firebase_admin import firestore
         attendance_docs = db.collection("attendance")\
             .where("student_id", "==", student_id)\
             .order_by("date", direction=firestore.Query.DESCENDING)\
@@ -118,51 +536,258 @@ class FirebaseService:
         return attendance_list
     
     @staticmethod
-    def get_student_homework(student_id: str):
-        """Get homework for student's class"""
-        user = FirebaseService.get_user_profile(student_id)
-        if not user:
-            return []
+    def get_attendance_summary(student_id: str, start_month: Optional[str] = None,
+                               end_month: Optional[str] = None):
+        """Attendance totals, percentage and streaks over a range of YYYY-MM months
         
-        homework_docs = db.collection("homework")\
-            .where("class_id", "==", user.get("class_id"))\
-            .order_by("due_date")\
-            .stream()
+        Defaults to the twelve months ending this month. Raises ValueError for
+        an invalid month, a start after the end, or more than
+        MAX_SUMMARY_MONTHS months.
+        """
+        end_month = end_month or datetime.now().strftime("%Y-%m")
+        end_year, end_month_number = _parse_month(end_month)
+        if not start_month:
+            year, month = (end_year, end_month_number - 11) if end_month_number > 11 \
+                else (end_year - 1, end_month_number + 1)
+            start_month = f"{year:04d}-{month:02d}"
+        
+        year, month = _parse_month(start_month)
+        span = (end_year - year) * 12 + end_month_number - month + 1
+        if span < 1:
+            raise ValueError(f"start {start_month} is after end {end_month}")
+        if span > MAX_SUMMARY_MONTHS:
+            raise ValueError(f"Range covers {span} months; at most {MAX_SUMMARY_MONTHS} are allowed")
+        
+        months = []
+        for _ in range(span):
+            months.append(f"{year:04d}-{month:02d}")
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        
+        refs = [db.collection("attendance_rollups").document(attendance_rollup_id(student_id, m))
+                for m in months]
+        rollups = {}
+        for doc in db.get_all(refs):
+            if doc.exists:
+                data = doc.to_dict()
+                rollups[data.get("month")] = data
+        
+        present = absent = 0
+        current_streak = longest_streak = 0
+        breakdown = []
+        for m in months:
+            data = rollups.get(m)
+            if not data:
+                continue
+            present += data.get("present", 0)
+            absent += data.get("absent", 0)
+            breakdown.append({
+                "month": m,
+                "present": data.get("present", 0),
+                "absent": data.get("absent", 0),
+                "days": data.get("days", "")
+            })
+            for code in data.get("days", ""):
+                if code == "P":
+                    current_streak += 1
+                    longest_streak = max(longest_streak, current_streak)
+                elif code == "A":
+                    current_streak = 0
+        
+        marked = present + absent
+        return {
+            "student_id": student_id,
+            "start_month": start_month,
+            "end_month": end_month,
+            "present": present,
+            "absent": absent,
+            "percentage": round(present / marked * 100, 1) if marked else None,
+            "current_streak": current_streak,
+            "longest_streak": longest_streak,
+            "months": breakdown
+        }
+    
+    @staticmethod
+    def get_student_homework(student_id: str, limit: int = 100, cursor: Optional[str] = None,
+                             user: Optional[Dict] = None):
+        """Get a page of homework for a student from their homework index"""
+        query = db.collection("student_homework").document(student_id)\
+            .collection("items")\
+            .order_by("sort_key")
+        if cursor:
+            query = query.start_after({"sort_key": cursor})
+        
+        docs = list(query.limit(limit + 1).stream())
+        
+        if not docs and not cursor:
+            # Index not built yet for this student (pre-index data)
+            if db.collection("student_homework").document(student_id).get().exists:
+                return [], None
+            user = user or FirebaseService.get_user_profile(student_id)
+            if not user or not user.get("class_id"):
+                return [], None
+            FirebaseService.build_student_homework_index(student_id, user.get("class_id"))
+            docs = list(query.limit(limit + 1).stream())
         
         homework_list = []
-        for doc in homework_docs:
+        for doc in docs[:limit]:
             data = doc.to_dict()
-            submissions = data.get("submissions", {})
-            submitted = submissions.get(student_id, {}).get("submitted", False)
-            
             homework_list.append({
-                "id": doc.id,
+                "id": data.get("homework_id", doc.id),
                 "subject": data.get("subject"),
                 "due_date": data.get("due_date"),
                 "description": data.get("description", ""),
-                "submitted": submitted
+                "submitted": data.get("submitted", False)
             })
         
-        return homework_list
+        next_cursor = docs[limit - 1].to_dict().get("sort_key") if len(docs) > limit else None
+        return homework_list, next_cursor
     
     @staticmethod
     def mark_homework_submitted(homework_id: str, student_id: str):
-        """Mark homework as submitted"""
+        """Mark homework as submitted and update the student's homework index"""
+        from firebase_admin import firestore
         hw_ref = db.collection("homework").document(homework_id)
-        hw_ref.update({
-            f"submissions.{student_id}": {
+        index_ref = db.collection("student_homework").document(student_id)
+        item_ref = index_ref.collection("items").document(homework_id)
+        submitted_at = datetime.now()
+        # Set when the student has no index yet: one item alone would hide the rest
+        unindexed_class = {}
+        
+        @firestore.transactional
+        def submit(transaction):
+            unindexed_class.clear()
+            item = item_ref.get(transaction=transaction)
+            if item.exists and item.to_dict().get("submitted"):
+                return True
+            
+            if item.exists:
+                transaction.update(item_ref, {"submitted": True, "submitted_at": submitted_at})
+                transaction.set(index_ref, {
+                    "pending_count": firestore.Increment(-1),
+                    "updated_at": submitted_at
+                }, merge=True)
+            else:
+                hw = hw_ref.get(transaction=transaction)
+                if not hw.exists:
+                    return False
+                if not index_ref.get(transaction=transaction).exists:
+                    unindexed_class["class_id"] = hw.to_dict().get("class_id")
+                entry = _homework_index_item(homework_id, hw.to_dict(), True)
+                entry["submitted_at"] = submitted_at
+                transaction.set(item_ref, entry)
+            
+            # One document per submission: no shared write hotspot on the homework doc
+            transaction.set(hw_ref.collection("submissions").document(student_id), {
+                "student_id": student_id,
                 "submitted": True,
-                "submitted_at": datetime.now()
-            }
-        })
-        return True
+                "submitted_at": submitted_at
+            })
+            return True
+        
+        found = submit(db.transaction())
+        if unindexed_class.get("class_id"):
+            FirebaseService.build_student_homework_index(student_id, unindexed_class["class_id"])
+        return found
+    
+    # ==================== HOMEWORK INDEX ====================
+    # student_homework/{student_id} holds pending_count; its items subcollection
+    # holds one entry per homework so student reads never scan the class.
+    
+    @staticmethod
+    def build_student_homework_index(student_id: str, class_id: str):
+        """(Re)build one student's homework index from the homework collection"""
+        homework = [(doc.id, doc.to_dict()) for doc in db.collection("homework")\
+            .where("class_id", "==", class_id)\
+            .stream()]
+        
+        # One batched read for this student's submission docs across all homework
+        submission_refs = [
+            db.collection("homework").document(homework_id).collection("submissions").document(student_id)
+            for homework_id, _ in homework
+        ]
+        submitted = {
+            (doc.reference.parent.parent.id, student_id)
+            for doc in db.get_all(submission_refs)
+            if doc.exists and doc.to_dict().get("submitted")
+        } if submission_refs else set()
+        
+        return FirebaseService._write_homework_index(
+            [student_id], class_id, homework, submitted
+        )[student_id]
+    
+    @staticmethod
+    def rebuild_class_homework_index(class_id: str, student_ids: Optional[List[str]] = None):
+        """(Re)build the homework index for every student in a class, or just the given ones"""
+        if student_ids is None:
+            student_ids = [s["id"] for s in FirebaseService._query_students_by_class(class_id)]
+        homework = [(doc.id, doc.to_dict()) for doc in db.collection("homework")\
+            .where("class_id", "==", class_id)\
+            .stream()]
+        
+        submitted = set()
+        for homework_id, _ in homework:
+            submission_docs = db.collection("homework").document(homework_id)\
+                .collection("submissions")\
+                .where("submitted", "==", True)\
+                .stream()
+            submitted.update((homework_id, doc.id) for doc in submission_docs)
+        
+        return FirebaseService._write_homework_index(student_ids, class_id, homework, submitted)
+    
+    @staticmethod
+    def _write_homework_index(student_ids: List[str], class_id: str,
+                              homework: List[Tuple[str, Dict]],
+                              submitted_pairs: set) -> Dict[str, int]:
+        """Write index items and absolute pending counts; safe to re-run
+        
+        Items are written first, each as its own record so a class with more
+        homework than fits in one batch still indexes. A student's index doc
+        (pending_count) is only written once all of their items landed.
+        """
+        writer = BulkWriter()
+        pending_counts = {}
+        
+        for student_id in student_ids:
+            index_ref = db.collection("student_homework").document(student_id)
+            pending = 0
+            for homework_id, data in homework:
+                # Homework created before submissions moved out still carries the map
+                legacy = data.get("submissions", {}).get(student_id, {}).get("submitted", False)
+                submitted = legacy or (homework_id, student_id) in submitted_pairs
+                if not submitted:
+                    pending += 1
+                writer.set(
+                    index_ref.collection("items").document(homework_id),
+                    _homework_index_item(homework_id, data, submitted),
+                    merge=True,
+                    key=f"{student_id}/{homework_id}"
+                )
+            pending_counts[student_id] = pending
+        
+        result = writer.commit()
+        failed = {key.split("/", 1)[0] for key in result.failed}
+        
+        for student_id in student_ids:
+            if student_id in failed:
+                continue
+            writer.set(db.collection("student_homework").document(student_id), {
+                "student_id": student_id,
+                "class_id": class_id,
+                "pending_count": pending_counts[student_id],
+                "updated_at": datetime.now()
+            }, key=student_id)
+        failed.update(writer.commit().failed)
+        
+        if failed:
+            raise RuntimeError(f"Homework index write failed for {sorted(failed)}")
+        return pending_counts
     
     # ==================== TEACHER OPERATIONS ====================
     
     @staticmethod
-    def get_teacher_dashboard(teacher_id: str):
-        """Get teacher dashboard data"""
-        user = FirebaseService.get_user_profile(teacher_id)
+    def get_teacher_dashboard(teacher_id: str, user: Optional[Dict] = None):
+        """Get teacher dashboard data; pass the teacher's profile if already loaded"""
+        user = user or FirebaseService.get_user_profile(teacher_id)
         if not user:
             return None
         
@@ -173,7 +798,17 @@ class FirebaseService:
     
     @staticmethod
     def get_students_by_class(class_id: str):
-        """Get all students in a class"""
+        """Get all students in a class (cached roster; write paths query directly)"""
+        students, _ = roster_cache.load(class_id, FirebaseService._query_students_by_class)
+        return students
+    
+    @staticmethod
+    def get_class_roster(class_id: str):
+        """Students in a class with the roster's ETag"""
+        return roster_cache.load(class_id, FirebaseService._query_students_by_class)
+    
+    @staticmethod
+    def _query_students_by_class(class_id: str):
         students_query = db.collection("users")\
             .where("role", "==", "student")\
             .where("class_id", "==", class_id)\
@@ -192,61 +827,147 @@ class FirebaseService:
     
     @staticmethod
     def mark_attendance(class_id: str, date: str, attendance_records: List[Dict], teacher_id: str):
-        """Mark attendance for multiple students"""
-        batch = db.batch()
+        """Mark attendance for multiple students; re-marking a day overwrites it"""
+        writer = BulkWriter()
+        marked_at = datetime.now()
+        month = date[:7]
+        
+        # One batched read for every student's rollup of this month. Two teachers
+        # marking the same class and month at once can race here; re-running
+        # `migrate.py attendance-rollups` rebuilds rollups from the attendance docs.
+        rollup_refs = {
+            record["student_id"]: db.collection("attendance_rollups")
+                .document(attendance_rollup_id(record["student_id"], month))
+            for record in attendance_records
+        }
+        rollup_days = {
+            doc.to_dict().get("student_id"): doc.to_dict().get("days")
+            for doc in db.get_all(list(rollup_refs.values())) if doc.exists
+        } if rollup_refs else {}
         
         for record in attendance_records:
-            attendance_ref = db.collection("attendance").document()
-            batch.set(attendance_ref, {
+            attendance_ref = db.collection("attendance").document(
+                attendance_doc_id(class_id, date, record["student_id"])
+            )
+            writer.set(attendance_ref, {
                 "student_id": record["student_id"],
                 "student_name": record["student_name"],
                 "class_id": class_id,
                 "date": date,
                 "status": record["status"],
                 "marked_by": teacher_id,
-                "marked_at": datetime.now()
-            })
+                "marked_at": marked_at
+            }, key=record["student_id"])
+            
+            # Same key as the attendance write, so both land in the same batch
+            days = apply_rollup_day(rollup_days.get(record["student_id"]), date, record["status"])
+            writer.set(
+                rollup_refs[record["student_id"]],
+                rollup_doc(record["student_id"], class_id, month, days),
+                key=record["student_id"]
+            )
         
-        batch.commit()
-        return True
+        return writer.commit()
     
     @staticmethod
     def assign_homework(class_id: str, subject: str, due_date: str, 
                        description: str, teacher_id: str):
-        """Assign homework to a class"""
+        """Assign homework to a class and add it to each student's homework index"""
+        from firebase_admin import firestore
         hw_ref = db.collection("homework").document()
-        hw_ref.set({
+        hw_data = {
             "class_id": class_id,
             "subject": subject,
             "due_date": due_date,
             "description": description,
             "assigned_by": teacher_id,
-            "assigned_date": datetime.now().strftime("%Y-%m-%d"),
-            "submissions": {}
-        })
+            "assigned_date": datetime.now().strftime("%Y-%m-%d")
+        }
+        entry = _homework_index_item(hw_ref.id, hw_data, False)
+        # Uncached: a student enrolled on another worker inside the roster TTL
+        # would otherwise never get this homework in their index
+        students = FirebaseService._query_students_by_class(class_id)
+        
+        # An existing index doc means a complete index. Students without one
+        # (pre-index data) must not get an index doc holding only this homework
+        index_refs = [db.collection("student_homework").document(s["id"]) for s in students]
+        indexed = {doc.id for doc in db.get_all(index_refs) if doc.exists} if index_refs else set()
+        
+        # Homework doc + 2 writes per indexed student. A class under ~250 students
+        # fits in one batch and lands atomically; larger ones are split into
+        # batches that can fail independently, which is handled below
+        writer = BulkWriter()
+        writer.set(hw_ref, hw_data)
+        for student_id in (s["id"] for s in students if s["id"] in indexed):
+            index_ref = db.collection("student_homework").document(student_id)
+            writer.set(index_ref.collection("items").document(hw_ref.id), entry, key=student_id)
+            writer.set(index_ref, {
+                "student_id": student_id,
+                "class_id": class_id,
+                "pending_count": firestore.Increment(1),
+                "updated_at": datetime.now()
+            }, merge=True, key=student_id)
+        
+        result = writer.commit()
+        if hw_ref.path in result.failed:
+            raise RuntimeError(result.failed[hw_ref.path])
+        
+        # Full builds for students without an index and for those whose batch
+        # failed (their index doc exists, so no read would ever repair it).
+        # The builds read the homework doc committed above; a failure raises
+        rebuild = [s["id"] for s in students if s["id"] not in indexed or s["id"] in result.failed]
+        if rebuild:
+            FirebaseService.rebuild_class_homework_index(class_id, rebuild)
         return hw_ref.id
     
+    @staticmethod
+    def get_homework_submissions(homework_id: str):
+        """Get submissions for a homework, keyed by student ID"""
+        hw_ref = db.collection("homework").document(homework_id)
+        
+        # Legacy homework docs embed a submissions map; submission docs take precedence
+        hw = hw_ref.get()
+        submissions = dict(hw.to_dict().get("submissions", {})) if hw.exists else {}
+        for doc in hw_ref.collection("submissions").stream():
+            submissions[doc.id] = doc.to_dict()
+        
+        return submissions
+    
     # ==================== PARENT OPERATIONS ====================
     
     @staticmethod
-    def get_parent_dashboard(parent_id: str):
-        """Get parent dashboard with child info"""
-        # Find child linked to parent
-        children_query = db.collection("users")\
-            .where("parent_id", "==", parent_id)\
-            .where("role", "==", "student")\
-            .limit(1)\
-            .stream()
+    def get_parent_dashboard(parent_id: str, user: Optional[Dict] = None):
+        """Get parent dashboard with every linked child
+        
+        The first child (by name) is also returned at the top level for
+        clients that only show one.
+        """
+        user = user or FirebaseService.get_user_profile(parent_id)
+        child_ids = (user or {}).get("child_ids")
         
-        for doc in children_query:
+        if child_ids:
+            refs = [db.collection("users").document(child_id) for child_id in child_ids]
+            docs = [doc for doc in db.get_all(refs) if doc.exists]
+        else:
+            # Parents linked before child_ids was kept on the profile
+            docs = db.collection("users")\
+                .where("parent_id", "==", parent_id)\
+                .where("role", "==", "student")\
+                .stream()
+        
+        children = []
+        for doc in docs:
             child_data = doc.to_dict()
-            return {
+            children.append({
                 "child_name": child_data.get("name"),
                 "child_id": child_data.get("uid"),
                 "class_id": child_data.get("class_id")
-            }
+            })
         
-        return None
+        if not children:
+            return None
+        children.sort(key=lambda child: child["child_name"] or "")
+        return {**children[0], "children": children}
     
     @staticmethod
     def get_child_attendance(child_id: str):
@@ -254,6 +975,152 @@ class FirebaseService:
         return FirebaseService.get_student_attendance(child_id)
     
     @staticmethod
-    def get_child_homework(child_id: str):
+    def get_child_attendance_summary(child_id: str, start_month: Optional[str] = None,
+                                     end_month: Optional[str] = None):
+        """Get child's attendance summary (for parent)"""
+        return FirebaseService.get_attendance_summary(child_id, start_month, end_month)
+    
+    @staticmethod
+    def get_child_homework(child_id: str, limit: int = 100, cursor: Optional[str] = None):
         """Get child's homework status (for parent)"""
-        return FirebaseService.get_student_homework(child_id)
+        return FirebaseService.get_student_homework(child_id, limit, cursor)
+
+    
+    # ==================== MESSAGE OPERATIONS ====================
+    
+    @staticmethod
+    def get_class_messages(class_id: str, limit: int = 50, since: Optional[str] = None,
+                           before: Optional[str] = None):
+        """Get a page of class messages, oldest first
+        
+        With no cursor the latest messages are returned. `since` returns only
+        messages newer than that cursor, `before` pages further back in history.
+        Pass the returned since_cursor / before_cursor to continue either way.
+        Served from the class's in-memory window whenever it covers the page.
+        """
+        since_position = decode_message_cursor(since) if since else None
+        before_position = decode_message_cursor(before) if before else None
+        
+        result = None
+        if message_cache is not None:
+            result = message_cache.page(
+                class_id, limit, since_position, before_position,
+                load=lambda size: FirebaseService._query_class_messages(class_id, size)
+            )
+        if result is None:
+            result = FirebaseService._query_class_messages(class_id, limit, since_position, before_position)
+        messages, has_more = result
+        newer = since is not None
+        
+        if messages:
+            since_cursor = encode_message_cursor(messages[-1]["timestamp"], messages[-1]["id"])
+        else:
+            since_cursor = since
+        before_cursor = None
+        if messages and not newer and has_more:
+            before_cursor = encode_message_cursor(messages[0]["timestamp"], messages[0]["id"])
+        
+        return {
+            "messages": messages,
+            "since_cursor": since_cursor,
+            "before_cursor": before_cursor,
+            "has_more": has_more
+        }
+    
+    @staticmethod
+    def _query_class_messages(class_id: str, limit: int, since: Optional[Tuple] = None,
+                              before: Optional[Tuple] = None):
+        """Query a page of messages from Firestore; returns (messages oldest first, has_more)"""
+        from firebase_admin import firestore
+        newer = since is not None
+        cursor = since if newer else before
+        direction = firestore.Query.ASCENDING if newer else firestore.Query.DESCENDING
+        
+        query = db.collection("messages")\
+            .where("class_id", "==", class_id)\
+            .order_by("timestamp", direction=direction)\
+            .order_by("__name__", direction=direction)
+        if cursor:
+            query = query.start_after({"timestamp": cursor[0], "__name__": cursor[1]})
+        
+        docs = list(query.limit(limit + 1).stream())
+        has_more = len(docs) > limit
+        docs = docs[:limit]
+        if not newer:
+            docs.reverse()
+        
+        return [FirebaseService._message_entry(doc.id, doc.to_dict()) for doc in docs], has_more
+    
+    @staticmethod
+    def _message_entry(message_id: str, data: Dict) -> Dict:
+        return {
+            "id": message_id,
+            "sender_id": data.get("sender_id"),
+            "sender_name": data.get("sender_name"),
+            "sender_role": data.get("sender_role"),
+            "message": data.get("message"),
+            "timestamp": data.get("timestamp")
+        }
+    
+    @staticmethod
+    def send_message(class_id: str, sender_id: str, sender_name: str,
+                     sender_role: str, message: str):
+        """Store a class message and return it with its ID"""
+        message_ref = db.collection("messages").document()
+        data = {
+            "class_id": class_id,
+            "sender_id": sender_id,
+            "sender_name": sender_name,
+            "sender_role": sender_role,
+            "message": message,
+            "timestamp": datetime.now(timezone.utc)
+        }
+        message_ref.set(data)
+        
+        if message_cache is not None:
+            message_cache.add(class_id, FirebaseService._message_entry(message_ref.id, data))
+        return {"id": message_ref.id, **data}
+    
+    @staticmethod
+    def get_message(message_id: str):
+        """Get a single message"""
+        doc = db.collection("messages").document(message_id).get()
+        if doc.exists:
+            return doc.to_dict()
+        return None
+    
+    @staticmethod
+    def delete_message(message_id: str, class_id: Optional[str] = None):
+        """Delete a message"""
+        db.collection("messages").document(message_id).delete()
+        
+        if message_cache is not None:
+            message_cache.remove(message_id, class_id)
+        return True
+
+
+class AsyncFirebaseService:
+    """Awaitable view of FirebaseService; every call runs on firebase_executor"""
+    
+    def __getattr__(self, name: str):
+        method = getattr(FirebaseService, name)
+        
+        async def call(*args, **kwargs):
+            return await firebase_executor.run(method, *args, **kwargs)
+        
+        call.__name__ = name
+        return call
+    
+    async def get_user_profile(self, uid: str):
+        """Cached profiles are returned without a trip through the executor"""
+        profile = profile_cache.get(uid)
+        if profile is not None:
+            return profile
+        return await firebase_executor.run(FirebaseService.get_user_profile, uid)
+    
+    async def run(self, fn, *args, **kwargs):
+        """Run any other blocking Firebase call (e.g. auth.create_user) off the event loop"""
+        return await firebase_executor.run(fn, *args, **kwargs)
+
+
+async_firebase = AsyncFirebaseService()
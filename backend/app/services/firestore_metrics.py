@@ -0,0 +1,169 @@
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterable, Optional
+from app.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger("learnage.firestore")
+
+# Calls at least this slow are logged; 0 turns the slow-call log off
+SLOW_CALL_SECONDS = settings.firestore_slow_call_ms / 1000
+
+
+class RequestCost:
+    """Firestore usage of one request; shared by every thread working on it"""
+
+    def __init__(self, path: str = ""):
+        self.path = path
+        self.reads = 0
+        self.writes = 0
+        self.queries = 0
+        self.calls = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, reads: int, writes: int, queries: int, seconds: float):
+        with self._lock:
+            self.reads += reads
+            self.writes += writes
+            self.queries += queries
+            self.calls += 1
+            self.seconds += seconds
+
+
+# Set by the request middleware; BoundedExecutor copies it into worker threads
+_current_cost: ContextVar[Optional[RequestCost]] = ContextVar("firestore_request_cost", default=None)
+
+
+def begin_request(path: str):
+    """Start accounting for a request; returns (cost, token for end_request)"""
+    cost = RequestCost(path)
+    return cost, _current_cost.set(cost)
+
+
+def end_request(token):
+    _current_cost.reset(token)
+
+
+class OperationTotals:
+    """Process-wide calls and time per Firestore operation"""
+
+    def __init__(self):
+        self._operations: Dict[str, list] = {}
+        self.slow_calls = 0
+        self._lock = threading.Lock()
+
+    def add(self, operation: str, seconds: float, slow: bool):
+        with self._lock:
+            totals = self._operations.setdefault(operation, [0, 0.0])
+            totals[0] += 1
+            totals[1] += seconds
+            if slow:
+                self.slow_calls += 1
+
+    def snapshot(self) -> Dict[str, tuple]:
+        """operation -> (calls, seconds)"""
+        with self._lock:
+            return {operation: tuple(totals) for operation, totals in self._operations.items()}
+
+
+operation_totals = OperationTotals()
+
+
+def record(operation: str, target: str, seconds: float, reads: int = 0, writes: int = 0, queries: int = 0):
+    """Account one Firestore round trip to the current request (if any) and the process totals"""
+    cost = _current_cost.get()
+    if cost is not None:
+        cost.add(reads, writes, queries, seconds)
+
+    slow = 0 < SLOW_CALL_SECONDS <= seconds
+    operation_totals.add(operation, seconds, slow)
+    if slow:
+        logger.warning(
+            "slow Firestore %s on %s: %.1f ms, %d reads, %d writes (request %s)",
+            operation, target, seconds * 1000, reads, writes, cost.path if cost else "-"
+        )
+
+
+# ==================== FIRESTORE CLIENT HOOKS ====================
+
+def _request_field(request, name: str, default=None):
+    if isinstance(request, dict):
+        return request.get(name, default)
+    return getattr(request, name, default)
+
+
+def _query_target(request) -> str:
+    try:
+        query = _request_field(request, "structured_query")
+        return query.from_[0].collection_id
+    except (AttributeError, IndexError, TypeError):
+        return str(_request_field(request, "parent", "?"))
+
+
+def _timed_stream(responses: Iterable, operation: str, target: str, started: float,
+                  is_document, queries: int):
+    """Yield a server stream through, counting documents until it's consumed"""
+    reads = 0
+    try:
+        for response in responses:
+            if is_document(response):
+                reads += 1
+            yield response
+    finally:
+        record(operation, target, time.perf_counter() - started, reads=reads, queries=queries)
+
+
+def instrument_client(client):
+    """Report every RPC the Firestore client makes to record()
+
+    Hooks the client's generated API object, so document gets, queries,
+    get_all, batches and transactions are all covered however they are
+    reached (including writes through snapshot.reference).
+    """
+    api = client._firestore_api
+    run_query = api.run_query
+    batch_get_documents = api.batch_get_documents
+    commit = api.commit
+    begin_transaction = api.begin_transaction
+    rollback = api.rollback
+
+    def instrumented_run_query(*args, request=None, **kwargs):
+        started = time.perf_counter()
+        responses = run_query(*args, request=request, **kwargs)
+        return _timed_stream(responses, "run_query", _query_target(request), started,
+                             lambda response: response._pb.HasField("document"), queries=1)
+
+    def instrumented_batch_get_documents(*args, request=None, **kwargs):
+        started = time.perf_counter()
+        responses = batch_get_documents(*args, request=request, **kwargs)
+        documents = _request_field(request, "documents", ())
+        target = documents[0].rsplit("/", 2)[-2] if documents else "?"
+        return _timed_stream(responses, "batch_get_documents", target, started,
+                             lambda response: response._pb.WhichOneof("result") is not None, queries=0)
+
+    def instrumented_commit(*args, request=None, **kwargs):
+        started = time.perf_counter()
+        try:
+            return commit(*args, request=request, **kwargs)
+        finally:
+            writes = len(_request_field(request, "writes", None) or ())
+            record("commit", f"{writes} writes", time.perf_counter() - started, writes=writes)
+
+    def timed(operation, method):
+        def call(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                record(operation, "transaction", time.perf_counter() - started)
+        return call
+
+    api.run_query = instrumented_run_query
+    api.batch_get_documents = instrumented_batch_get_documents
+    api.commit = instrumented_commit
+    api.begin_transaction = timed("begin_transaction", begin_transaction)
+    api.rollback = timed("rollback", rollback)
+    return client
@@ -0,0 +1,275 @@
+import asyncio
+import contextvars
+import logging
+import random
+import secrets
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Type
+from app.config import get_settings
+from app.services import firestore_metrics
+from app.services.firebase_service import AUTH_TRANSIENT_ERRORS, TRANSIENT_ERRORS
+
+settings = get_settings()
+logger = logging.getLogger("learnage.jobs")
+
+
+class QueueFull(Exception):
+    """The job queue already holds its maximum number of waiting jobs"""
+
+
+class Job:
+    """One piece of background work and its status, as served by /jobs/{id}
+
+    A plain job runs `run()` once, retrying transient errors. A batch job runs
+    `run(item)` for every item with bounded concurrency, retrying each item on
+    its own; it succeeds once every item has been tried, and items that still
+    failed are listed in its result.
+    """
+
+    def __init__(self, kind: str, run: Callable[..., Awaitable[Any]],
+                 items: Optional[Sequence] = None, key: Optional[Callable[[Any], str]] = None):
+        self.id = secrets.token_urlsafe(16)
+        self.kind = kind
+        self.status = "queued"
+        self.retries = 0
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.progress: Optional[Dict[str, int]] = (
+            {"total": len(items), "succeeded": 0, "failed": 0} if items is not None else None
+        )
+        self.cost: Optional[firestore_metrics.RequestCost] = None
+        # Inputs (which may include passwords) are dropped once the job finishes
+        self._run = run
+        self._items = items
+        self._key = key or str
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def to_dict(self) -> Dict:
+        data = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "retries": self.retries,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.progress is not None:
+            data["progress"] = dict(self.progress)
+        if self.status == "succeeded":
+            data["result"] = self.result
+        if self.error is not None:
+            data["error"] = self.error
+        if self.cost is not None:
+            data["firestore"] = {
+                "reads": self.cost.reads,
+                "writes": self.cost.writes,
+                "queries": self.cost.queries,
+                "ms": round(self.cost.seconds * 1000, 1)
+            }
+        return data
+
+
+class JobQueue:
+    """In-process async job queue: a fixed set of worker tasks on the event loop
+
+    Jobs hold coroutine functions, so the blocking Firebase work inside them
+    still goes through firebase_executor. Workers start with the first
+    submitted job. Jobs and their status live in this process only; they are
+    kept for retention_seconds after finishing and lost on restart.
+    """
+
+    def __init__(self, workers: int, max_queued: int, max_attempts: int, retry_base_seconds: float,
+                 retry_on: Tuple[Type[BaseException], ...], batch_concurrency: int,
+                 retention_seconds: float):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.max_attempts = max(1, max_attempts)
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_on = retry_on
+        self.batch_concurrency = batch_concurrency
+        self.retention_seconds = retention_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+
+        self.submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.rejected = 0
+        self.running = 0
+        self.total_retries = 0
+
+    def submit(self, kind: str, run: Callable[[], Awaitable[Any]]) -> Job:
+        """Queue `await run()`; raises QueueFull when the queue is at capacity"""
+        return self._submit(Job(kind, run))
+
+    def submit_batch(self, kind: str, items: Sequence, run: Callable[[Any], Awaitable[Any]],
+                     key: Optional[Callable[[Any], str]] = None) -> Job:
+        """Queue one job that runs `await run(item)` for every item
+
+        `key(item)` names each item in the job's result (defaults to str).
+        """
+        return self._submit(Job(kind, run, items=list(items), key=key))
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def _submit(self, job: Job) -> Job:
+        self._start()
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise QueueFull(f"{self.max_queued} jobs are already waiting")
+        self.submitted += 1
+        self._jobs[job.id] = job
+        self._prune()
+        return job
+
+    def _start(self):
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        loop = asyncio.get_running_loop()
+        # Workers start from an empty context, not that of the request that
+        # happened to submit the first job (its Firestore accounting included)
+        self._tasks = [
+            contextvars.Context().run(loop.create_task, self._work())
+            for _ in range(self.workers)
+        ]
+
+    async def stop(self, grace_seconds: float):
+        """Give queued jobs up to grace_seconds to finish, then cancel the workers"""
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), grace_seconds)
+        except asyncio.TimeoutError:
+            pass
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        for job in self._jobs.values():
+            if job.status == "queued":
+                self._finish(job, "failed", error="Server shut down before the job ran")
+
+    async def _work(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job):
+        job.status = "running"
+        job.started_at = time.time()
+        self.running += 1
+        # Firestore usage is accounted to the job the way requests account theirs
+        cost, token = firestore_metrics.begin_request(f"job:{job.kind}")
+        job.cost = cost
+        try:
+            if job._items is None:
+                result = await self._call(job, job._run)
+            else:
+                result = await self._run_batch(job)
+        except asyncio.CancelledError:
+            self._finish(job, "failed", error="Cancelled at shutdown")
+            raise
+        except Exception as e:
+            logger.warning("job %s (%s) failed after %d retries: %s", job.id, job.kind, job.retries, e)
+            self._finish(job, "failed", error=str(e) or type(e).__name__)
+        else:
+            self._finish(job, "succeeded", result=result)
+        finally:
+            self.running -= 1
+            firestore_metrics.end_request(token)
+
+    async def _call(self, job: Job, run: Callable[..., Awaitable[Any]], *args):
+        """Await run(*args), retrying transient errors with jittered exponential backoff"""
+        attempt = 1
+        while True:
+            try:
+                return await run(*args)
+            except self.retry_on:
+                if attempt >= self.max_attempts:
+                    raise
+                await asyncio.sleep(self.retry_base_seconds * (2 ** (attempt - 1)) * (0.5 + random.random()))
+                attempt += 1
+                job.retries += 1
+                self.total_retries += 1
+
+    async def _run_batch(self, job: Job) -> Dict[str, List[Dict]]:
+        slots = asyncio.Semaphore(self.batch_concurrency)
+        outcomes: List[Optional[Dict]] = [None] * len(job._items)
+
+        async def run_item(index: int, item):
+            async with slots:
+                key = job._key(item)
+                try:
+                    outcomes[index] = {"key": key, "result": await self._call(job, job._run, item)}
+                    job.progress["succeeded"] += 1
+                except Exception as e:
+                    outcomes[index] = {"key": key, "error": str(e) or type(e).__name__}
+                    job.progress["failed"] += 1
+
+        await asyncio.gather(*(run_item(index, item) for index, item in enumerate(job._items)))
+        return {
+            "succeeded": [outcome for outcome in outcomes if "result" in outcome],
+            "failed": [outcome for outcome in outcomes if "error" in outcome]
+        }
+
+    def _finish(self, job: Job, status: str, result: Any = None, error: Optional[str] = None):
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = time.time()
+        job._run = job._items = None
+        if status == "succeeded":
+            self.succeeded += 1
+        else:
+            self.failed += 1
+
+    def _prune(self):
+        """Forget finished jobs older than the retention period"""
+        cutoff = time.time() - self.retention_seconds
+        expired = [job_id for job_id, job in self._jobs.items() if job.finished and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def stats(self) -> dict:
+        """Snapshot of queue usage"""
+        return {
+            "workers": len(self._tasks),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "running": self.running,
+            "submitted": self.submitted,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "retries": self.total_retries,
+            "tracked_jobs": len(self._jobs)
+        }
+
+
+# Slow write paths (account creation, bulk enrolment) run here when the caller
+# asks not to wait; blocking calls inside jobs still go through firebase_executor
+job_queue = JobQueue(
+    workers=settings.job_workers,
+    max_queued=settings.job_max_queued,
+    max_attempts=settings.job_max_attempts,
+    retry_base_seconds=settings.job_retry_base_seconds,
+    retry_on=TRANSIENT_ERRORS + AUTH_TRANSIENT_ERRORS + (ConnectionError, TimeoutError),
+    batch_concurrency=settings.job_batch_concurrency,
+    retention_seconds=settings.job_retention_seconds
+)
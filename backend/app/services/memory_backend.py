@@ -0,0 +1,627 @@
+"""
+In-process stand-ins for Firestore and Firebase Auth
+
+MemoryFirestore implements the slice of the google-cloud-firestore client this
+backend uses: collections and subcollections, document get/set/update/delete,
+where/order_by/limit/start_after/select queries, get_all, write batches,
+transactions (optimistic, retried through firestore.transactional) and the
+Increment / ArrayUnion / ArrayRemove / DELETE_FIELD / SERVER_TIMESTAMP
+transforms. Every round trip can be delayed by a fixed latency so benchmarks
+see realistic I/O waits.
+
+Select it with DATA_BACKEND=memory. Data lives only as long as the process.
+"""
+
+import functools
+import random
+import string
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from firebase_admin import auth
+from google.api_core import exceptions as google_exceptions
+from google.cloud.firestore_v1 import transforms
+from app.services import firestore_metrics
+
+_ID_ALPHABET = string.ascii_letters + string.digits
+_MISSING = object()
+
+
+def _auto_id() -> str:
+    return "".join(random.choices(_ID_ALPHABET, k=20))
+
+
+def _normalize(value: Any) -> Any:
+    """Copy a value the way it would round-trip through Firestore (naive datetimes are UTC)"""
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def _clone(value: Any) -> Any:
+    """Copy the containers of a stored value; leaves are immutable"""
+    if isinstance(value, dict):
+        return {key: _clone(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_clone(item) for item in value]
+    return value
+
+
+def _index_key(value: Any) -> Any:
+    """Hashable stand-in for a field value (maps and arrays compare by content)"""
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+
+def _get_field(data: Dict, field_path: str) -> Any:
+    value = data
+    for part in field_path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _apply_value(target: Dict, key: str, value: Any):
+    """Write one field, resolving transforms against the current value"""
+    current = target.get(key, _MISSING)
+    if value is transforms.DELETE_FIELD:
+        target.pop(key, None)
+    elif value is transforms.SERVER_TIMESTAMP:
+        target[key] = datetime.now(timezone.utc)
+    elif isinstance(value, transforms.Increment):
+        base = current if isinstance(current, (int, float)) else 0
+        target[key] = base + value.value
+    elif isinstance(value, transforms.ArrayUnion):
+        existing = list(current) if isinstance(current, list) else []
+        target[key] = existing + [item for item in value.values if item not in existing]
+    elif isinstance(value, transforms.ArrayRemove):
+        existing = list(current) if isinstance(current, list) else []
+        target[key] = [item for item in existing if item not in value.values]
+    elif isinstance(value, dict):
+        target[key] = {}
+        for child_key, child_value in value.items():
+            _apply_value(target[key], child_key, child_value)
+    else:
+        target[key] = _normalize(value)
+
+
+def _merge(target: Dict, data: Dict):
+    """set(..., merge=True): nested maps merge instead of replacing
+
+    Stored documents are never modified in place, so a nested map is copied
+    before anything is merged into it.
+    """
+    for key, value in data.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            target[key] = dict(target[key])
+            _merge(target[key], value)
+        else:
+            _apply_value(target, key, value)
+
+
+def _update(target: Dict, data: Dict):
+    """update(): keys are field paths, so "a.b" writes inside map a"""
+    for field_path, value in data.items():
+        *parents, leaf = field_path.split(".")
+        node = target
+        for part in parents:
+            node[part] = dict(node[part]) if isinstance(node.get(part), dict) else {}
+            node = node[part]
+        _apply_value(node, leaf, value)
+
+
+def _compare(a: Any, b: Any) -> int:
+    if a == b:
+        return 0
+    if a is None:
+        return -1
+    if b is None:
+        return 1
+    return -1 if a < b else 1
+
+
+_OPERATORS = {
+    "==": lambda value, target: value == target,
+    "!=": lambda value, target: value != target,
+    "<": lambda value, target: value < target,
+    "<=": lambda value, target: value <= target,
+    ">": lambda value, target: value > target,
+    ">=": lambda value, target: value >= target,
+    "in": lambda value, target: value in target,
+    "not-in": lambda value, target: value not in target,
+    "array_contains": lambda value, target: isinstance(value, list) and target in value,
+    "array_contains_any": lambda value, target: isinstance(value, list) and any(t in value for t in target),
+}
+
+
+class MemoryFirestore:
+    """Thread-safe in-memory document store with the Firestore client's interface"""
+
+    def __init__(self, latency_seconds: float = 0.0):
+        self.latency_seconds = latency_seconds
+        # document path -> (data, version); versions let transactions detect conflicts
+        self._documents: Dict[str, Tuple[Dict, int]] = {}
+        # collection path -> document IDs in insertion order
+        self._collections: Dict[str, Dict[str, None]] = {}
+        # (collection path, field) -> value -> document IDs, built the first
+        # time a query filters on that field by equality, like a single-field index
+        self._indexes: Dict[Tuple[str, str], Dict[Any, set]] = {}
+        self._lock = threading.Lock()
+        self._version = 0
+        self.round_trips = 0
+
+    def _round_trip(self) -> float:
+        """Wait out the simulated latency; returns the call's start time for _report"""
+        started = time.perf_counter()
+        with self._lock:
+            self.round_trips += 1
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        return started
+
+    @staticmethod
+    def _report(started: float, operation: str, target: str, reads: int = 0, writes: int = 0, queries: int = 0):
+        """Account the call the way the instrumented Firestore client does"""
+        firestore_metrics.record(operation, target, time.perf_counter() - started,
+                                 reads=reads, writes=writes, queries=queries)
+
+    # ==================== CLIENT API ====================
+
+    def collection(self, name: str) -> "MemoryCollectionReference":
+        return MemoryCollectionReference(self, name)
+
+    def document(self, path: str) -> "MemoryDocumentReference":
+        collection_path, _, document_id = path.rpartition("/")
+        return MemoryDocumentReference(self, collection_path, document_id)
+
+    def batch(self) -> "MemoryWriteBatch":
+        return MemoryWriteBatch(self)
+
+    def transaction(self, max_attempts: int = 5) -> "MemoryTransaction":
+        return MemoryTransaction(self, max_attempts)
+
+    def get_all(self, references: Iterable["MemoryDocumentReference"], field_paths=None,
+                transaction=None) -> Iterator["MemoryDocumentSnapshot"]:
+        references = list(references)
+        started = self._round_trip()
+        with self._lock:
+            snapshots = [self._snapshot(reference, field_paths) for reference in references]
+        target = references[0].collection_path if references else "?"
+        self._report(started, "batch_get_documents", target, reads=len(snapshots))
+        if transaction is not None:
+            for snapshot in snapshots:
+                transaction._record_read(snapshot)
+        return iter(snapshots)
+
+    def clear(self):
+        """Drop every document (benchmarks use this between runs)"""
+        with self._lock:
+            self._documents.clear()
+            self._collections.clear()
+            self._indexes.clear()
+
+    # ==================== STORAGE ====================
+
+    def _snapshot(self, reference: "MemoryDocumentReference", field_paths=None) -> "MemoryDocumentSnapshot":
+        entry = self._documents.get(reference.path)
+        if entry is None:
+            return MemoryDocumentSnapshot(reference, None, 0)
+        data, version = entry
+        if field_paths is not None:
+            data = {field: data[field] for field in field_paths if field in data}
+        return MemoryDocumentSnapshot(reference, data, version)
+
+    def _apply_writes(self, writes: List[Tuple], read_versions: Optional[Dict[str, int]] = None):
+        """Apply a list of (op, reference, data, merge) atomically"""
+        with self._lock:
+            if read_versions:
+                for path, version in read_versions.items():
+                    current = self._documents.get(path)
+                    if (current[1] if current else 0) != version:
+                        raise google_exceptions.Aborted(f"Document {path} changed during the transaction")
+            for op, reference, data, _ in writes:
+                if op == "update" and reference.path not in self._documents:
+                    raise google_exceptions.NotFound(f"No document to update: {reference.path}")
+
+            for op, reference, data, merge in writes:
+                path = reference.path
+                if op == "delete":
+                    removed = self._documents.pop(path, None)
+                    if removed is not None:
+                        self._collections[reference.collection_path].pop(reference.id, None)
+                        self._reindex(reference, removed[0], None)
+                    continue
+
+                existing = self._documents.get(path)
+                if op == "set" and not merge:
+                    document = {}
+                    _merge(document, data)
+                else:
+                    document = dict(existing[0]) if existing else {}
+                    (_update if op == "update" else _merge)(document, data)
+
+                self._version += 1
+                self._documents[path] = (document, self._version)
+                self._collections.setdefault(reference.collection_path, {})[reference.id] = None
+                self._reindex(reference, existing[0] if existing else None, document)
+
+    def _reindex(self, reference: "MemoryDocumentReference", old: Optional[Dict], new: Optional[Dict]):
+        for (collection_path, field), index in self._indexes.items():
+            if collection_path != reference.collection_path:
+                continue
+            for data, add in ((old, False), (new, True)):
+                value = _MISSING if data is None else _get_field(data, field)
+                if value is _MISSING:
+                    continue
+                key = _index_key(value)
+                if add:
+                    index.setdefault(key, set()).add(reference.id)
+                elif key in index:
+                    index[key].discard(reference.id)
+
+    def _index(self, collection_path: str, field: str) -> Dict[Any, set]:
+        """The equality index for a field, building it on first use"""
+        index = self._indexes.get((collection_path, field))
+        if index is None:
+            index = {}
+            for document_id in self._collections.get(collection_path, ()):
+                value = _get_field(self._documents[f"{collection_path}/{document_id}"][0], field)
+                if value is not _MISSING:
+                    index.setdefault(_index_key(value), set()).add(document_id)
+            self._indexes[(collection_path, field)] = index
+        return index
+
+    def _candidate_ids(self, query: "MemoryQuery") -> Iterable[str]:
+        """Document IDs that could match: narrowed by an equality filter when there is one"""
+        for field, op, target in query._filters:
+            if op == "==":
+                keys = [_index_key(target)]
+            elif op == "in":
+                keys = [_index_key(item) for item in target]
+            else:
+                continue
+            index = self._index(query._collection_path, field)
+            ids = set()
+            for key in keys:
+                ids |= index.get(key, set())
+            return ids
+        return list(self._collections.get(query._collection_path, ()))
+
+    def _query(self, query: "MemoryQuery") -> List["MemoryDocumentSnapshot"]:
+        with self._lock:
+            rows = []
+            for document_id in self._candidate_ids(query):
+                path = f"{query._collection_path}/{document_id}"
+                data, version = self._documents[path]
+                if all(
+                    (value := _get_field(data, field)) is not _MISSING and _OPERATORS[op](value, target)
+                    for field, op, target in query._filters
+                ):
+                    rows.append((document_id, data, version))
+
+        orders = list(query._orders)
+        if not any(field == "__name__" for field, _ in orders):
+            orders.append(("__name__", orders[-1][1] if orders else "ASCENDING"))
+        directions = [-1 if direction == "DESCENDING" else 1 for _, direction in orders]
+
+        def compare_values(a, b):
+            for sign, x, y in zip(directions, a, b):
+                result = _compare(x, y)
+                if result:
+                    return sign * result
+            return 0
+
+        # Sort values are computed once per row; Firestore leaves out
+        # documents that lack an ordered field
+        keyed = []
+        for document_id, data, version in rows:
+            values = [document_id if field == "__name__" else _get_field(data, field) for field, _ in orders]
+            if not any(value is _MISSING for value in values):
+                keyed.append((values, document_id, data, version))
+        keyed.sort(key=functools.cmp_to_key(lambda a, b: compare_values(a[0], b[0])))
+
+        if query._start_after is not None:
+            cursor = [query._start_after.get(field, _MISSING) for field, _ in orders]
+            # Only the fields the cursor names take part in the comparison
+            width = next((i for i, value in enumerate(cursor) if value is _MISSING), len(cursor))
+            keyed = [row for row in keyed if compare_values(row[0][:width], cursor[:width]) > 0]
+
+        if query._limit is not None:
+            keyed = keyed[:query._limit]
+        rows = [row[1:] for row in keyed]
+
+        collection = MemoryCollectionReference(self, query._collection_path)
+        snapshots = []
+        for document_id, data, version in rows:
+            if query._projection is not None:
+                data = {field: data[field] for field in query._projection if field in data}
+            snapshots.append(MemoryDocumentSnapshot(collection.document(document_id), data, version))
+        return snapshots
+
+
+class MemoryDocumentSnapshot:
+    def __init__(self, reference: "MemoryDocumentReference", data: Optional[Dict], version: int):
+        self.reference = reference
+        self._data = data
+        self._version = version
+
+    @property
+    def id(self) -> str:
+        return self.reference.id
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> Optional[Dict]:
+        return _clone(self._data)
+
+    def get(self, field_path: str) -> Any:
+        value = _get_field(self._data or {}, field_path)
+        if value is _MISSING:
+            raise KeyError(field_path)
+        return _clone(value)
+
+
+class MemoryDocumentReference:
+    def __init__(self, client: MemoryFirestore, collection_path: str, document_id: str):
+        self._client = client
+        self.collection_path = collection_path
+        self.id = document_id
+
+    @property
+    def path(self) -> str:
+        return f"{self.collection_path}/{self.id}"
+
+    @property
+    def parent(self) -> "MemoryCollectionReference":
+        return MemoryCollectionReference(self._client, self.collection_path)
+
+    def collection(self, name: str) -> "MemoryCollectionReference":
+        return MemoryCollectionReference(self._client, f"{self.path}/{name}")
+
+    def get(self, field_paths=None, transaction=None) -> MemoryDocumentSnapshot:
+        started = self._client._round_trip()
+        with self._client._lock:
+            snapshot = self._client._snapshot(self, field_paths)
+        self._client._report(started, "batch_get_documents", self.collection_path, reads=1)
+        if transaction is not None:
+            transaction._record_read(snapshot)
+        return snapshot
+
+    def set(self, document_data: Dict, merge: bool = False):
+        self._write(("set", self, document_data, merge))
+
+    def update(self, field_updates: Dict):
+        self._write(("update", self, field_updates, False))
+
+    def delete(self):
+        self._write(("delete", self, None, False))
+
+    def _write(self, write: Tuple):
+        started = self._client._round_trip()
+        try:
+            self._client._apply_writes([write])
+        finally:
+            self._client._report(started, "commit", "1 writes", writes=1)
+
+    def __eq__(self, other):
+        return isinstance(other, MemoryDocumentReference) and other.path == self.path
+
+    def __hash__(self):
+        return hash(self.path)
+
+
+class MemoryQuery:
+    ASCENDING = "ASCENDING"
+    DESCENDING = "DESCENDING"
+
+    def __init__(self, client: MemoryFirestore, collection_path: str):
+        self._client = client
+        self._collection_path = collection_path
+        self._filters: List[Tuple[str, str, Any]] = []
+        self._orders: List[Tuple[str, str]] = []
+        self._limit: Optional[int] = None
+        self._start_after: Optional[Dict] = None
+        self._projection: Optional[List[str]] = None
+
+    def _copy(self) -> "MemoryQuery":
+        query = MemoryQuery(self._client, self._collection_path)
+        query._filters = list(self._filters)
+        query._orders = list(self._orders)
+        query._limit = self._limit
+        query._start_after = self._start_after
+        query._projection = self._projection
+        return query
+
+    def where(self, field_path: str, op_string: str, value: Any) -> "MemoryQuery":
+        if op_string not in _OPERATORS:
+            raise ValueError(f"Unsupported operator {op_string!r}")
+        query = self._copy()
+        query._filters.append((field_path, op_string, _normalize(value)))
+        return query
+
+    def order_by(self, field_path: str, direction: str = ASCENDING) -> "MemoryQuery":
+        query = self._copy()
+        query._orders.append((field_path, direction))
+        return query
+
+    def limit(self, count: int) -> "MemoryQuery":
+        query = self._copy()
+        query._limit = count
+        return query
+
+    def start_after(self, document_fields) -> "MemoryQuery":
+        query = self._copy()
+        if isinstance(document_fields, MemoryDocumentSnapshot):
+            values = dict(document_fields._data or {})
+            values["__name__"] = document_fields.id
+        else:
+            values = dict(document_fields)
+        if isinstance(values.get("__name__"), MemoryDocumentReference):
+            values["__name__"] = values["__name__"].id
+        query._start_after = _normalize(values)
+        return query
+
+    def select(self, field_paths: List[str]) -> "MemoryQuery":
+        query = self._copy()
+        query._projection = list(field_paths)
+        return query
+
+    def stream(self, transaction=None) -> Iterator[MemoryDocumentSnapshot]:
+        started = self._client._round_trip()
+        snapshots = self._client._query(self)
+        self._client._report(started, "run_query", self._collection_path.rpartition("/")[2],
+                             reads=len(snapshots), queries=1)
+        if transaction is not None:
+            for snapshot in snapshots:
+                transaction._record_read(snapshot)
+        return iter(snapshots)
+
+    def get(self, transaction=None) -> List[MemoryDocumentSnapshot]:
+        return list(self.stream(transaction=transaction))
+
+
+class MemoryCollectionReference(MemoryQuery):
+    @property
+    def id(self) -> str:
+        return self._collection_path.rpartition("/")[2]
+
+    @property
+    def parent(self) -> Optional[MemoryDocumentReference]:
+        """The document a subcollection hangs off; None for a root collection"""
+        document_path, _, _ = self._collection_path.rpartition("/")
+        if not document_path:
+            return None
+        collection_path, _, document_id = document_path.rpartition("/")
+        return MemoryDocumentReference(self._client, collection_path, document_id)
+
+    def document(self, document_id: Optional[str] = None) -> MemoryDocumentReference:
+        return MemoryDocumentReference(self._client, self._collection_path, document_id or _auto_id())
+
+    def add(self, document_data: Dict, document_id: Optional[str] = None):
+        reference = self.document(document_id)
+        reference.set(document_data)
+        return datetime.now(timezone.utc), reference
+
+
+class MemoryWriteBatch:
+    def __init__(self, client: MemoryFirestore):
+        self._client = client
+        self._writes: List[Tuple] = []
+
+    def set(self, reference: MemoryDocumentReference, document_data: Dict, merge: bool = False):
+        self._writes.append(("set", reference, _clone(document_data), merge))
+
+    def update(self, reference: MemoryDocumentReference, field_updates: Dict):
+        self._writes.append(("update", reference, _clone(field_updates), False))
+
+    def delete(self, reference: MemoryDocumentReference):
+        self._writes.append(("delete", reference, None, False))
+
+    def __len__(self):
+        return len(self._writes)
+
+    def commit(self):
+        if len(self._writes) > 500:
+            raise google_exceptions.InvalidArgument("maximum 500 writes allowed per request")
+        started = self._client._round_trip()
+        try:
+            self._client._apply_writes(self._writes)
+        finally:
+            self._client._report(started, "commit", f"{len(self._writes)} writes", writes=len(self._writes))
+        writes, self._writes = self._writes, []
+        return [SimpleNamespace(update_time=datetime.now(timezone.utc)) for _ in writes]
+
+
+class MemoryTransaction(MemoryWriteBatch):
+    """Optimistic transaction: commit fails with Aborted if anything it read has changed
+
+    Implements the private hooks firestore.transactional drives, so the real
+    decorator retries it exactly as it would a Firestore transaction.
+    """
+
+    def __init__(self, client: MemoryFirestore, max_attempts: int = 5):
+        super().__init__(client)
+        self._max_attempts = max_attempts
+        self._read_only = False
+        self._id = None
+        self._reads: Dict[str, int] = {}
+
+    @property
+    def in_progress(self) -> bool:
+        return self._id is not None
+
+    def _record_read(self, snapshot: MemoryDocumentSnapshot):
+        self._reads.setdefault(snapshot.reference.path, snapshot._version)
+
+    def _clean_up(self):
+        self._writes = []
+        self._reads = {}
+        self._id = None
+
+    def _begin(self, retry_id=None):
+        self._id = _auto_id().encode()
+
+    def _rollback(self):
+        self._clean_up()
+
+    def _commit(self):
+        started = self._client._round_trip()
+        try:
+            self._client._apply_writes(self._writes, self._reads)
+        finally:
+            self._client._report(started, "commit", f"{len(self._writes)} writes", writes=len(self._writes))
+            self._clean_up()
+        return []
+
+
+class MemoryAuth:
+    """Stand-in for firebase_admin.auth user creation and ID-token checks
+
+    Tokens are "memory-token:<uid>", minted by issue_token().
+    """
+
+    TOKEN_PREFIX = "memory-token:"
+
+    def __init__(self, latency_seconds: float = 0.0):
+        self.latency_seconds = latency_seconds
+        self._users_by_email: Dict[str, SimpleNamespace] = {}
+        self._lock = threading.Lock()
+
+    def create_user(self, email: str, password: Optional[str] = None, uid: Optional[str] = None, **kwargs):
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        with self._lock:
+            if email in self._users_by_email:
+                raise auth.EmailAlreadyExistsError(f"The user with the provided email already exists ({email})", None, None)
+            user = SimpleNamespace(uid=uid or _auto_id()[:28], email=email, **kwargs)
+            self._users_by_email[email] = user
+        return user
+
+    def get_user_by_email(self, email: str):
+        with self._lock:
+            user = self._users_by_email.get(email)
+        if user is None:
+            raise auth.UserNotFoundError(f"No user record found for the provided email: {email}")
+        return user
+
+    def issue_token(self, uid: str) -> str:
+        return f"{self.TOKEN_PREFIX}{uid}"
+
+    def verify_id_token(self, id_token: str, app=None, check_revoked: bool = False, clock_skew_seconds: int = 0):
+        if not id_token.startswith(self.TOKEN_PREFIX):
+            raise auth.InvalidIdTokenError("Not a memory backend token")
+        uid = id_token[len(self.TOKEN_PREFIX):]
+        expires = datetime.now(timezone.utc) + timedelta(hours=1)
+        return {"uid": uid, "sub": uid, "exp": int(expires.timestamp())}
@@ -0,0 +1,199 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+def _position(message: Dict) -> Tuple:
+    return message["timestamp"], message["id"]
+
+
+class _ClassWindow:
+    """The most recent messages of one class, oldest first"""
+
+    def __init__(self, messages: List[Dict], complete: bool, size: int):
+        self.messages = deque(sorted(messages, key=_position)[-size:], maxlen=size)
+        # True while the window holds the class's entire history
+        self.complete = complete and len(messages) <= size
+        self.loaded_at = time.monotonic()
+
+    def add(self, message: Dict):
+        if any(m["id"] == message["id"] for m in self.messages):
+            return  # replayed after a load that already saw it
+        if len(self.messages) == self.messages.maxlen:
+            self.complete = False
+        if self.messages and _position(message) < _position(self.messages[-1]):
+            # Written with an older clock (another worker); keep the window ordered
+            ordered = sorted([*self.messages, message], key=_position)
+            self.messages.clear()
+            self.messages.extend(ordered[-self.messages.maxlen:])
+        else:
+            self.messages.append(message)
+
+    def remove(self, message_id: str) -> bool:
+        for message in self.messages:
+            if message["id"] == message_id:
+                self.messages.remove(message)
+                return True
+        return False
+
+    def page(self, limit: int, since: Optional[Tuple], before: Optional[Tuple]):
+        """(messages, has_more) answerable from memory, or None when the window can't tell"""
+        messages = list(self.messages)
+        
+        if since is not None:
+            if not self.complete and (not messages or _position(messages[0]) > since):
+                return None  # there may be messages between the cursor and the window
+            newer = [m for m in messages if _position(m) > since]
+            return newer[:limit], len(newer) > limit
+        
+        older = messages if before is None else [m for m in messages if _position(m) < before]
+        if len(older) > limit:
+            return older[-limit:], True
+        if self.complete:
+            return older, False
+        return None
+
+
+class _PendingLoad:
+    """Write-throughs made to a class while its window is loading, replayed once it's installed"""
+
+    def __init__(self):
+        self.ops: List[Tuple[str, Any]] = []
+        # Set by invalidate(): the load may predate the change, so don't install it
+        self.cancelled = False
+
+
+class RecentMessageCache:
+    """Bounded per-class hot windows of recent chat messages
+    
+    Populated on first read and kept current by write-through from send and
+    delete. Idle classes are evicted LRU-first when either the class count or
+    the total message cap is exceeded. In multi-worker deployments other
+    workers' writes only show up after max_age_seconds (when set) or an
+    explicit invalidate().
+    """
+
+    def __init__(self, window: int, max_classes: int, max_messages: int, max_age_seconds: float = 0):
+        self.window = window
+        self.max_classes = max_classes
+        self.max_messages = max_messages
+        self.max_age_seconds = max_age_seconds
+        self._classes: "OrderedDict[str, _ClassWindow]" = OrderedDict()
+        self._loading: Dict[str, List[_PendingLoad]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def page(self, class_id: str, limit: int, since: Optional[Tuple], before: Optional[Tuple],
+             load: Callable[[int], Tuple[List[Dict], bool]]):
+        """Serve a page from the class window, loading it first if needed; None means ask Firestore
+        
+        load(n) must return the class's latest n messages (oldest first) and
+        whether older ones exist.
+        """
+        with self._lock:
+            window = self._fresh_window(class_id)
+            if window is None:
+                pending = _PendingLoad()
+                self._loading.setdefault(class_id, []).append(pending)
+        
+        if window is None:
+            # Load outside the lock. Sends and deletes meanwhile are buffered in
+            # `pending` and replayed, so the load can't miss them; concurrent
+            # loaders of one class each replay their own buffer
+            try:
+                messages, has_more = load(self.window)
+            except BaseException:
+                with self._lock:
+                    self._end_load(class_id, pending)
+                raise
+            window = _ClassWindow(messages, not has_more, self.window)
+            with self._lock:
+                self._end_load(class_id, pending)
+                for op, value in pending.ops:
+                    if op == "add":
+                        window.add(value)
+                    else:
+                        window.remove(value)
+                if not pending.cancelled:
+                    self._classes[class_id] = window
+                    self._evict()
+        
+        with self._lock:
+            if class_id in self._classes:
+                self._classes.move_to_end(class_id)
+            result = window.page(limit, since, before)
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return result
+
+    def add(self, class_id: str, message: Dict):
+        """Write-through for a newly sent message; ignored if the class isn't cached or loading"""
+        with self._lock:
+            for pending in self._loading.get(class_id, ()):
+                pending.ops.append(("add", message))
+            window = self._classes.get(class_id)
+            if window is not None:
+                window.add(message)
+                self._evict()
+
+    def remove(self, message_id: str, class_id: Optional[str] = None):
+        """Write-through for a deleted message"""
+        with self._lock:
+            loads = self._loading.get(class_id, []) if class_id else \
+                [pending for loads in self._loading.values() for pending in loads]
+            for pending in loads:
+                pending.ops.append(("remove", message_id))
+            windows = [self._classes.get(class_id)] if class_id else list(self._classes.values())
+            for window in windows:
+                if window is not None and window.remove(message_id):
+                    break
+
+    def invalidate(self, class_id: Optional[str] = None):
+        """Drop one class's window (or all); the next read reloads from Firestore"""
+        with self._lock:
+            if class_id is None:
+                self._classes.clear()
+                loads = [pending for loads in self._loading.values() for pending in loads]
+            else:
+                self._classes.pop(class_id, None)
+                loads = self._loading.get(class_id, [])
+            for pending in loads:
+                pending.cancelled = True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "classes": len(self._classes),
+                "messages": sum(len(w.messages) for w in self._classes.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+    def _end_load(self, class_id: str, pending: _PendingLoad):
+        loads = self._loading.get(class_id, [])
+        if pending in loads:
+            loads.remove(pending)
+        if not loads:
+            self._loading.pop(class_id, None)
+
+    def _fresh_window(self, class_id: str) -> Optional[_ClassWindow]:
+        window = self._classes.get(class_id)
+        if window is None:
+            return None
+        if self.max_age_seconds and time.monotonic() - window.loaded_at > self.max_age_seconds:
+            del self._classes[class_id]
+            return None
+        return window
+
+    def _evict(self):
+        total = sum(len(w.messages) for w in self._classes.values())
+        while self._classes and (len(self._classes) > self.max_classes or total > self.max_messages):
+            _, window = self._classes.popitem(last=False)
+            total -= len(window.messages)
+            self.evictions += 1
@@ -0,0 +1,68 @@
+import hashlib
+import json
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+def roster_etag(students: List[Dict]) -> str:
+    """Content hash of a roster; equal rosters get equal ETags on every worker"""
+    digest = hashlib.sha1(json.dumps(students, sort_keys=True, default=str).encode()).hexdigest()
+    return f'"{digest[:20]}"'
+
+
+class RosterCache:
+    """Per-class student rosters with versioned invalidation
+
+    invalidate() bumps a class's version and drops its roster; a load that
+    started before the bump is not stored. Entries also expire after
+    ttl_seconds to bound staleness when another worker changed the roster.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._versions: Dict[str, int] = {}
+        # class_id -> (students, etag, loaded_at)
+        self._entries: Dict[str, Tuple[List[Dict], str, float]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, class_id: str) -> Optional[Tuple[List[Dict], str]]:
+        """(students, etag) if the roster is cached and fresh, else None"""
+        with self._lock:
+            entry = self._entries.get(class_id)
+            if entry is None or time.monotonic() - entry[2] > self.ttl_seconds:
+                return None
+            self.hits += 1
+            return entry[0], entry[1]
+
+    def load(self, class_id: str, loader: Callable[[str], List[Dict]]) -> Tuple[List[Dict], str]:
+        """(students, etag), calling loader(class_id) on a miss"""
+        cached = self.lookup(class_id)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            self.misses += 1
+            version = self._versions.get(class_id, 0)
+        students = loader(class_id)
+        etag = roster_etag(students)
+        with self._lock:
+            if self._versions.get(class_id, 0) == version:
+                self._entries[class_id] = (students, etag, time.monotonic())
+        return students, etag
+
+    def invalidate(self, class_id: str):
+        """Call whenever a student joins, leaves or changes class"""
+        with self._lock:
+            self._versions[class_id] = self._versions.get(class_id, 0) + 1
+            self._entries.pop(class_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "classes": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses
+            }
@@ -0,0 +1,91 @@
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional, Set
+
+
+class _Broadcast:
+    """Chunks produced by one upstream stream, replayable by any number of readers"""
+
+    def __init__(self):
+        self.chunks: List = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.changed = asyncio.Condition()
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one in-flight upstream call"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self._streams: Dict[Hashable, _Broadcast] = {}
+        # The loop only keeps weak references to tasks; hold the pumps until they finish
+        self._pumps: Set[asyncio.Task] = set()
+        self.leaders = 0
+        self.collapsed = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable]):
+        """Await fn(), or the already running call for key, and return its result"""
+        task = self._calls.get(key)
+        if task is None:
+            self.leaders += 1
+            # The call runs as its own task so a disconnecting caller can't cancel it for the others
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._finish_call(key, t))
+        else:
+            self.collapsed += 1
+        return await asyncio.shield(task)
+
+    async def stream(self, key: Hashable, factory: Callable[[], AsyncIterator]) -> AsyncIterator:
+        """Iterate factory(), or join the already running stream for key from its first chunk"""
+        broadcast = self._streams.get(key)
+        if broadcast is None:
+            self.leaders += 1
+            broadcast = _Broadcast()
+            self._streams[key] = broadcast
+            pump = asyncio.ensure_future(self._pump(key, factory, broadcast))
+            self._pumps.add(pump)
+            pump.add_done_callback(self._pumps.discard)
+        else:
+            self.collapsed += 1
+
+        index = 0
+        while True:
+            async with broadcast.changed:
+                await broadcast.changed.wait_for(lambda: index < len(broadcast.chunks) or broadcast.done)
+                pending = broadcast.chunks[index:]
+            for chunk in pending:
+                yield chunk
+            index += len(pending)
+            if not pending and broadcast.done:
+                if broadcast.error is not None:
+                    raise broadcast.error
+                return
+
+    async def _pump(self, key: Hashable, factory: Callable[[], AsyncIterator], broadcast: _Broadcast):
+        try:
+            async for chunk in factory():
+                async with broadcast.changed:
+                    broadcast.chunks.append(chunk)
+                    broadcast.changed.notify_all()
+        except Exception as e:
+            broadcast.error = e
+        finally:
+            self._streams.pop(key, None)
+            async with broadcast.changed:
+                broadcast.done = True
+                broadcast.changed.notify_all()
+
+    def _finish_call(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the exception retrieved; callers that are still waiting receive it anyway
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._calls) + len(self._streams),
+            "upstream_calls": self.leaders,
+            "collapsed_calls": self.collapsed
+        }
@@ -0,0 +1,171 @@
+import asyncio
+import base64
+import contextlib
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Dict, Optional
+import httpx
+import firebase_admin
+from firebase_admin import auth
+from google.auth import jwt as google_jwt
+from app.config import get_settings
+from app.services.firebase_service import async_firebase, auth_client
+from app.services.ttl_cache import TTLCache
+
+settings = get_settings()
+
+# Public certs Firebase Auth signs ID tokens with
+CERTS_URL = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+ISSUER_PREFIX = "https://securetoken.google.com/"
+# ID tokens live for an hour at most
+MAX_TOKEN_LIFETIME_SECONDS = 3600
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+def token_key(token: str) -> str:
+    """Cache key for a raw ID token; the token itself is never stored"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _unverified_header(token: str) -> dict:
+    try:
+        segment = token.split(".")[0]
+        return json.loads(base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4)))
+    except ValueError:
+        return {}
+
+
+class TokenVerifier:
+    """Verifies Firebase ID tokens against Google certs held in memory
+
+    Verified claims are cached by token hash until the token's exp. The certs
+    are refreshed by a background task ahead of their Cache-Control expiry, so
+    a request never waits on a cert download; if the certs aren't loaded yet
+    or don't know the token's key ID we fall back to auth.verify_id_token.
+    """
+
+    def __init__(self, max_entries: int, refresh_margin_seconds: float = 300):
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self._tokens = TTLCache(max_entries, MAX_TOKEN_LIFETIME_SECONDS)
+        self._certs: Dict[str, str] = {}
+        self._certs_expire_at = 0.0
+        self._project_id: Optional[str] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.local_verifications = 0
+        self.fallback_verifications = 0
+        self.cert_refreshes = 0
+        self.cert_refresh_errors = 0
+        self.last_refresh_error: Optional[str] = None
+
+    async def verify(self, token: str) -> dict:
+        """Decoded claims for a valid token; raises auth.InvalidIdTokenError otherwise"""
+        key = token_key(token)
+        claims = self._tokens.get(key)
+        if claims is not None:
+            return claims
+
+        claims = self._verify_locally(token)
+        if claims is None:
+            claims = await async_firebase.run(auth_client.verify_id_token, token)
+            self.fallback_verifications += 1
+        else:
+            self.local_verifications += 1
+
+        self._tokens.set(key, claims, ttl_seconds=claims["exp"] - time.time())
+        return claims
+
+    def _verify_locally(self, token: str) -> Optional[dict]:
+        """Same checks as auth.verify_id_token; None when the certs can't decide"""
+        project_id = self._get_project_id()
+        if not project_id or os.environ.get("FIREBASE_AUTH_EMULATOR_HOST"):
+            return None
+        certs = self._certs
+        header = _unverified_header(token)
+        if time.monotonic() > self._certs_expire_at or header.get("kid") not in certs:
+            return None
+        if header.get("alg") != "RS256":
+            raise auth.InvalidIdTokenError("ID token has an unexpected algorithm")
+
+        try:
+            claims = google_jwt.decode(token, certs=certs, audience=project_id)
+        except ValueError as e:
+            raise auth.InvalidIdTokenError(str(e), cause=e)
+
+        subject = claims.get("sub")
+        if claims.get("iss") != ISSUER_PREFIX + project_id:
+            raise auth.InvalidIdTokenError("ID token has an incorrect issuer")
+        if not isinstance(subject, str) or not subject or len(subject) > 128:
+            raise auth.InvalidIdTokenError("ID token has an invalid subject")
+
+        claims["uid"] = subject
+        return claims
+
+    def _get_project_id(self) -> Optional[str]:
+        if self._project_id is None:
+            try:
+                self._project_id = firebase_admin.get_app().project_id
+            except ValueError:
+                return None
+        return self._project_id
+
+    def forget(self, token: str):
+        """Drop a cached verification, e.g. after the user signs out"""
+        self._tokens.pop(token_key(token))
+
+    # ==================== CERT REFRESH ====================
+
+    async def refresh_certs(self) -> int:
+        """Download the current certs; returns their max-age in seconds"""
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            response = await client.get(CERTS_URL)
+            response.raise_for_status()
+
+        match = _MAX_AGE.search(response.headers.get("cache-control", ""))
+        max_age = int(match.group(1)) if match else 3600
+        self._certs = response.json()
+        self._certs_expire_at = time.monotonic() + max_age
+        self.cert_refreshes += 1
+        return max_age
+
+    async def _refresh_loop(self):
+        while True:
+            try:
+                max_age = await self.refresh_certs()
+                delay = max(60.0, max_age - self.refresh_margin_seconds)
+            except Exception as e:
+                # Keep serving with the certs we have (or the fallback) and retry soon
+                self.cert_refresh_errors += 1
+                self.last_refresh_error = str(e)
+                delay = 30.0
+            await asyncio.sleep(delay)
+
+    def start(self):
+        """Start refreshing certs in the background; call from the app lifespan"""
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._refresh_task
+            self._refresh_task = None
+
+    def stats(self) -> dict:
+        return {
+            "tokens": self._tokens.stats(),
+            "certs_loaded": len(self._certs),
+            "certs_expire_in": max(0, round(self._certs_expire_at - time.monotonic())),
+            "local_verifications": self.local_verifications,
+            "fallback_verifications": self.fallback_verifications,
+            "cert_refreshes": self.cert_refreshes,
+            "cert_refresh_errors": self.cert_refresh_errors,
+            "last_refresh_error": self.last_refresh_error
+        }
+
+
+token_verifier = TokenVerifier(max_entries=settings.auth_token_cache_max_entries)
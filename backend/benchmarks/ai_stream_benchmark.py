@@ -0,0 +1,76 @@
+"""
+AI tutor latency benchmark: /ai/chat versus /ai/chat/stream
+
+Sends concurrent questions to a running API (normally pointed at
+benchmarks/gemini_stub.py) and reports time-to-first-byte of answer text and
+total time for the blocking and the streaming endpoint.
+
+Usage:
+    python benchmarks/gemini_stub.py --port 9000 &
+    GEMINI_BASE_URL=http://localhost:9000/v1beta uvicorn app.main:app --port 8000 &
+    python benchmarks/ai_stream_benchmark.py --concurrency 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import httpx
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def ask_blocking(client, question):
+    start = time.perf_counter()
+    response = await client.post("/ai/chat", json={"question": question})
+    response.raise_for_status()
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed
+
+
+async def ask_streaming(client, question):
+    start = time.perf_counter()
+    first_token = None
+    async with client.stream("POST", "/ai/chat/stream", json={"question": question}) as response:
+        async for line in response.aiter_lines():
+            if first_token is None and line.startswith("data:"):
+                first_token = time.perf_counter() - start
+    return first_token or 0.0, time.perf_counter() - start
+
+
+async def run(label, ask, client, args):
+    results = []
+    for _ in range(args.rounds):
+        results += await asyncio.gather(*[
+            ask(client, f"What is photosynthesis? ({i})") for i in range(args.concurrency)
+        ])
+    
+    first = [r[0] for r in results]
+    total = [r[1] for r in results]
+    print(f"{label:<10} first token p50={percentile(first, 50) * 1000:7.0f}ms "
+          f"p95={percentile(first, 95) * 1000:7.0f}ms | "
+          f"total p50={percentile(total, 50) * 1000:7.0f}ms mean={statistics.mean(total) * 1000:7.0f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    
+    print("\n" + "=" * 60)
+    print("LearnAge - AI Tutor Streaming Benchmark")
+    print("=" * 60 + "\n")
+    
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=120) as client:
+        await run("blocking", ask_blocking, client, args)
+        await run("streaming", ask_streaming, client, args)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
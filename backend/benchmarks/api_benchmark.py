@@ -0,0 +1,323 @@
+"""
+End-to-end API benchmark on the in-memory data backend
+
+Runs the whole FastAPI app in-process with DATA_BACKEND=memory, seeds a school
+(classes of students with teachers, parents, a school year of attendance,
+homework, submissions and chat), then drives a weighted mix of requests across
+every router at a fixed concurrency. Each Firestore round trip can be given a
+simulated latency so the numbers reflect I/O waits rather than a local dict.
+
+Reports overall throughput, per-route p50/p95/p99 and Firestore round trips per
+request; --json writes the same numbers to a file for comparing runs.
+
+Usage:
+    python benchmarks/api_benchmark.py --classes 4 --requests 5000 --concurrency 50 --latency-ms 20
+    python benchmarks/gemini_stub.py --port 9011 &
+    python benchmarks/api_benchmark.py --gemini-url http://localhost:9011/v1beta
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def school_days(count):
+    """The last `count` weekdays, oldest first"""
+    days, day = [], date.today()
+    while len(days) < count:
+        day -= timedelta(days=1)
+        if day.weekday() < 5:
+            days.append(day.isoformat())
+    return days[::-1]
+
+
+def seed(args):
+    """Populate the memory backend through the service layer; returns the IDs the mix uses"""
+    from app.services.firebase_service import FirebaseService, auth_client
+
+    rng = random.Random(args.seed)
+
+    def create(email, name, role, class_id=None, parent_id=None):
+        uid = auth_client.create_user(email=email, password="benchmark").uid
+        FirebaseService.create_user_profile(uid, email, name, role, class_id, parent_id)
+        return uid
+
+    school = {"classes": [], "teachers": [], "students": [], "parents": [], "homework": []}
+    days = school_days(args.school_days)
+
+    for c in range(args.classes):
+        class_id = f"Class-{c + 1}"
+        teacher_id = create(f"teacher{c}@school.test", f"Teacher {c}", "teacher", class_id)
+        school["classes"].append(class_id)
+        school["teachers"].append((teacher_id, class_id))
+
+        students = []
+        for s in range(args.students):
+            parent_id = create(f"parent{c}-{s}@school.test", f"Parent {c}-{s}", "parent")
+            student_id = create(f"student{c}-{s}@school.test", f"Student {c}-{s}", "student", class_id, parent_id)
+            students.append((student_id, f"Student {c}-{s}"))
+            school["students"].append((student_id, class_id))
+            school["parents"].append(parent_id)
+
+        for day in days:
+            records = [
+                {"student_id": sid, "student_name": name,
+                 "status": "present" if rng.random() < 0.92 else "absent"}
+                for sid, name in students
+            ]
+            FirebaseService.mark_attendance(class_id, day, records, teacher_id)
+
+        for h in range(args.homework):
+            FirebaseService.assign_homework(class_id, rng.choice(["Math", "Science", "English", "History"]),
+                                            days[-1 - h % len(days)], f"Assignment {h}", teacher_id)
+
+        for m in range(args.messages):
+            sender_id, name = rng.choice(students)
+            FirebaseService.send_message(class_id, sender_id, name, "student", f"Message {m}")
+
+    for student_id, _ in school["students"]:
+        homework, _ = FirebaseService.get_student_homework(student_id, 200)
+        for item in homework:
+            school["homework"].append(item["id"])
+            if rng.random() < 0.5:
+                FirebaseService.mark_homework_submitted(item["id"], student_id)
+
+    return school
+
+
+def request_mix(school, rng, with_ai):
+    """(weight, route label, builder) where builder returns (method, url, kwargs)"""
+    from app.services.firebase_service import auth_client
+
+    def student():
+        student_id, class_id = rng.choice(school["students"])
+        return student_id, class_id, {"Authorization": f"Bearer {auth_client.issue_token(student_id)}"}
+
+    def teacher():
+        teacher_id, class_id = rng.choice(school["teachers"])
+        return teacher_id, class_id, {"Authorization": f"Bearer {auth_client.issue_token(teacher_id)}"}
+
+    def parent():
+        parent_id = rng.choice(school["parents"])
+        return parent_id, {"Authorization": f"Bearer {auth_client.issue_token(parent_id)}"}
+
+    def get(path_fn):
+        def build():
+            url, headers = path_fn()
+            return "GET", url, {"headers": headers}
+        return build
+
+    def verify_token():
+        student_id, _, _ = student()
+        return "POST", "/auth/verify-token", {"params": {"token": auth_client.issue_token(student_id)}}
+
+    def submit_homework():
+        student_id, _, headers = student()
+        homework_id = rng.choice(school["homework"])
+        return "PUT", f"/student/homework/{homework_id}/submit", {"params": {"student_id": student_id}, "headers": headers}
+
+    def mark_attendance():
+        teacher_id, class_id, headers = teacher()
+        records = [
+            {"student_id": sid, "student_name": sid, "status": rng.choice(["present", "absent"])}
+            for sid, cid in school["students"] if cid == class_id
+        ]
+        body = {"class_id": class_id, "date": date.today().isoformat(), "attendance": records}
+        return "POST", "/teacher/attendance", {"params": {"teacher_id": teacher_id}, "json": body, "headers": headers}
+
+    def assign_homework():
+        teacher_id, class_id, headers = teacher()
+        body = {"class_id": class_id, "subject": "Math", "due_date": date.today().isoformat(), "description": "Practice"}
+        return "POST", "/teacher/homework", {"params": {"teacher_id": teacher_id}, "json": body, "headers": headers}
+
+    def send_message():
+        student_id, class_id, headers = student()
+        body = {"class_id": class_id, "sender_id": student_id, "sender_name": student_id,
+                "sender_role": "student", "message": "Benchmark message"}
+        return "POST", "/messages/send", {"json": body, "headers": headers}
+
+    def ask_ai():
+        _, class_id, headers = student()
+        body = {"question": f"Explain topic {rng.randrange(1000)}", "class_id": class_id}
+        return "POST", "/ai/chat", {"json": body, "headers": headers}
+
+    def student_get(template):
+        def path():
+            student_id, _, headers = student()
+            return template.format(id=student_id), headers
+        return get(path)
+
+    def class_get(template):
+        def path():
+            _, class_id, headers = student()
+            return template.format(class_id=class_id), headers
+        return get(path)
+
+    def teacher_get(template):
+        def path():
+            teacher_id, class_id, headers = teacher()
+            return template.format(id=teacher_id, class_id=class_id), headers
+        return get(path)
+
+    def parent_get(template):
+        def path():
+            parent_id, headers = parent()
+            return template.format(id=parent_id), headers
+        return get(path)
+
+    def child_get(template):
+        def path():
+            child_id, _ = rng.choice(school["students"])
+            _, headers = parent()
+            return template.format(id=child_id), headers
+        return get(path)
+
+    def homework_get(template):
+        def path():
+            _, _, headers = teacher()
+            return template.format(id=rng.choice(school["homework"])), headers
+        return get(path)
+
+    mix = [
+        (4, "POST /auth/verify-token", verify_token),
+        (4, "GET /auth/user/{uid}", student_get("/auth/user/{id}")),
+        (10, "GET /student/dashboard/{id}", student_get("/student/dashboard/{id}")),
+        (8, "GET /student/bundle/{id}", student_get("/student/bundle/{id}")),
+        (5, "GET /student/attendance/{id}", student_get("/student/attendance/{id}")),
+        (5, "GET /student/attendance/{id}/summary", student_get("/student/attendance/{id}/summary")),
+        (8, "GET /student/homework/{id}", student_get("/student/homework/{id}")),
+        (3, "PUT /student/homework/{id}/submit", submit_homework),
+        (3, "GET /teacher/dashboard/{id}", teacher_get("/teacher/dashboard/{id}")),
+        (3, "GET /teacher/students/{class_id}", teacher_get("/teacher/students/{class_id}")),
+        (2, "GET /teacher/analytics/attendance/{class_id}", teacher_get("/teacher/analytics/attendance/{class_id}")),
+        (1, "POST /teacher/attendance", mark_attendance),
+        (1, "POST /teacher/homework", assign_homework),
+        (2, "GET /teacher/homework/{id}/submissions", homework_get("/teacher/homework/{id}/submissions")),
+        (5, "GET /parent/dashboard/{id}", parent_get("/parent/dashboard/{id}")),
+        (4, "GET /parent/bundle/{id}", parent_get("/parent/bundle/{id}")),
+        (3, "GET /parent/attendance/{id}", child_get("/parent/attendance/{id}")),
+        (3, "GET /parent/homework/{id}", child_get("/parent/homework/{id}")),
+        (12, "GET /messages/class/{class_id}", class_get("/messages/class/{class_id}")),
+        (4, "POST /messages/send", send_message),
+        (1, "GET /messages/stats", get(lambda: ("/messages/stats", {}))),
+        (1, "GET /health", get(lambda: ("/health", {}))),
+    ]
+    if with_ai:
+        mix.append((3, "POST /ai/chat", ask_ai))
+    return mix
+
+
+async def drive(app, mix, args, rng):
+    """Send args.requests requests from the mix, args.concurrency at a time"""
+    import httpx
+
+    weights = [weight for weight, _, _ in mix]
+    plan = rng.choices(mix, weights=weights, k=args.requests)
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    queue = iter(plan)
+
+    async def worker(client):
+        for _, label, build in queue:
+            method, url, kwargs = build()
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies[label].append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors[label] += 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=60.0) as client:
+            start = time.perf_counter()
+            await asyncio.gather(*(worker(client) for _ in range(args.concurrency)))
+            elapsed = time.perf_counter() - start
+    return latencies, errors, elapsed
+
+
+def report(latencies, errors, elapsed, round_trips, args):
+    total = sum(len(values) for values in latencies.values())
+    print(f"\n{total} requests in {elapsed:.2f}s -> {total / elapsed:,.0f} req/s "
+          f"(concurrency {args.concurrency}, {round_trips / total:.1f} Firestore round trips/request)\n")
+    print(f"{'route':<46} {'count':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'errors':>7}")
+    routes = {}
+    for label in sorted(latencies):
+        values = latencies[label]
+        p50, p95, p99 = (percentile(values, pct) * 1000 for pct in (50, 95, 99))
+        routes[label] = {"count": len(values), "p50_ms": p50, "p95_ms": p95, "p99_ms": p99,
+                         "errors": errors[label]}
+        print(f"{label:<46} {len(values):>6} {p50:>6.1f}ms {p95:>6.1f}ms {p99:>6.1f}ms {errors[label]:>7}")
+
+    if args.json:
+        summary = {
+            "requests": total,
+            "seconds": elapsed,
+            "requests_per_second": total / elapsed,
+            "firestore_round_trips": round_trips,
+            "settings": vars(args),
+            "routes": routes
+        }
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+        print(f"\nwrote {args.json}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--classes", type=int, default=4)
+    parser.add_argument("--students", type=int, default=40, help="students per class")
+    parser.add_argument("--school-days", type=int, default=200)
+    parser.add_argument("--homework", type=int, default=40, help="assignments per class")
+    parser.add_argument("--messages", type=int, default=200, help="chat messages per class")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="simulated Firestore round trip")
+    parser.add_argument("--gemini-url", help="include /ai/chat, sent to this Gemini base URL (e.g. the stub)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    os.environ["DATA_BACKEND"] = "memory"
+    os.environ["MEMORY_BACKEND_LATENCY_MS"] = "0"
+    os.environ["STARTUP_WARM_UP"] = "false"
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+    if args.gemini_url:
+        os.environ["GEMINI_BASE_URL"] = args.gemini_url
+
+    from app.main import app
+    from app.services.firebase_service import init_data_backend
+    db, _ = init_data_backend()
+
+    print("\n" + "=" * 60)
+    print("LearnAge - End-to-End API Benchmark (memory backend)")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    school = seed(args)
+    print(f"seeded {len(school['classes'])} classes, {len(school['students'])} students, "
+          f"{args.school_days} school days in {time.perf_counter() - start:.1f}s")
+    print(f"simulated Firestore round trip: {args.latency_ms:.0f} ms")
+
+    rng = random.Random(args.seed)
+    db.latency_seconds = args.latency_ms / 1000
+    round_trips_before = db.round_trips
+    latencies, errors, elapsed = asyncio.run(drive(app, request_mix(school, rng, bool(args.gemini_url)), args, rng))
+    report(latencies, errors, elapsed, db.round_trips - round_trips_before, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Class chat WebSocket load test
+
+Opens thousands of idle WebSocket connections spread over a few classes,
+holds them, then sends messages over HTTP and measures how long each takes
+to reach every connected client. Also prints the server's /messages/stats.
+
+Raise the open-file limit first for large runs (ulimit -n 65536).
+
+Usage:
+    uvicorn app.main:app --port 8000
+    python benchmarks/chat_ws_load.py --connections 5000 --classes 10 --messages 20
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import httpx
+import websockets
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def listen(url, ready, arrivals):
+    async with websockets.connect(url, open_timeout=60) as ws:
+        ready.release()
+        async for raw in ws:
+            event = json.loads(raw)
+            if event.get("type") == "message.created":
+                arrivals.append((event["message"]["message"], time.perf_counter()))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--connections", type=int, default=2000)
+    parser.add_argument("--classes", type=int, default=10)
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--hold-seconds", type=float, default=10.0)
+    args = parser.parse_args()
+    
+    ws_base = args.base_url.replace("http", "ws", 1)
+    ready = asyncio.Semaphore(0)
+    arrivals = []
+    
+    print("\n" + "=" * 60)
+    print("LearnAge - Class Chat WebSocket Load Test")
+    print("=" * 60)
+    
+    start = time.perf_counter()
+    listeners = [
+        asyncio.create_task(listen(f"{ws_base}/messages/ws/load-class-{i % args.classes}", ready, arrivals))
+        for i in range(args.connections)
+    ]
+    for _ in range(args.connections):
+        await ready.acquire()
+    print(f"{args.connections} connections open in {time.perf_counter() - start:.1f}s; "
+          f"holding idle for {args.hold_seconds:.0f}s")
+    await asyncio.sleep(args.hold_seconds)
+    
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=30) as client:
+        sent_at = {}
+        for n in range(args.messages):
+            text = f"load-{n}"
+            sent_at[text] = time.perf_counter()
+            await client.post("/messages/send", json={
+                "class_id": f"load-class-{n % args.classes}",
+                "sender_id": "load-test",
+                "sender_name": "Load Test",
+                "sender_role": "teacher",
+                "message": text
+            })
+        await asyncio.sleep(2)
+        stats = (await client.get("/messages/stats")).json()
+    
+    latencies = [(at - sent_at[text]) * 1000 for text, at in arrivals if text in sent_at]
+    expected = sum(
+        len([i for i in range(args.connections) if i % args.classes == n % args.classes])
+        for n in range(args.messages)
+    )
+    print(f"deliveries {len(latencies)}/{expected}")
+    if latencies:
+        print(f"fan-out latency p50={percentile(latencies, 50):.1f}ms "
+              f"p99={percentile(latencies, 99):.1f}ms max={max(latencies):.1f}ms")
+    print(f"server stats: {stats}")
+    
+    for task in listeners:
+        task.cancel()
+    await asyncio.gather(*listeners, return_exceptions=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+"""
+Event-loop concurrency benchmark for the LearnAge API
+
+Fires a burst of concurrent Firestore-backed requests at a running server and,
+at the same time, probes /health. If data-access calls block the event loop the
+/health latency climbs to the duration of the Firestore calls; with the calls
+running on the Firebase executor it stays in the low milliseconds.
+
+Usage:
+    uvicorn app.main:app --port 8000
+    python benchmarks/concurrency_benchmark.py --student-id <uid> --concurrency 50
+"""
+
+import argparse
+import statistics
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def timed_get(url):
+    """GET a URL and return (seconds, status)"""
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=60) as response:
+            response.read()
+            status = response.status
+    except Exception:
+        status = None
+    return time.perf_counter() - start, status
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def report(label, samples):
+    latencies = [s for s, _ in samples]
+    failures = sum(1 for _, status in samples if status != 200)
+    print(f"{label:<12} n={len(latencies):<5} fail={failures:<4} "
+          f"p50={percentile(latencies, 50) * 1000:8.1f}ms "
+          f"p99={percentile(latencies, 99) * 1000:8.1f}ms "
+          f"mean={statistics.mean(latencies) * 1000:8.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--student-id", required=True)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--health-probes", type=int, default=100)
+    args = parser.parse_args()
+
+    data_url = f"{args.base_url}/student/dashboard/{args.student_id}"
+    health_url = f"{args.base_url}/health"
+
+    print("\n" + "=" * 60)
+    print("LearnAge - Concurrency Benchmark")
+    print("=" * 60)
+    print(f"{args.requests} dashboard requests at concurrency {args.concurrency}\n")
+
+    with ThreadPoolExecutor(max_workers=args.concurrency + 1) as pool:
+        start = time.perf_counter()
+        data_futures = [pool.submit(timed_get, data_url) for _ in range(args.requests)]
+
+        health_samples = []
+        for _ in range(args.health_probes):
+            health_samples.append(timed_get(health_url))
+            time.sleep(0.01)
+
+        data_samples = [f.result() for f in data_futures]
+        elapsed = time.perf_counter() - start
+
+    report("dashboard", data_samples)
+    report("/health", health_samples)
+    print(f"\nThroughput: {len(data_samples) / elapsed:.1f} req/s over {elapsed:.2f}s")
+
+    with urllib.request.urlopen(health_url) as response:
+        print(f"Executor: {response.read().decode()}")
+
+
+if __name__ == "__main__":
+    main()
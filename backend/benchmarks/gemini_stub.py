@@ -0,0 +1,77 @@
+"""
+Local stand-in for the Gemini REST API
+
+Serves generateContent and streamGenerateContent (alt=sse) with a configurable
+time-to-first-token and per-token delay, so the AI tutor can be benchmarked
+without API quota. embedContent returns a bag-of-words vector so that
+questions sharing most of their words land close together.
+
+Usage:
+    python benchmarks/gemini_stub.py --port 9000 --first-token-ms 300 --token-ms 40
+    GEMINI_BASE_URL=http://localhost:9000/v1beta uvicorn app.main:app --port 8000
+"""
+
+import argparse
+import asyncio
+import json
+import zlib
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+app = FastAPI(title="Gemini stub")
+
+config = {"first_token_ms": 300, "token_ms": 40, "tokens": 60}
+
+
+def _chunk(text):
+    return {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}}]}
+
+
+def _tokens():
+    return [f"token{i} " for i in range(config["tokens"])]
+
+
+def _embed(text, dimensions=64):
+    vector = [0.0] * dimensions
+    for word in text.lower().split():
+        vector[zlib.crc32(word.encode()) % dimensions] += 1.0
+    return vector
+
+
+@app.post("/v1beta/models/{model_action}")
+async def generate(model_action: str, request: Request):
+    body = await request.json()
+    
+    if model_action.endswith(":embedContent"):
+        await asyncio.sleep(0.02)
+        return {"embedding": {"values": _embed(body["content"]["parts"][0]["text"])}}
+    
+    if model_action.endswith(":streamGenerateContent"):
+        async def events():
+            await asyncio.sleep(config["first_token_ms"] / 1000)
+            for token in _tokens():
+                yield f"data: {json.dumps(_chunk(token))}\r\n\r\n"
+                await asyncio.sleep(config["token_ms"] / 1000)
+        
+        return StreamingResponse(events(), media_type="text/event-stream")
+    
+    await asyncio.sleep((config["first_token_ms"] + config["token_ms"] * config["tokens"]) / 1000)
+    return _chunk("".join(_tokens()))
+
+
+def main():
+    import uvicorn
+    
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--first-token-ms", type=int, default=300)
+    parser.add_argument("--token-ms", type=int, default=40)
+    parser.add_argument("--tokens", type=int, default=60)
+    args = parser.parse_args()
+    
+    config.update(first_token_ms=args.first_token_ms, token_ms=args.token_ms, tokens=args.tokens)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+HTTP caching and compression benchmark
+
+Requests each read endpoint three ways against a running server and reports
+the bytes on the wire and latency for each:
+
+    plain        no compression, no validator (the old behaviour)
+    compressed   Accept-Encoding: gzip, br
+    revalidated  compressed, with If-None-Match from the previous response
+
+Usage:
+    uvicorn app.main:app --port 8000
+    python benchmarks/http_caching_benchmark.py --student-id <uid> --class-id Class-10A
+"""
+
+import argparse
+import statistics
+import time
+import urllib.error
+import urllib.request
+
+
+def fetch(url, headers):
+    """GET a URL; returns (seconds, status, body bytes, response headers)"""
+    request = urllib.request.Request(url, headers=headers)
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            body = response.read()
+            status, response_headers = response.status, response.headers
+    except urllib.error.HTTPError as e:
+        body, status, response_headers = e.read(), e.code, e.headers
+    return time.perf_counter() - start, status, len(body), response_headers
+
+
+def measure(url, headers, repeat):
+    samples = [fetch(url, headers) for _ in range(repeat)]
+    return (
+        statistics.median(s[0] for s in samples) * 1000,
+        samples[-1][2],
+        samples[-1][1]
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--student-id", required=True)
+    parser.add_argument("--class-id", required=True)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    paths = [
+        f"/student/dashboard/{args.student_id}",
+        f"/student/attendance/{args.student_id}",
+        f"/student/homework/{args.student_id}",
+        f"/student/bundle/{args.student_id}",
+        f"/teacher/students/{args.class_id}",
+        f"/messages/class/{args.class_id}?limit=100",
+    ]
+
+    print("\n" + "=" * 60)
+    print("LearnAge - HTTP Caching & Compression Benchmark")
+    print("=" * 60)
+    print(f"{'endpoint':<40} {'mode':<12} {'bytes':>8} {'median':>9}")
+
+    totals = {"plain": 0, "compressed": 0, "revalidated": 0}
+    for path in paths:
+        url = args.base_url + path
+        _, _, _, first = fetch(url, {"Accept-Encoding": "gzip, br"})
+        modes = {
+            "plain": {"Accept-Encoding": "identity"},
+            "compressed": {"Accept-Encoding": "gzip, br"},
+            "revalidated": {"Accept-Encoding": "gzip, br", "If-None-Match": first.get("ETag", "")},
+        }
+        for mode, headers in modes.items():
+            latency, size, status = measure(url, headers, args.repeat)
+            totals[mode] += size
+            print(f"{path[:40]:<40} {mode:<12} {size:>8} {latency:>7.1f}ms  ({status})")
+
+    print("\nTotal body bytes per page load:")
+    for mode, size in totals.items():
+        print(f"  {mode:<12} {size:>8}")
+
+
+if __name__ == "__main__":
+    main()
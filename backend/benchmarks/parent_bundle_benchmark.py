@@ -0,0 +1,91 @@
+"""
+Parent dashboard bundle benchmark
+
+Times get_parent_bundle for parents with 1..N children, with every Firestore
+read replaced by a fixed-latency stand-in (default 40 ms, about one Firestore
+round trip). The children's reads run concurrently, so bundle latency should
+stay near a few round trips whatever the child count. For comparison it also
+times the per-child sequential calls a client would otherwise make.
+
+Usage:
+    python benchmarks/parent_bundle_benchmark.py --max-children 6 --latency-ms 40
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.firebase_service import FirebaseService, async_firebase
+from app.services.dashboard_bundle import get_parent_bundle
+
+
+def install_stand_ins(children, latency):
+    """Replace the reads the bundle makes with sleeps of one round trip each"""
+    def read(result):
+        def call(*args, **kwargs):
+            time.sleep(latency)
+            return result
+        return staticmethod(call)
+
+    child_list = [
+        {"child_name": f"Child {i}", "child_id": f"child-{i}", "class_id": f"Class-{i % 2}"}
+        for i in range(children)
+    ]
+    FirebaseService.get_parent_dashboard = read({**child_list[0], "children": child_list})
+    FirebaseService.get_student_attendance = read([])
+    FirebaseService.get_attendance_summary = read({})
+    FirebaseService.get_student_homework = read(([], None))
+    FirebaseService.get_class_messages = read({"messages": []})
+    return child_list
+
+
+async def sequential_calls(parent_id, children):
+    """Dashboard, then attendance, summary, homework and messages one child at a time"""
+    await async_firebase.get_parent_dashboard(parent_id)
+    for child in children:
+        await async_firebase.get_child_attendance(child["child_id"])
+        await async_firebase.get_child_attendance_summary(child["child_id"])
+        await async_firebase.get_child_homework(child["child_id"])
+        await async_firebase.get_class_messages(child["class_id"])
+
+
+async def timed(coro_fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await coro_fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+async def run(args):
+    latency = args.latency_ms / 1000
+    print(f"{'children':>8} {'bundle':>10} {'sequential':>12}")
+    for count in range(1, args.max_children + 1):
+        children = install_stand_ins(count, latency)
+        bundle = await timed(lambda: get_parent_bundle("parent-1"), args.repeat)
+        sequential = await timed(lambda: sequential_calls("parent-1", children), args.repeat)
+        print(f"{count:>8} {bundle * 1000:>8.0f}ms {sequential * 1000:>10.0f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-children", type=int, default=6)
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print("\n" + "=" * 60)
+    print("LearnAge - Parent Dashboard Bundle Benchmark")
+    print("=" * 60)
+    print(f"simulated Firestore round trip: {args.latency_ms:.0f} ms\n")
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
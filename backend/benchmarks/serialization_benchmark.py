@@ -0,0 +1,86 @@
+"""
+Response serialization micro-benchmark
+
+Encodes the heaviest payloads the API returns, a 100-message chat page and a
+200-item homework list, the way FastAPI's default path does it
+(jsonable_encoder + JSONResponse) and with FastJSONResponse returned directly,
+and reports the time per response. No Firestore access is needed.
+
+Usage:
+    python benchmarks/serialization_benchmark.py --repeat 2000
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from google.api_core.datetime_helpers import DatetimeWithNanoseconds
+from app.responses import FastJSONResponse
+
+
+def chat_page(count=100):
+    start = datetime(2026, 1, 12, 8, 0, tzinfo=timezone.utc)
+    messages = []
+    for i in range(count):
+        sent = start + timedelta(minutes=i)
+        messages.append({
+            "id": f"msg{i:05d}AbCdEfGhIjKl",
+            "sender_id": f"student-{i % 40:03d}",
+            "sender_name": f"Student {i % 40}",
+            "sender_role": "student",
+            "message": f"Question about exercise {i}: how do we simplify the second step?",
+            # Firestore hands timestamps back as this datetime subclass
+            "timestamp": DatetimeWithNanoseconds(
+                sent.year, sent.month, sent.day, sent.hour, sent.minute, tzinfo=timezone.utc
+            )
+        })
+    return {"messages": messages, "since_cursor": "eyJ0IjogIjIwMjYifQ", "before_cursor": None, "has_more": True}
+
+
+def homework_list(count=200):
+    return {
+        "homework": [
+            {
+                "id": f"hw{i:05d}",
+                "subject": ["Math", "Science", "English", "History"][i % 4],
+                "due_date": (datetime(2026, 1, 5) + timedelta(days=i % 90)).strftime("%Y-%m-%d"),
+                "description": f"Complete exercises {i} to {i + 10} and show your working.",
+                "submitted": i % 3 == 0
+            }
+            for i in range(count)
+        ],
+        "next_cursor": "2026-04-04|hw00199"
+    }
+
+
+def time_per_call(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    print("\n" + "=" * 60)
+    print("LearnAge - Response Serialization Benchmark")
+    print("=" * 60)
+    print(f"{'payload':<22} {'default':>10} {'fast':>10} {'speedup':>8}")
+
+    for label, payload in [("chat page (100)", chat_page()), ("homework list (200)", homework_list())]:
+        default = time_per_call(lambda: JSONResponse(jsonable_encoder(payload)), args.repeat)
+        fast = time_per_call(lambda: FastJSONResponse(payload), args.repeat)
+        print(f"{label:<22} {default * 1e6:>8.0f}us {fast * 1e6:>8.0f}us {default / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
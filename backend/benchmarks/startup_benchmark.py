@@ -0,0 +1,155 @@
+"""
+Startup benchmark: import time and time to first request
+
+1. Runs `python -X importtime -c "import app.main"` in fresh interpreters and
+   reports the total import time and the slowest imports. The script exits
+   non-zero when the median exceeds --budget-ms, so CI can catch a heavy
+   import creeping back in.
+2. Starts uvicorn in a subprocess and measures the time until /health
+   answers and until a first route that reads from the data backend answers.
+
+Runs against the in-memory data backend unless --firestore is given, in which
+case the normal Firebase settings from .env are used.
+
+Usage:
+    python benchmarks/startup_benchmark.py --runs 5 --budget-ms 1500
+    python benchmarks/startup_benchmark.py --firestore --skip-import
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def benchmark_env(args):
+    env = dict(os.environ)
+    env.setdefault("GEMINI_API_KEY", "benchmark")
+    if not args.firestore:
+        env["DATA_BACKEND"] = "memory"
+    return env
+
+
+def parse_importtime(stderr):
+    """{module: (self_us, cumulative_us)} from -X importtime output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|").split("|"))
+        modules[name] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def import_times(args):
+    env = benchmark_env(args)
+    command = [sys.executable, "-X", "importtime", "-c", "import app.main"]
+    # The first run compiles bytecode; keep it out of the numbers
+    subprocess.run(command, cwd=BACKEND_DIR, env=env, capture_output=True, check=True)
+
+    totals, runs = [], []
+    for _ in range(args.runs):
+        result = subprocess.run(command, cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True)
+        modules = parse_importtime(result.stderr)
+        totals.append(modules["app.main"][1] / 1000)
+        runs.append(modules)
+    return totals, runs[totals.index(statistics.median_low(totals))]
+
+
+def report_imports(totals, modules, args):
+    median = statistics.median(totals)
+    print(f"import app.main: median {median:.0f} ms, min {min(totals):.0f} ms over {len(totals)} runs "
+          f"(budget {args.budget_ms:.0f} ms)\n")
+
+    # Third-party packages and app modules, by cumulative time
+    tops = {}
+    for name, (_, cumulative) in modules.items():
+        top = name if name.startswith("app.") else name.split(".")[0]
+        if name == top or name.startswith("app."):
+            tops[top] = max(tops.get(top, 0), cumulative)
+    print(f"{'module':<44} {'cumulative':>10}")
+    for name, cumulative in sorted(tops.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{name:<44} {cumulative / 1000:>8.1f}ms")
+    return median <= args.budget_ms
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(client, url, deadline):
+    while time.perf_counter() < deadline:
+        try:
+            response = client.get(url)
+            if response.status_code < 500:
+                return response
+        except httpx.TransportError:
+            pass
+        time.sleep(0.01)
+    raise TimeoutError(f"{url} did not answer in time")
+
+
+def first_request_times(args):
+    """(seconds until /health answers, seconds until --path answers) for one server start"""
+    port = free_port()
+    command = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"]
+    start = time.perf_counter()
+    server = subprocess.Popen(command, cwd=BACKEND_DIR, env=benchmark_env(args))
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=30.0) as client:
+            deadline = start + args.timeout
+            wait_for(client, "/health", deadline)
+            healthy = time.perf_counter() - start
+            wait_for(client, args.path, deadline)
+            first_read = time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait()
+    return healthy, first_read
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1500.0, help="fail when median import time exceeds this")
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    parser.add_argument("--path", default="/auth/user/startup-benchmark",
+                        help="route timed as the first data read")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--firestore", action="store_true", help="use the real Firebase settings")
+    parser.add_argument("--skip-import", action="store_true")
+    parser.add_argument("--skip-server", action="store_true")
+    args = parser.parse_args()
+
+    print("\n" + "=" * 60)
+    print("LearnAge - Startup Benchmark")
+    print("=" * 60)
+    print(f"data backend: {'firestore' if args.firestore else 'memory'}\n")
+
+    within_budget = True
+    if not args.skip_import:
+        totals, modules = import_times(args)
+        within_budget = report_imports(totals, modules, args)
+
+    if not args.skip_server:
+        results = [first_request_times(args) for _ in range(args.runs)]
+        healthy = statistics.median(r[0] for r in results)
+        first_read = statistics.median(r[1] for r in results)
+        print(f"\nprocess start -> /health answered:  median {healthy * 1000:.0f} ms")
+        print(f"process start -> {args.path} answered:  median {first_read * 1000:.0f} ms")
+
+    if not within_budget:
+        print("\nimport time is over budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Data migrations for the LearnAge Platform
+Backfills derived Firestore structures from the source collections.
+Every command is idempotent and safe to re-run.
+
+Usage:
+    python migrate.py attendance-dedup [--class-id Class-10A]
+    python migrate.py attendance-rollups [--class-id Class-10A]
+    python migrate.py homework-submissions [--class-id Class-10A]
+    python migrate.py homework-index [--class-id Class-10A]
+    python migrate.py parent-children [--class-id Class-10A]
+"""
+
+import argparse
+from firebase_admin import firestore
+from app.services.firebase_service import (
+    db, FirebaseService, BulkWriter, attendance_doc_id,
+    attendance_rollup_id, apply_rollup_day, rollup_doc
+)
+
+
+def _class_ids(class_id=None):
+    """Classes that have students or homework"""
+    if class_id:
+        return [class_id]
+    
+    class_ids = set()
+    for collection in ("homework", "users"):
+        for doc in db.collection(collection).select(["class_id"]).stream():
+            class_ids.add(doc.to_dict().get("class_id"))
+    class_ids.discard(None)
+    return sorted(class_ids)
+
+
+def migrate_homework_index(class_id=None):
+    """Build student_homework/{student_id} indexes from the homework collection"""
+    for cid in _class_ids(class_id):
+        pending_counts = FirebaseService.rebuild_class_homework_index(cid)
+        print(f"✓ {cid}: indexed homework for {len(pending_counts)} students")
+
+
+def migrate_attendance_rollups(class_id=None):
+    """Rebuild attendance_rollups/{student_id}_{YYYY-MM} from the attendance collection"""
+    query = db.collection("attendance")
+    if class_id:
+        query = query.where("class_id", "==", class_id)
+    
+    rollups = {}
+    for doc in query.stream():
+        data = doc.to_dict()
+        if not data.get("date") or not data.get("status"):
+            continue
+        key = (data.get("student_id"), data["date"][:7])
+        current = rollups.get(key, (data.get("class_id"), None))
+        rollups[key] = (current[0], apply_rollup_day(current[1], data["date"], data["status"]))
+    
+    writer = BulkWriter()
+    for (student_id, month), (cid, days) in rollups.items():
+        writer.set(
+            db.collection("attendance_rollups").document(attendance_rollup_id(student_id, month)),
+            rollup_doc(student_id, cid, month, days)
+        )
+    result = writer.commit()
+    
+    print(f"✓ Wrote {len(result.succeeded)} monthly rollups")
+    if not result.ok:
+        print(f"✗ {len(result.failed)} rollups failed, re-run to retry")
+
+
+def migrate_homework_submissions(class_id=None):
+    """Move embedded homework.submissions maps into homework/{id}/submissions docs"""
+    query = db.collection("homework")
+    if class_id:
+        query = query.where("class_id", "==", class_id)
+    
+    moved = 0
+    for hw in query.stream():
+        submissions = hw.to_dict().get("submissions")
+        if submissions is None:
+            continue
+        
+        # Submission docs written since the switch are newer than the map entries
+        existing = {doc.id for doc in hw.reference.collection("submissions").stream()}
+        writer = BulkWriter()
+        for student_id, submission in submissions.items():
+            if student_id not in existing:
+                writer.set(
+                    hw.reference.collection("submissions").document(student_id),
+                    {"student_id": student_id, **submission},
+                    key=hw.id
+                )
+        count = len(writer)
+        # Same key as the submission writes: the map is only removed together with them
+        writer.set(hw.reference, {"submissions": firestore.DELETE_FIELD}, merge=True, key=hw.id)
+        result = writer.commit()
+        
+        if not result.ok:
+            print(f"✗ {hw.id}: {result.failed[hw.id]}")
+            continue
+        moved += count
+        print(f"✓ {hw.id}: moved {count} submissions")
+    
+    print(f"\nMoved {moved} submissions in total")
+
+
+def migrate_attendance_dedup(class_id=None):
+    """Collapse attendance to one deterministic doc per (class, date, student), keeping the latest mark"""
+    query = db.collection("attendance")
+    if class_id:
+        query = query.where("class_id", "==", class_id)
+    
+    latest = {}
+    duplicates = []
+    for doc in query.stream():
+        data = doc.to_dict()
+        key = attendance_doc_id(data.get("class_id"), data.get("date"), data.get("student_id"))
+        current = latest.get(key)
+        if current is None:
+            latest[key] = doc
+            continue
+        # Keep the most recent mark; ties favour the doc already under the deterministic ID
+        current_at = current.to_dict().get("marked_at")
+        doc_at = data.get("marked_at")
+        newer = doc_at is not None and (current_at is None or doc_at > current_at)
+        if newer or (doc.id == key and doc_at == current_at):
+            duplicates.append((key, current))
+            latest[key] = doc
+        else:
+            duplicates.append((key, doc))
+    
+    # Rewrites and deletes share the day's key, so a day is only cleaned up
+    # in the same batch that writes its surviving record
+    writer = BulkWriter()
+    rewritten = 0
+    for key, doc in latest.items():
+        if doc.id != key:
+            writer.set(db.collection("attendance").document(key), doc.to_dict(), key=key)
+            writer.delete(doc.reference, key=key)
+            rewritten += 1
+    
+    removed = 0
+    for key, doc in duplicates:
+        # A losing doc that already sits under the deterministic ID is overwritten, not deleted
+        if doc.id != key:
+            writer.delete(doc.reference, key=key)
+            removed += 1
+    result = writer.commit()
+    
+    print(f"✓ {len(latest)} attendance days kept, {rewritten} moved to deterministic IDs, "
+          f"{removed} duplicates removed")
+    if not result.ok:
+        print(f"✗ {len(result.failed)} days failed, re-run to retry: {sorted(result.failed)[:10]}")
+
+
+def migrate_parent_children(class_id=None):
+    """Record each student's ID in their parent's child_ids list"""
+    query = db.collection("users").where("role", "==", "student")
+    if class_id:
+        query = query.where("class_id", "==", class_id)
+    
+    children = {}
+    for doc in query.select(["parent_id"]).stream():
+        parent_id = doc.to_dict().get("parent_id")
+        if parent_id:
+            children.setdefault(parent_id, []).append(doc.id)
+    
+    parents = db.get_all([db.collection("users").document(parent_id) for parent_id in children])
+    writer = BulkWriter()
+    missing = 0
+    for parent in parents:
+        if not parent.exists:
+            missing += 1
+            continue
+        writer.update(parent.reference, {"child_ids": firestore.ArrayUnion(children[parent.id])})
+    result = writer.commit()
+    
+    print(f"✓ Linked {sum(len(ids) for ids in children.values())} students to {len(children) - missing} parents")
+    if missing:
+        print(f"  {missing} parent IDs have no profile; their dashboards keep using the parent_id query")
+    if not result.ok:
+        print(f"✗ {len(result.failed)} parents failed, re-run to retry")
+
+
+COMMANDS = {
+    "attendance-dedup": migrate_attendance_dedup,
+    "attendance-rollups": migrate_attendance_rollups,
+    "homework-submissions": migrate_homework_submissions,
+    "homework-index": migrate_homework_index,
+    "parent-children": migrate_parent_children,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LearnAge data migrations")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    parser.add_argument("--class-id", help="Only migrate this class")
+    args = parser.parse_args()
+    
+    print("\n" + "="*60)
+    print(f"LearnAge Platform - Migration: {args.command}")
+    print("="*60 + "\n")
+    
+    COMMANDS[args.command](class_id=args.class_id)
+    
+    print("\n✓ Migration complete!\n")
+
+
+if __name__ == "__main__":
+    main()
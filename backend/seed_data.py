@@ -3,21 +3,18 @@ Demo Data Seeder for LearnAge Platform
 This script creates demo users and initial data in Firebase
 """
 
-import firebase_admin
-from firebase_admin import credentials, auth, firestore
+from firebase_admin import auth
 from datetime import datetime, timedelta
 import random
 
-# Initialize Firebase
-cred = credentials.Certificate('./firebase/serviceAccountKey.json')
-firebase_admin.initialize_app(cred)
-db = firestore.client()
+# Firebase is initialized from the backend settings on first use of db / auth_client
+from app.services.firebase_service import db, auth_client, FirebaseService
 
 def create_user_with_profile(email, password, name, role, class_id=None, parent_id=None):
     """Create a Firebase Auth user and Firestore profile"""
     try:
         # Create Firebase Auth user
-        user = auth.create_user(
+        user = auth_client.create_user(
             email=email,
             password=password,
             display_name=name
@@ -46,7 +43,7 @@ def create_user_with_profile(email, password, name, role, class_id=None, parent_
     except auth.EmailAlreadyExistsError:
         print(f"⚠ User already exists: {email}")
         # Get existing user
-        user = auth.get_user_by_email(email)
+        user = auth_client.get_user_by_email(email)
         return user.uid
     except Exception as e:
         print(f"✗ Error creating user {email}: {e}")
@@ -56,21 +53,23 @@ def seed_attendance(student_id, student_name, class_id):
     """Create sample attendance records for the last 10 days"""
     print(f"Creating attendance records for {student_name}...")
     
+    # Marked through the service, a day at a time, so monthly rollups stay in step
+    created, failed = 0, 0
     for i in range(10):
         date = (datetime.now() - timedelta(days=i)).strftime("%Y-%m-%d")
         status = random.choice(["present", "present", "present", "absent"])  # 75% present
         
-        db.collection("attendance").add({
+        result = FirebaseService.mark_attendance(class_id, date, [{
             "student_id": student_id,
             "student_name": student_name,
-            "class_id": class_id,
-            "date": date,
-            "status": status,
-            "marked_by": "teacher_uid",
-            "marked_at": datetime.now()
-        })
+            "status": status
+        }], teacher_id="teacher_uid")
+        created += len(result.succeeded)
+        failed += len(result.failed)
     
-    print(f"✓ Created 10 attendance records for {student_name}")
+    print(f"✓ Created {created} attendance records for {student_name}")
+    if failed:
+        print(f"✗ {failed} attendance records failed")
 
 def seed_homework(class_id, teacher_id):
     """Create sample homework assignments"""
@@ -99,17 +98,20 @@ def seed_homework(class_id, teacher_id):
         }
     ]
     
+    # Assigned through the service so every student's homework index gets the
+    # new items, including students left over from an earlier seeding run
     for hw in homework_list:
-        db.collection("homework").add({
-            "class_id": class_id,
-            "subject": hw["subject"],
-            "due_date": hw["due_date"],
-            "description": hw["description"],
-            "assigned_by": teacher_id,
-            "assigned_date": datetime.now().strftime("%Y-%m-%d"),
-            "submissions": {}
-        })
-        print(f"✓ Created homework: {hw['subject']}")
+        try:
+            FirebaseService.assign_homework(
+                class_id=class_id,
+                subject=hw["subject"],
+                due_date=hw["due_date"],
+                description=hw["description"],
+                teacher_id=teacher_id
+            )
+            print(f"✓ Created homework: {hw['subject']}")
+        except Exception as e:
+            print(f"✗ Error creating homework {hw['subject']}: {e}")
 
 def main():
     """Main seeding function"""
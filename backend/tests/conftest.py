@@ -0,0 +1,57 @@
+"""Tests run against the in-memory data backend: no credentials or network needed"""
+
+import os
+
+os.environ["DATA_BACKEND"] = "memory"
+os.environ["STARTUP_WARM_UP"] = "false"
+os.environ["MEMORY_BACKEND_LATENCY_MS"] = "0"
+os.environ.setdefault("GEMINI_API_KEY", "test")
+
+import pytest
+from app.services import firebase_service
+from app.services.memory_backend import MemoryAuth, MemoryFirestore
+from app.services.message_cache import RecentMessageCache
+from app.services.roster_cache import RosterCache
+from app.services.ttl_cache import TTLCache
+
+
+@pytest.fixture(autouse=True)
+def memory_backend(monkeypatch):
+    """A fresh in-memory Firestore/Auth and empty caches for every test"""
+    clients = (MemoryFirestore(), MemoryAuth())
+    monkeypatch.setattr(firebase_service, "_clients", clients)
+    monkeypatch.setattr(firebase_service, "profile_cache", TTLCache(max_entries=1000, ttl_seconds=60))
+    monkeypatch.setattr(firebase_service, "roster_cache", RosterCache(ttl_seconds=300))
+    monkeypatch.setattr(firebase_service, "message_cache",
+                        RecentMessageCache(window=120, max_classes=100, max_messages=10000))
+    return clients
+
+
+@pytest.fixture
+def db(memory_backend):
+    return memory_backend[0]
+
+
+@pytest.fixture
+def service():
+    return firebase_service.FirebaseService
+
+
+def add_homework(db, class_id, count, prefix="hw"):
+    """Homework docs written directly, as data from before the index existed"""
+    ids = [f"{prefix}{i:04d}" for i in range(count)]
+    for i, homework_id in enumerate(ids):
+        db.collection("homework").document(homework_id).set({
+            "class_id": class_id,
+            "subject": "Maths",
+            "due_date": f"2026-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+            "description": ""
+        })
+    return ids
+
+
+def add_student_without_index(db, uid, class_id):
+    """A student profile written before the homework index existed"""
+    db.collection("users").document(uid).set({
+        "uid": uid, "email": f"{uid}@school.test", "name": uid, "role": "student", "class_id": class_id
+    })
@@ -0,0 +1,32 @@
+from app.services.firebase_service import BulkWriter
+
+
+def test_empty_commit_returns_empty_result(db):
+    result = BulkWriter(client=db).commit()
+    assert result.ok
+    assert result.to_dict() == {"succeeded": 0, "failed": {}, "batches": 0, "retries": 0}
+
+
+def test_commits_records_across_parallel_batches(db):
+    writer = BulkWriter(client=db, batch_size=10, max_parallel=4)
+    for i in range(95):
+        writer.set(db.collection("things").document(f"t{i}"), {"n": i})
+
+    result = writer.commit()
+
+    assert result.ok
+    assert result.batches == 10
+    assert len(list(db.collection("things").stream())) == 95
+
+
+def test_record_larger_than_a_batch_is_reported_not_written(db):
+    writer = BulkWriter(client=db, batch_size=3)
+    for i in range(4):
+        writer.set(db.collection("things").document(f"big{i}"), {"n": i}, key="big")
+    writer.set(db.collection("things").document("small"), {"n": 0})
+
+    result = writer.commit()
+
+    assert "big" in result.failed
+    assert result.succeeded == ["things/small"]
+    assert [doc.id for doc in db.collection("things").stream()] == ["small"]
@@ -0,0 +1,72 @@
+from google.api_core import exceptions as google_exceptions
+from app.services import memory_backend
+from conftest import add_homework, add_student_without_index
+
+
+def homework_ids(service, student_id):
+    homework, _ = service.get_student_homework(student_id, limit=1000)
+    return {item["id"] for item in homework}
+
+
+def pending(service, student_id):
+    return service.get_student_dashboard(student_id)["pending_homework"]
+
+
+def test_registering_into_a_class_with_more_homework_than_one_batch(db, service):
+    homework = add_homework(db, "C1", 520)
+
+    service.create_account("s1@school.test", "pw", "S1", "student", "C1", uid="s1")
+
+    assert homework_ids(service, "s1") == set(homework)
+    assert pending(service, "s1") == 520
+
+
+def test_registering_into_a_class_without_homework(db, service):
+    service.create_account("s1@school.test", "pw", "S1", "student", "C1", uid="s1")
+
+    assert homework_ids(service, "s1") == set()
+    assert pending(service, "s1") == 0
+
+
+def test_first_submission_builds_the_whole_index(db, service):
+    homework = add_homework(db, "C1", 30)
+    add_student_without_index(db, "s1", "C1")
+
+    assert service.mark_homework_submitted(homework[5], "s1")
+
+    listed, _ = service.get_student_homework("s1", limit=1000)
+    assert {item["id"] for item in listed} == set(homework)
+    assert [item["id"] for item in listed if item["submitted"]] == [homework[5]]
+    assert pending(service, "s1") == 29
+
+
+def test_assign_homework_to_a_student_without_an_index(db, service):
+    old = add_homework(db, "C1", 1, prefix="old")
+    add_student_without_index(db, "s1", "C1")
+
+    new = service.assign_homework("C1", "Science", "2026-11-01", "", "t1")
+
+    assert homework_ids(service, "s1") == {old[0], new}
+    assert pending(service, "s1") == 2
+
+
+def test_assign_homework_repairs_students_whose_batch_failed(db, service, monkeypatch):
+    for i in range(300):
+        service.create_account(f"s{i}@school.test", "pw", f"S{i}", "student", "C1", uid=f"s{i:03d}")
+
+    commit = memory_backend.MemoryWriteBatch.commit
+    failures = []
+
+    def failing_once(batch):
+        if not failures and any(write[1].path.startswith("student_homework/s299") for write in batch._writes):
+            failures.append(batch)
+            raise google_exceptions.InvalidArgument("rejected")
+        return commit(batch)
+
+    monkeypatch.setattr(memory_backend.MemoryWriteBatch, "commit", failing_once)
+    new = service.assign_homework("C1", "Science", "2026-11-01", "", "t1")
+
+    assert failures
+    for student_id in ("s000", "s150", "s299"):
+        assert homework_ids(service, student_id) == {new}
+        assert pending(service, student_id) == 1
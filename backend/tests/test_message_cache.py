@@ -0,0 +1,55 @@
+import threading
+import time
+from app.services import firebase_service
+
+
+def message_texts(service, class_id):
+    page = service.get_class_messages(class_id)
+    messages = page[0] if isinstance(page, tuple) else page["messages"]
+    return [message["message"] for message in messages]
+
+
+def slow_load(monkeypatch, service, seconds=0.2):
+    """Delay the Firestore query behind the first window load"""
+    query = service._query_class_messages
+
+    def delayed(*args, **kwargs):
+        result = query(*args, **kwargs)
+        time.sleep(seconds)
+        return result
+
+    monkeypatch.setattr(service, "_query_class_messages", staticmethod(delayed))
+    return query
+
+
+def load_in_background(service, class_id):
+    thread = threading.Thread(target=service.get_class_messages, args=(class_id,))
+    thread.start()
+    time.sleep(0.05)
+    return thread
+
+
+def test_messages_sent_and_deleted_during_the_first_load_are_kept(service, monkeypatch):
+    service.send_message("C1", "u1", "U1", "student", "old")
+    doomed = service.send_message("C1", "u1", "U1", "student", "doomed")
+    query = slow_load(monkeypatch, service)
+
+    loader = load_in_background(service, "C1")
+    service.send_message("C1", "u1", "U1", "student", "new")
+    service.delete_message(doomed["id"], "C1")
+    loader.join()
+    monkeypatch.setattr(service, "_query_class_messages", staticmethod(query))
+
+    assert message_texts(service, "C1") == ["old", "new"]
+    assert firebase_service.message_cache.stats()["classes"] == 1
+
+
+def test_load_interrupted_by_invalidate_is_not_installed(service, monkeypatch):
+    service.send_message("C1", "u1", "U1", "student", "old")
+    slow_load(monkeypatch, service)
+
+    loader = load_in_background(service, "C1")
+    firebase_service.message_cache.invalidate("C1")
+    loader.join()
+
+    assert firebase_service.message_cache.stats()["classes"] == 0
@@ -18,10 +18,10 @@ const ParentDashboard = () => {
       try {
         const user = auth.currentUser;
         if (user) {
-          const response = await parentAPI.getDashboard(user.uid);
-          setDashboardData(response.data);
+          const response = await parentAPI.getBundle(user.uid);
+          setDashboardData(response.data.dashboard);
           // Store child_id in localStorage for other pages
-          localStorage.setItem('child_id', response.data.child_id);
+          localStorage.setItem('child_id', response.data.dashboard.child_id);
         }
       } catch (error) {
         console.error('Error fetching dashboard:', error);
@@ -85,8 +85,12 @@ const ParentDashboard = () => {
               </div>
             </div>
             <div style={styles.cardContent}>
-              <h3 style={styles.cardTitle}>Child's Name</h3>
-              <p style={styles.cardValue}>{dashboardData.child_name}</p>
+              <h3 style={styles.cardTitle}>
+                {dashboardData.children?.length > 1 ? "Children" : "Child's Name"}
+              </h3>
+              <p style={styles.cardValue}>
+                {(dashboardData.children || [dashboardData]).map((child) => child.child_name).join(', ')}
+              </p>
               <div style={styles.cardFooter}>
                 <span style={styles.cardLabel}>
                   <span style={styles.labelIcon}>✨</span>
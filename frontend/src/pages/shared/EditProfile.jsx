@@ -3,7 +3,6 @@ import { useNavigate } from 'react-router-dom';
 import Layout from '../../components/Layout';
 import { auth } from '../../services/firebase';
 import { authAPI } from '../../services/api';
-import { getFirestore, doc, updateDoc } from 'firebase/firestore';
 
 const EditProfile = () => {
   const [userData, setUserData] = useState(null);
@@ -12,7 +11,6 @@ const EditProfile = () => {
   const [saving, setSaving] = useState(false);
   const [message, setMessage] = useState({ type: '', text: '' });
   const navigate = useNavigate();
-  const db = getFirestore();
 
   const getLinks = (role) => {
     const baseLinks = {
@@ -71,13 +69,8 @@ const EditProfile = () => {
     setMessage({ type: '', text: '' });
 
     try {
-      const user = auth.currentUser;
-      
-      // Update in Firestore
-      const userRef = doc(db, 'users', user.uid);
-      await updateDoc(userRef, {
-        name: name.trim()
-      });
+      // Update through the backend, which also refreshes its cached profile
+      await authAPI.updateProfile({ name: name.trim() });
 
       setMessage({ type: 'success', text: 'Profile updated successfully!' });
       
@@ -27,8 +27,10 @@ const AITutor = () => {
     setAnswer('');
 
     try {
-      const response = await aiAPI.chat(question);
-      setAnswer(response.data.answer);
+      await aiAPI.chatStream(question, (text) => {
+        setLoading(false);
+        setAnswer((previous) => previous + text);
+      });
     } catch (error) {
       console.error('Error getting AI response:', error);
       setAnswer('Sorry, I could not process your question. Please try again.');
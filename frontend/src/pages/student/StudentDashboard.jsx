@@ -20,8 +20,8 @@ const StudentDashboard = () => {
       try {
         const user = auth.currentUser;
         if (user) {
-          const response = await studentAPI.getDashboard(user.uid);
-          setDashboardData(response.data);
+          const response = await studentAPI.getBundle(user.uid);
+          setDashboardData(response.data.dashboard);
         }
       } catch (error) {
         console.error('Error fetching dashboard:', error);
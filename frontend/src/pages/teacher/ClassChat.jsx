@@ -25,8 +25,7 @@ const ClassChat = () => {
   useEffect(() => {
     if (classId) {
       fetchMessages();
-      const interval = setInterval(fetchMessages, 10000);
-      return () => clearInterval(interval);
+      return messagesAPI.subscribeToClass(classId, handleChatEvent);
     }
   }, [classId]);
 
@@ -47,12 +46,24 @@ const ClassChat = () => {
   const fetchMessages = async () => {
     try {
       const response = await messagesAPI.getClassMessages(classId);
-      setMessages(response.data);
+      setMessages(response.data.messages);
     } catch (error) {
       console.error('Error fetching messages:', error);
     }
   };
 
+  const handleChatEvent = (event) => {
+    if (event.type === 'message.created') {
+      setMessages((previous) =>
+        previous.some((msg) => msg.id === event.message.id) ? previous : [...previous, event.message]
+      );
+    } else if (event.type === 'message.deleted') {
+      setMessages((previous) => previous.filter((msg) => msg.id !== event.message_id));
+    } else if (event.type === 'resync') {
+      fetchMessages();
+    }
+  };
+
   const handleSendMessage = async (e) => {
     e.preventDefault();
     if (!newMessage.trim()) return;
@@ -68,7 +79,6 @@ const ClassChat = () => {
         message: newMessage.trim()
       });
       setNewMessage('');
-      fetchMessages();
     } catch (error) {
       console.error('Error sending message:', error);
       alert('Failed to send message');
@@ -82,7 +92,6 @@ const ClassChat = () => {
     try {
       const user = auth.currentUser;
       await messagesAPI.deleteMessage(messageId, user.uid);
-      fetchMessages();
     } catch (error) {
       console.error('Error deleting message:', error);
       alert('Failed to delete message');
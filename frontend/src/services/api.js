@@ -1,4 +1,5 @@
 import axios from 'axios';
+import { auth } from './firebase';
 
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'https://learnage.onrender.com';
 
@@ -9,16 +10,29 @@ const api = axios.create({
   },
 });
 
+// Identify the signed-in user so the backend can resolve their profile once per request
+api.interceptors.request.use(async (config) => {
+  const user = auth.currentUser;
+  if (user) {
+    config.headers.Authorization = `Bearer ${await user.getIdToken()}`;
+  }
+  return config;
+});
+
 // Auth API
 export const authAPI = {
   register: (userData) => api.post('/auth/register', userData),
   verifyToken: (token) => api.post('/auth/verify-token', null, { params: { token } }),
   getUser: (uid) => api.get(`/auth/user/${uid}`),
+  // Goes through the backend so its cached copies of the profile are refreshed
+  updateProfile: (profile) => api.put('/auth/profile', profile),
 };
 
 // Student API
 export const studentAPI = {
   getDashboard: (studentId) => api.get(`/student/dashboard/${studentId}`),
+  // Dashboard, attendance, homework and recent class messages in one request
+  getBundle: (studentId) => api.get(`/student/bundle/${studentId}`),
   getAttendance: (studentId) => api.get(`/student/attendance/${studentId}`),
   getHomework: (studentId) => api.get(`/student/homework/${studentId}`),
   submitHomework: (homeworkId, studentId) => 
@@ -42,6 +56,7 @@ export const teacherAPI = {
 // Parent API
 export const parentAPI = {
   getDashboard: (parentId) => api.get(`/parent/dashboard/${parentId}`),
+  getBundle: (parentId) => api.get(`/parent/bundle/${parentId}`),
   getChildAttendance: (childId) => api.get(`/parent/attendance/${childId}`),
   getChildHomework: (childId) => api.get(`/parent/homework/${childId}`),
 };
@@ -49,16 +64,89 @@ export const parentAPI = {
 // AI API
 export const aiAPI = {
   chat: (question, context = null) => api.post('/ai/chat', { question, context }),
+  // Streams the answer over server-sent events, calling onText for each chunk
+  chatStream: async (question, onText, context = null) => {
+    // fetch skips the axios interceptor, so attach the ID token here; the
+    // backend scopes its answer cache to the caller's class
+    const headers = { 'Content-Type': 'application/json', Accept: 'text/event-stream' };
+    if (auth.currentUser) {
+      headers.Authorization = `Bearer ${await auth.currentUser.getIdToken()}`;
+    }
+    const response = await fetch(`${API_BASE_URL}/ai/chat/stream`, {
+      method: 'POST',
+      headers,
+      body: JSON.stringify({ question, context }),
+    });
+    if (!response.ok || !response.body) {
+      throw new Error(`Stream failed: ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      const events = buffer.split('\n\n');
+      buffer = events.pop();
+      for (const event of events) {
+        const lines = event.split('\n');
+        const type = lines.find((line) => line.startsWith('event:'))?.slice(6).trim() || 'message';
+        const data = lines.find((line) => line.startsWith('data:'))?.slice(5).trim();
+        if (type === 'error') {
+          throw new Error(JSON.parse(data).detail);
+        }
+        if (type === 'message' && data) {
+          onText(JSON.parse(data).text);
+        }
+      }
+    }
+  },
 };
 
 // Messages API
 export const messagesAPI = {
-  getClassMessages: (classId, limit = 50) => 
-    api.get(`/messages/class/${classId}`, { params: { limit } }),
+  // cursors: { since } for only newer messages or { before } for older history
+  getClassMessages: (classId, limit = 50, cursors = {}) => 
+    api.get(`/messages/class/${classId}`, { params: { limit, ...cursors } }),
   sendMessage: (messageData) => 
     api.post('/messages/send', messageData),
   deleteMessage: (messageId, userId) => 
     api.delete(`/messages/${messageId}`, { params: { user_id: userId } }),
+  // Push channel for a class chat. Calls onEvent with message.created,
+  // message.deleted and resync events; reconnects with backoff and asks for a
+  // resync after every reconnect. Returns a function that closes the channel.
+  subscribeToClass: (classId, onEvent) => {
+    const url = `${API_BASE_URL.replace(/^http/, 'ws')}/messages/ws/${encodeURIComponent(classId)}`;
+    let socket = null;
+    let closed = false;
+    let retries = 0;
+    let retryTimer = null;
+
+    const connect = () => {
+      socket = new WebSocket(url);
+      socket.onopen = () => {
+        if (retries > 0) onEvent({ type: 'resync' });
+        retries = 0;
+      };
+      socket.onmessage = (event) => onEvent(JSON.parse(event.data));
+      socket.onclose = () => {
+        if (closed) return;
+        retries += 1;
+        retryTimer = setTimeout(connect, Math.min(30000, 1000 * 2 ** Math.min(retries, 5)));
+      };
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      clearTimeout(retryTimer);
+      if (socket) socket.close();
+    };
+  },
 };
 
 export default api;